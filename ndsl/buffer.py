@@ -1,9 +1,12 @@
+import collections
 import contextlib
-from typing import Callable, Dict, Generator, Iterable, List, Optional, Tuple
+import dataclasses
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
 
 import numpy as np
 from numpy.lib.index_tricks import IndexExpression
 
+from ndsl.performance.memory import MEMORY_REGISTRY
 from ndsl.performance.timer import NullTimer, Timer
 from ndsl.types import Allocator
 from ndsl.utils import (
@@ -15,7 +18,163 @@ from ndsl.utils import (
 
 
 BufferKey = Tuple[Callable, Iterable[int], type]
-BUFFER_CACHE: Dict[BufferKey, List["Buffer"]] = {}
+
+
+@dataclasses.dataclass
+class BufferCacheStatistics:
+    """Usage counters of a buffer cache line.
+
+    hits: buffer requests served from the cache
+    misses: buffer requests that required an allocation
+    evictions: buffers dropped from the cache to fit the byte budget
+    resident_bytes: bytes currently held (idle) in the cache
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    resident_bytes: int = 0
+
+    def __iadd__(self, other: "BufferCacheStatistics") -> "BufferCacheStatistics":
+        self.hits += other.hits
+        self.misses += other.misses
+        self.evictions += other.evictions
+        self.resident_bytes += other.resident_bytes
+        return self
+
+
+def _key_name(key: BufferKey) -> str:
+    allocator, shape, dtype = key
+    allocator_name = (
+        f"{getattr(allocator, '__module__', '')}."
+        f"{getattr(allocator, '__name__', repr(allocator))}"
+    )
+    return f"{allocator_name}({shape}, {getattr(dtype, '__name__', dtype)})"
+
+
+class BufferCache(Dict[BufferKey, List["Buffer"]]):
+    """Cache of idle buffers, one cache line (list of buffers) per BufferKey.
+
+    The cache can be bounded with a byte budget (`max_bytes`). When the idle
+    buffers held exceed the budget, buffers are evicted starting with the
+    least recently used cache line, oldest buffer first. Evicted buffers are
+    dropped and their memory is released when garbage collected.
+
+    The budget is shared by all cache lines rather than split per key: a
+    recently used line keeps its buffers while older lines are emptied, so
+    eviction is least recently used across lines, and within a line only
+    once the older lines are empty.
+
+    Hits, misses, evictions and resident bytes are counted per cache line.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_bytes: byte budget for idle buffers, unbounded if None.
+        """
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._statistics: Dict[BufferKey, BufferCacheStatistics] = {}
+        # Cache lines, least recently used first
+        self._lru: "collections.OrderedDict[BufferKey, None]" = (
+            collections.OrderedDict()
+        )
+
+    def clear(self):
+        """Drop all buffers and reset the statistics."""
+        super().clear()
+        self._statistics.clear()
+        self._lru.clear()
+
+    def _touch(self, key: BufferKey) -> BufferCacheStatistics:
+        if key not in self:
+            self[key] = []
+        if key not in self._statistics:
+            self._statistics[key] = BufferCacheStatistics()
+        self._lru[key] = None
+        self._lru.move_to_end(key)
+        return self._statistics[key]
+
+    def pop_buffer(self, key: BufferKey) -> Optional["Buffer"]:
+        """Retrieve an idle buffer for key, creating the cache line if needed.
+
+        Returns:
+            a buffer if one was available, None otherwise (a miss).
+        """
+        statistics = self._touch(key)
+        if len(self[key]) > 0:
+            statistics.hits += 1
+            buffer = self[key].pop()
+            statistics.resident_bytes -= buffer.array.nbytes
+            return buffer
+        statistics.misses += 1
+        return None
+
+    def push_buffer(self, buffer: "Buffer"):
+        """Insert an idle buffer in its cache line, then evict to fit the budget."""
+        statistics = self._touch(buffer._key)
+        self[buffer._key].append(buffer)
+        statistics.resident_bytes += buffer.array.nbytes
+        self._evict()
+
+    def set_max_bytes(self, max_bytes: Optional[int]):
+        """Change the byte budget, evicting buffers if needed.
+
+        Args:
+            max_bytes: byte budget for idle buffers, unbounded if None.
+        """
+        self.max_bytes = max_bytes
+        self._evict()
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes currently held by idle buffers."""
+        return sum(
+            statistics.resident_bytes for statistics in self._statistics.values()
+        )
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        resident_bytes = self.resident_bytes
+        for key in list(self._lru.keys()):
+            if resident_bytes <= self.max_bytes:
+                break
+            cache_line = self[key]
+            statistics = self._statistics[key]
+            while len(cache_line) > 0 and resident_bytes > self.max_bytes:
+                evicted = cache_line.pop(0)
+                statistics.evictions += 1
+                statistics.resident_bytes -= evicted.array.nbytes
+                resident_bytes -= evicted.array.nbytes
+
+    def statistics(
+        self, key: Optional[BufferKey] = None
+    ) -> BufferCacheStatistics:
+        """Usage counters of a cache line, or summed over all lines if key is None."""
+        if key is not None:
+            return dataclasses.replace(
+                self._statistics.get(key, BufferCacheStatistics())
+            )
+        total = BufferCacheStatistics()
+        for statistics in self._statistics.values():
+            total += statistics
+        return total
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-serializable summary of the cache usage."""
+        return {
+            "max_bytes": self.max_bytes,
+            "total": dataclasses.asdict(self.statistics()),
+            "lines": {
+                _key_name(key): dataclasses.asdict(statistics)
+                for key, statistics in self._statistics.items()
+            },
+        }
+
+
+BUFFER_CACHE = BufferCache()
 
 
 class Buffer:
@@ -51,14 +210,14 @@ class Buffer:
             a buffer wrapping an allocated array
         """
         key = (allocator, shape, dtype)
-        if key in BUFFER_CACHE and len(BUFFER_CACHE[key]) > 0:
-            return BUFFER_CACHE[key].pop()
-        else:
-            if key not in BUFFER_CACHE:
-                BUFFER_CACHE[key] = []
+        buffer = BUFFER_CACHE.pop_buffer(key)
+        if buffer is None:
             array = safe_mpi_allocate(allocator, shape, dtype=dtype)
             assert is_c_contiguous(array)
-            return cls(key, array)
+            buffer = cls(key, array)
+        if MEMORY_REGISTRY.enabled:
+            MEMORY_REGISTRY.track(buffer.array, "buffer", _key_name(key))
+        return buffer
 
     @staticmethod
     def push_to_cache(buffer: "Buffer"):
@@ -67,7 +226,20 @@ class Buffer:
         Args:
             buffer: buffer to push back in cache, using internal key
         """
-        BUFFER_CACHE[buffer._key].append(buffer)
+        if MEMORY_REGISTRY.enabled:
+            MEMORY_REGISTRY.track(buffer.array, "buffer_cache", _key_name(buffer._key))
+        BUFFER_CACHE.push_buffer(buffer)
+
+    @staticmethod
+    def cache_statistics(
+        key: Optional[BufferKey] = None,
+    ) -> BufferCacheStatistics:
+        """Usage counters of the buffer cache.
+
+        Args:
+            key: cache line to report on, all lines are summed if None
+        """
+        return BUFFER_CACHE.statistics(key)
 
     def finalize_memory_transfer(self):
         """Finalize any memory transfer"""
@@ -1,11 +1,19 @@
 import copy
 import dataclasses
+import mmap
 import pickle
-from typing import Any, BinaryIO, List, Optional, TypeVar
+import struct
+import zlib
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, TypeVar
 
 import numpy as np
 
-from ndsl.comm.comm_abc import Comm, Request
+from ndsl.comm.comm_abc import (
+    Comm,
+    DeferredPersistentRequest,
+    PersistentRequest,
+    Request,
+)
 
 
 T = TypeVar("T")
@@ -21,6 +29,35 @@ class CachingRequestWriter(Request):
         self._req.wait()
         self._buffer_list.append(copy.deepcopy(self._buffer))
 
+    def Test(self) -> Optional[bool]:
+        return self._req.Test() if isinstance(self._req, Request) else None
+
+
+class CachingPersistentRequestWriter(PersistentRequest):
+    def __init__(
+        self,
+        req: PersistentRequest,
+        buffer: np.ndarray,
+        buffer_list: List[np.ndarray],
+    ):
+        self._req = req
+        self._buffer = buffer
+        self._buffer_list = buffer_list
+        self._active = False
+
+    def Start(self):
+        self._req.Start()
+        self._active = True
+
+    def wait(self):
+        self._req.wait()
+        if self._active:
+            self._buffer_list.append(copy.deepcopy(self._buffer))
+            self._active = False
+
+    def Test(self) -> Optional[bool]:
+        return self._req.Test() if isinstance(self._req, Request) else None
+
 
 class CachingRequestReader(Request):
     def __init__(self, recvbuf, data):
@@ -57,6 +94,7 @@ class CachingCommData:
         self._i_buffers = 0
         self._i_split = 0
         self._i_generic_obj = 0
+        self._reader: Optional["RecordFileReader"] = None
 
     def get_bcast(self):
         return_value = self.bcast_objects[self._i_bcast]
@@ -85,6 +123,249 @@ class CachingCommData:
     def load(self, file: BinaryIO) -> "CachingCommData":
         return pickle.load(file)
 
+    def dump_records(self, file: BinaryIO, **kwargs):
+        """Write the data in the record format, see RecordFileWriter.
+
+        Args:
+            file: binary file to write to
+            **kwargs: passed to RecordFileWriter
+        """
+        records = RecordFileWriter(file, **kwargs)
+        records.write_data(self)
+        records.close()
+
+    @classmethod
+    def load_records(cls, path: str) -> "CachingCommData":
+        """Open data written in the record format, records are read on access.
+
+        The file stays open until .close() is called on the returned data.
+        """
+        reader = RecordFileReader(path)
+        try:
+            data = reader.data()
+        except BaseException:
+            reader.close()
+            raise
+        data._reader = reader
+        return data
+
+    def close(self):
+        """Close the file opened by load_records, if any."""
+        # data unpickled from older files has no reader attribute
+        reader = getattr(self, "_reader", None)
+        if reader is not None:
+            reader.close()
+            self._reader = None
+
+
+@dataclasses.dataclass(frozen=True)
+class _Record:
+    offset: int
+    length: int
+    compressed: bool
+    # set for arrays stored as raw items, other values are pickled
+    dtype: Optional[str] = None
+    shape: Optional[Tuple[int, ...]] = None
+
+
+# streams of records of a CachingCommData
+_RECORD_FIELDS = ("bcast_objects", "received_buffers", "generic_obj_buffers")
+_RECORD_MAGIC = b"NDSLCCR1"
+# index offset, index length, magic
+_RECORD_FOOTER = struct.Struct("<QQ8s")
+# record alignment, so memory-mapped arrays are aligned
+_RECORD_ALIGNMENT = 64
+
+
+class _RecordAppender:
+    def __init__(self, writer: "RecordFileWriter", records: List[_Record]):
+        self._writer = writer
+        self._records = records
+
+    def append(self, value: Any):
+        self._records.append(self._writer.write(value))
+
+    def __len__(self):
+        return len(self._records)
+
+
+class _SplitAppender:
+    def __init__(self, split_streams: List[int]):
+        self._split_streams = split_streams
+
+    def append(self, data: CachingCommData):
+        self._split_streams.append(data._stream_id)  # type: ignore
+
+    def __len__(self):
+        return len(self._split_streams)
+
+
+class RecordFileWriter:
+    """
+    Writes CachingCommData as individually compressed records followed by
+    an index of their offsets.
+
+    Arrays of at least mmap_threshold bytes are stored uncompressed, so
+    they can be memory-mapped when replayed. The index is written by close.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        compression_level: int = 1,
+        mmap_threshold: int = 1 << 20,
+    ):
+        """
+        Args:
+            file: binary file to write to, positioned at its start
+            compression_level: zlib compression level of the records
+            mmap_threshold: arrays of at least this many bytes are stored
+                uncompressed
+        """
+        self._file = file
+        self._compression_level = compression_level
+        self._mmap_threshold = mmap_threshold
+        self._streams: List[Dict[str, Any]] = []
+        self._file.write(_RECORD_MAGIC)
+
+    def new_stream(self, rank: int, size: int) -> CachingCommData:
+        """Data of a communicator whose records are written as they are appended."""
+        stream: Dict[str, Any] = {
+            "rank": rank,
+            "size": size,
+            "split_data": [],
+            **{field: [] for field in _RECORD_FIELDS},
+        }
+        data = CachingCommData(
+            rank=rank,
+            size=size,
+            split_data=_SplitAppender(stream["split_data"]),  # type: ignore
+            **{
+                field: _RecordAppender(self, stream[field])  # type: ignore
+                for field in _RECORD_FIELDS
+            },
+        )
+        data._stream_id = len(self._streams)  # type: ignore
+        self._streams.append(stream)
+        return data
+
+    def write_data(self, data: CachingCommData) -> CachingCommData:
+        """Write in-memory data, including the data of its split communicators."""
+        stream = self.new_stream(data.rank, data.size)
+        for field in _RECORD_FIELDS:
+            for value in getattr(data, field):
+                getattr(stream, field).append(value)
+        for split_data in data.split_data:
+            stream.split_data.append(self.write_data(split_data))
+        return stream
+
+    def write(self, value: Any) -> _Record:
+        offset = self._file.tell()
+        padding = -offset % _RECORD_ALIGNMENT
+        self._file.write(b"\0" * padding)
+        offset += padding
+        if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            array = np.ascontiguousarray(value)
+            payload: bytes = array.tobytes()
+            compressed = array.nbytes < self._mmap_threshold
+            dtype: Optional[str] = array.dtype.str
+            shape: Optional[Tuple[int, ...]] = array.shape
+        else:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            compressed, dtype, shape = True, None, None
+        if compressed:
+            payload = zlib.compress(payload, self._compression_level)
+        self._file.write(payload)
+        return _Record(offset, len(payload), compressed, dtype, shape)
+
+    def close(self):
+        """Write the index, the file is complete once this returns."""
+        index = zlib.compress(pickle.dumps(self._streams))
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(_RECORD_FOOTER.pack(offset, len(index), _RECORD_MAGIC))
+        self._file.flush()
+
+
+class _LazyRecords(Sequence):
+    def __init__(self, reader: "RecordFileReader", records: List[_Record]):
+        self._reader = reader
+        self._records = records
+
+    def __getitem__(self, index):
+        return self._reader.read(self._records[index])
+
+    def __len__(self):
+        return len(self._records)
+
+
+class RecordFileReader:
+    """
+    Reads a file written by RecordFileWriter.
+
+    Only the index is read when opening, records are read when accessed and
+    not kept in memory. Uncompressed arrays are read-only views of the
+    memory-mapped file, they must be deleted before the reader is closed.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            if file.read(len(_RECORD_MAGIC)) != _RECORD_MAGIC:
+                raise ValueError(f"{path} is not a CachingComm record file")
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            offset, length, magic = _RECORD_FOOTER.unpack(
+                self._mmap[-_RECORD_FOOTER.size :]
+            )
+            if magic != _RECORD_MAGIC:
+                raise ValueError(f"{path} is incomplete, the record index is missing")
+            self._streams = pickle.loads(
+                zlib.decompress(self._mmap[offset : offset + length])
+            )
+        except BaseException:
+            self._mmap.close()
+            raise
+
+    def __enter__(self) -> "RecordFileReader":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Unmap the file, records can no longer be read once this returns."""
+        self._mmap.close()
+
+    def read(self, record: _Record) -> Any:
+        if record.dtype is not None and not record.compressed:
+            dtype = np.dtype(record.dtype)
+            return np.frombuffer(
+                self._mmap,
+                dtype=dtype,
+                count=record.length // dtype.itemsize,
+                offset=record.offset,
+            ).reshape(record.shape)
+        payload = self._mmap[record.offset : record.offset + record.length]
+        if record.compressed:
+            payload = zlib.decompress(payload)
+        if record.dtype is None:
+            return pickle.loads(payload)
+        return np.frombuffer(payload, dtype=np.dtype(record.dtype)).reshape(
+            record.shape
+        )
+
+    def data(self, stream_id: int = 0) -> CachingCommData:
+        stream = self._streams[stream_id]
+        return CachingCommData(
+            rank=stream["rank"],
+            size=stream["size"],
+            split_data=[self.data(split_id) for split_id in stream["split_data"]],
+            **{
+                field: _LazyRecords(self, stream[field])  # type: ignore
+                for field in _RECORD_FIELDS
+            },
+        )
+
 
 class CachingCommReader(Comm):
     """
@@ -125,6 +406,13 @@ class CachingCommReader(Comm):
         if recvbuf is not None:
             recvbuf[:] = self._data.get_buffer()
 
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        recvbuf[:] = self._data.get_buffer()
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        if recvbuf is not None:
+            recvbuf[0][:] = self._data.get_buffer()
+
     def allgather(self, sendobj):
         raise NotImplementedError("allgather not yet implemented for CachingCommReader")
 
@@ -140,6 +428,16 @@ class CachingCommReader(Comm):
     def Irecv(self, recvbuf, source, tag: int = 0, **kwargs) -> Request:
         return CachingRequestReader(recvbuf, self._data.get_buffer())
 
+    def Send_init(self, sendbuf, dest, tag: int = 0, **kwargs) -> PersistentRequest:
+        return DeferredPersistentRequest(NullRequest)
+
+    def Recv_init(
+        self, recvbuf, source, tag: int = 0, **kwargs
+    ) -> PersistentRequest:
+        return DeferredPersistentRequest(
+            lambda: self.Irecv(recvbuf, source, tag=tag, **kwargs)
+        )
+
     def sendrecv(self, sendbuf, dest, **kwargs):
         raise NotImplementedError()
 
@@ -155,6 +453,18 @@ class CachingCommReader(Comm):
         data = CachingCommData.load(file)
         return cls(data)
 
+    @classmethod
+    def load_records(cls, path: str) -> "CachingCommReader":
+        """Replay a file in the record format, reading records as needed.
+
+        Call .close() once done to close the file.
+        """
+        return cls(CachingCommData.load_records(path))
+
+    def close(self):
+        """Close the record file replayed from, if any."""
+        self._data.close()
+
 
 class CachingCommWriter(Comm):
     """
@@ -162,16 +472,27 @@ class CachingCommWriter(Comm):
     as a CachingCommReader.
     """
 
-    def __init__(self, comm: Comm):
+    def __init__(self, comm: Comm, record_file: Optional[BinaryIO] = None):
         """
         Args:
             comm: underlying mpi4py comm-like object
+            record_file: if given, records are streamed to this binary file in
+                the record format instead of being kept in memory, call
+                .close() once done
         """
         self._comm = comm
-        self._data = CachingCommData(
-            rank=comm.Get_rank(),
-            size=comm.Get_size(),
-        )
+        self._records: Optional[RecordFileWriter] = None
+        if record_file is None:
+            self._data = CachingCommData(
+                rank=comm.Get_rank(),
+                size=comm.Get_size(),
+            )
+        else:
+            self._stream_to(RecordFileWriter(record_file))
+
+    def _stream_to(self, records: RecordFileWriter):
+        self._records = records
+        self._data = records.new_stream(self._comm.Get_rank(), self._comm.Get_size())
 
     def Get_rank(self) -> int:
         return self._comm.Get_rank()
@@ -198,6 +519,15 @@ class CachingCommWriter(Comm):
         self._comm.Gather(sendbuf=sendbuf, recvbuf=recvbuf, root=root, **kwargs)
         self._data.received_buffers.append(copy.deepcopy(recvbuf))
 
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        self._comm.Scatterv(sendbuf=sendbuf, recvbuf=recvbuf, root=root, **kwargs)
+        self._data.received_buffers.append(copy.deepcopy(recvbuf))
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        self._comm.Gatherv(sendbuf=sendbuf, recvbuf=recvbuf, root=root, **kwargs)
+        if recvbuf is not None:
+            self._data.received_buffers.append(copy.deepcopy(recvbuf[0]))
+
     def allgather(self, sendobj):
         raise NotImplementedError("allgather not yet implemented for CachingCommReader")
 
@@ -217,18 +547,69 @@ class CachingCommWriter(Comm):
             req=req, buffer=recvbuf, buffer_list=self._data.received_buffers
         )
 
+    def Send_init(self, sendbuf, dest, tag: int = 0, **kwargs) -> PersistentRequest:
+        return self._comm.Send_init(sendbuf, dest, tag=tag, **kwargs)
+
+    def Recv_init(
+        self, recvbuf, source, tag: int = 0, **kwargs
+    ) -> PersistentRequest:
+        req = self._comm.Recv_init(recvbuf, source, tag=tag, **kwargs)
+        return CachingPersistentRequestWriter(
+            req=req, buffer=recvbuf, buffer_list=self._data.received_buffers
+        )
+
+    def Startall(self, requests):
+        # Wrapped requests can't be given to the underlying Startall
+        for request in requests:
+            request.Start()
+
+    def Waitall(self, requests):
+        for request in requests:
+            request.wait()
+
+    def Waitany(self, requests) -> int:
+        # the underlying Waitany is given the wrapped requests, the completed
+        # one is then waited on again to record its buffer
+        index = self._comm.Waitany(
+            [
+                request._req
+                if isinstance(
+                    request, (CachingRequestWriter, CachingPersistentRequestWriter)
+                )
+                else request
+                for request in requests
+            ]
+        )
+        requests[index].wait()
+        return index
+
     def sendrecv(self, sendbuf, dest, **kwargs):
         raise NotImplementedError()
 
     def Split(self, color, key) -> "CachingCommWriter":
         new_comm = self._comm.Split(color=color, key=key)
         new_wrapper = CachingCommWriter(new_comm)
+        if self._records is not None:
+            new_wrapper._stream_to(self._records)
         self._data.split_data.append(new_wrapper._data)
         return new_wrapper
 
     def dump(self, file: BinaryIO):
+        if self._records is not None:
+            raise RuntimeError("records are streamed to the record file, use close")
         self._data.dump(file)
 
+    def dump_records(self, file: BinaryIO, **kwargs):
+        """Write the records in the record format, see RecordFileWriter."""
+        if self._records is not None:
+            raise RuntimeError("records are streamed to the record file, use close")
+        self._data.dump_records(file, **kwargs)
+
+    def close(self):
+        """Complete the record file records are streamed to."""
+        if self._records is not None:
+            self._records.close()
+
     def allreduce(self, sendobj, op=None) -> Any:
         result = self._comm.allreduce(sendobj, op)
         self._data.generic_obj_buffers.append(copy.deepcopy(result))
@@ -1,15 +1,77 @@
 import abc
-from typing import List, Optional, TypeVar
+import time
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from ndsl.types import Allocator, NumpyModule
+from ndsl.utils import safe_assign_array
 
 
 T = TypeVar("T")
 
+# seconds between polls of requests in Waitany
+_WAITANY_INTERVAL = 1e-4
+
+# tags of the default Scatterv/Gatherv, the largest MPI guarantees to support
+_SCATTERV_TAG = 32766
+_GATHERV_TAG = 32767
+
 
 class Request(abc.ABC):
     @abc.abstractmethod
     def wait(self):
         ...
 
+    def Test(self) -> Optional[bool]:
+        """Whether the request completed, without waiting on it.
+
+        None if the request can't tell before being waited on.
+        """
+        return None
+
+
+def _test(request) -> Optional[bool]:
+    # some comms return duck-typed requests, which can't tell their completion
+    return request.Test() if isinstance(request, Request) else None
+
+
+class PersistentRequest(Request):
+    """Request which can be started any number of times, e.g. MPI's Prequest."""
+
+    @abc.abstractmethod
+    def Start(self):
+        ...
+
+
+class DeferredPersistentRequest(PersistentRequest):
+    """Persistent request emulated by posting a new request on each Start.
+
+    Used by communicators which don't have a native persistent request.
+    """
+
+    def __init__(self, post: Callable[[], Request]):
+        """
+        Args:
+            post: posts the non-blocking communication and returns its request
+        """
+        self._post = post
+        self._request: Optional[Request] = None
+
+    def Start(self):
+        if self._request is not None:
+            raise RuntimeError("Persistent request started twice without a wait")
+        self._request = self._post()
+
+    def wait(self):
+        # Waiting on an inactive persistent request returns immediately
+        if self._request is not None:
+            self._request.wait()
+            self._request = None
+
+    def Test(self) -> Optional[bool]:
+        if self._request is None:
+            return True
+        return _test(self._request)
+
 
 class Comm(abc.ABC):
     @abc.abstractmethod
@@ -40,6 +102,52 @@ class Comm(abc.ABC):
     def Gather(self, sendbuf, recvbuf, root=0, **kwargs):
         ...
 
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        """Scatter segments of varying sizes.
+
+        sendbuf is given as [array, counts] on the root rank, rank i receiving
+        counts[i] items stored contiguously after those of the previous ranks.
+
+        By default the root rank sends each segment with Isend.
+        """
+        if self.Get_rank() == root:
+            array, counts = sendbuf
+            requests = []
+            offset = 0
+            for rank, count in enumerate(counts):
+                segment = array[offset : offset + count]
+                if rank == root:
+                    safe_assign_array(recvbuf, segment)
+                else:
+                    requests.append(self.Isend(segment, rank, tag=_SCATTERV_TAG))
+                offset += count
+            self.Waitall(requests)
+        else:
+            self.Recv(recvbuf, root, tag=_SCATTERV_TAG)
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        """Gather segments of varying sizes.
+
+        recvbuf is given as [array, counts] on the root rank, items of rank i
+        being stored contiguously after those of the previous ranks.
+
+        By default the root rank receives each segment with Irecv.
+        """
+        if self.Get_rank() == root:
+            array, counts = recvbuf
+            requests = []
+            offset = 0
+            for rank, count in enumerate(counts):
+                segment = array[offset : offset + count]
+                if rank == root:
+                    safe_assign_array(segment, sendbuf)
+                else:
+                    requests.append(self.Irecv(segment, rank, tag=_GATHERV_TAG))
+                offset += count
+            self.Waitall(requests)
+        else:
+            self.Send(sendbuf, root, tag=_GATHERV_TAG)
+
     @abc.abstractmethod
     def allgather(self, sendobj: T) -> List[T]:
         ...
@@ -64,6 +172,54 @@ class Comm(abc.ABC):
     def Irecv(self, recvbuf, source, tag: int = 0, **kwargs) -> Request:
         ...
 
+    def Send_init(self, sendbuf, dest, tag: int = 0, **kwargs) -> PersistentRequest:
+        """Persistent send request, by default posting an Isend on each Start."""
+        return DeferredPersistentRequest(
+            lambda: self.Isend(sendbuf, dest, tag=tag, **kwargs)
+        )
+
+    def Recv_init(
+        self, recvbuf, source, tag: int = 0, **kwargs
+    ) -> PersistentRequest:
+        """Persistent receive request, by default posting an Irecv on each Start."""
+        return DeferredPersistentRequest(
+            lambda: self.Irecv(recvbuf, source, tag=tag, **kwargs)
+        )
+
+    def Startall(self, requests: Sequence[PersistentRequest]):
+        for request in requests:
+            request.Start()
+
+    def Waitall(self, requests: Sequence[Request]):
+        for request in requests:
+            request.wait()
+
+    def Waitany(self, requests: Sequence[Request]) -> int:
+        """Wait for any of the requests to complete and return its index.
+
+        Requests are polled if they can all tell their completion, otherwise
+        they complete in order.
+        """
+        while True:
+            completed = [_test(request) for request in requests]
+            if None in completed:
+                index = 0
+                break
+            elif True in completed:
+                index = completed.index(True)
+                break
+            time.sleep(_WAITANY_INTERVAL)
+        requests[index].wait()
+        return index
+
+    def buffer_allocator(self, numpy_module: NumpyModule) -> Allocator:
+        """Allocator of buffers repeatedly sent through this comm.
+
+        Comms which can send some memory without copying it, e.g. shared
+        memory, return an allocator of such memory.
+        """
+        return numpy_module.zeros
+
     @abc.abstractmethod
     def Split(self, color, key) -> "Comm":
         ...
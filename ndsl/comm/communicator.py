@@ -1,17 +1,23 @@
 import abc
-from typing import List, Mapping, Optional, Sequence, Tuple, Union, cast
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union, cast
 
 import numpy as np
 
 import ndsl.constants as constants
 from ndsl.buffer import array_buffer, recv_buffer, send_buffer
 from ndsl.comm.boundary import Boundary
-from ndsl.comm.partitioner import CubedSpherePartitioner, Partitioner, TilePartitioner
+from ndsl.comm.partitioner import (
+    CubedSpherePartitioner,
+    Partitioner,
+    RankMap,
+    TilePartitioner,
+)
+from ndsl.comm.transfer_plan import GatherPlan, LayoutKey, ScatterPlan, layout_key
 from ndsl.halo.updater import HaloUpdater, HaloUpdateRequest, VectorInterfaceHaloUpdater
 from ndsl.performance.timer import NullTimer, Timer
 from ndsl.quantity import Quantity, QuantityHaloSpec, QuantityMetadata
 from ndsl.types import NumpyModule
-from ndsl.utils import device_synchronize
+from ndsl.utils import device_synchronize, safe_assign_array
 
 
 try:
@@ -68,6 +74,8 @@ class Communicator(abc.ABC):
         self._boundaries: Optional[Mapping[int, Boundary]] = None
         self._last_halo_tag = 0
         self.timer: Timer = timer if timer is not None else NullTimer()
+        self._scatter_plans: Dict[LayoutKey, ScatterPlan] = {}
+        self._gather_plans: Dict[LayoutKey, GatherPlan] = {}
 
     @abc.abstractproperty
     def tile(self) -> "TileCommunicator":
@@ -109,18 +117,6 @@ class Communicator(abc.ABC):
         # this is a method so we can profile it separately from other device syncs
         device_synchronize()
 
-    def _Scatter(self, numpy_module, sendbuf, recvbuf, **kwargs):
-        with send_buffer(numpy_module.zeros, sendbuf) as send, recv_buffer(
-            numpy_module.zeros, recvbuf
-        ) as recv:
-            self.comm.Scatter(send, recv, **kwargs)
-
-    def _Gather(self, numpy_module, sendbuf, recvbuf, **kwargs):
-        with send_buffer(numpy_module.zeros, sendbuf) as send, recv_buffer(
-            numpy_module.zeros, recvbuf
-        ) as recv:
-            self.comm.Gather(send, recv, **kwargs)
-
     def scatter(
         self,
         send_quantity: Optional[Quantity] = None,
@@ -137,46 +133,49 @@ class Communicator(abc.ABC):
         """
         if self.rank == constants.ROOT_RANK and send_quantity is None:
             raise TypeError("send_quantity is a required argument on the root rank")
-        if self.rank == constants.ROOT_RANK:
-            send_quantity = cast(Quantity, send_quantity)
-            metadata = self.comm.bcast(send_quantity.metadata, root=constants.ROOT_RANK)
-        else:
-            metadata = self.comm.bcast(None, root=constants.ROOT_RANK)
-        shape = self.partitioner.subtile_extent(metadata, self.rank)
-        if recv_quantity is None:
-            recv_quantity = self._get_scatter_recv_quantity(shape, metadata)
-        if self.rank == constants.ROOT_RANK:
-            send_quantity = cast(Quantity, send_quantity)
-            with array_buffer(
-                self._maybe_force_cpu(metadata.np).zeros,
-                (self.partitioner.total_ranks,) + shape,
-                dtype=metadata.dtype,
-            ) as sendbuf:
-                for rank in range(0, self.partitioner.total_ranks):
-                    subtile_slice = self.partitioner.subtile_slice(
-                        rank=rank,
-                        global_dims=metadata.dims,
-                        global_extent=metadata.extent,
-                        overlap=True,
-                    )
-                    sendbuf.assign_from(
-                        send_quantity.view[subtile_slice],
-                        buffer_slice=np.index_exp[rank, :],
-                    )
-                self._Scatter(
-                    metadata.np,
-                    sendbuf.array,
-                    recv_quantity.view[:],
-                    root=constants.ROOT_RANK,
-                )
-        else:
-            self._Scatter(
-                metadata.np,
-                None,
-                recv_quantity.view[:],
-                root=constants.ROOT_RANK,
-            )
-        return recv_quantity
+        metadata = self.comm.bcast(
+            None if send_quantity is None else send_quantity.metadata,
+            root=constants.ROOT_RANK,
+        )
+        return self._cached_scatter_plan(metadata).scatter(
+            send_quantity, recv_quantity, metadata=metadata
+        )
+
+    def get_scatter_plan(
+        self, metadata: Optional[QuantityMetadata] = None
+    ) -> ScatterPlan:
+        """Get a plan to scatter quantities of the given layout, a collective call.
+
+        The metadata is broadcast from the root rank, and plans are cached by
+        dimensions, extent and dtype. Scattering with the returned plan skips
+        the broadcast.
+
+        Args:
+            metadata: metadata of the full-tile quantity, only required/used on the
+                tile root rank
+        """
+        if self.rank == constants.ROOT_RANK and metadata is None:
+            raise TypeError("metadata is a required argument on the root rank")
+        metadata = self.comm.bcast(metadata, root=constants.ROOT_RANK)
+        return self._cached_scatter_plan(metadata)
+
+    def _cached_scatter_plan(self, metadata: QuantityMetadata) -> ScatterPlan:
+        key = layout_key(metadata, self._maybe_force_cpu(metadata.np))
+        if key not in self._scatter_plans:
+            self._scatter_plans[key] = ScatterPlan(self, metadata)
+        return self._scatter_plans[key]
+
+    def get_gather_plan(self, metadata: QuantityMetadata) -> GatherPlan:
+        """Get a plan to gather quantities of the given layout, cached by
+        dimensions, extent and dtype.
+
+        Args:
+            metadata: metadata of the quantity on this rank
+        """
+        key = layout_key(metadata, self._maybe_force_cpu(metadata.np))
+        if key not in self._gather_plans:
+            self._gather_plans[key] = GatherPlan(self, metadata)
+        return self._gather_plans[key]
 
     def _get_gather_recv_quantity(
         self, global_extent: Sequence[int], send_metadata: QuantityMetadata
@@ -219,46 +218,9 @@ class Communicator(abc.ABC):
         Returns:
             recv_quantity: quantity if on root rank, otherwise None
         """
-        result: Optional[Quantity]
-        if self.rank == constants.ROOT_RANK:
-            with array_buffer(
-                send_quantity.np.zeros,
-                (self.partitioner.total_ranks,) + tuple(send_quantity.extent),
-                dtype=send_quantity.data.dtype,
-            ) as recvbuf:
-                self._Gather(
-                    send_quantity.np,
-                    send_quantity.view[:],
-                    recvbuf.array,
-                    root=constants.ROOT_RANK,
-                )
-                if recv_quantity is None:
-                    global_extent = self.partitioner.global_extent(
-                        send_quantity.metadata
-                    )
-                    recv_quantity = self._get_gather_recv_quantity(
-                        global_extent, send_quantity.metadata
-                    )
-                for rank in range(self.partitioner.total_ranks):
-                    to_slice = self.partitioner.subtile_slice(
-                        rank=rank,
-                        global_dims=recv_quantity.dims,
-                        global_extent=recv_quantity.extent,
-                        overlap=True,
-                    )
-                    recvbuf.assign_to(
-                        recv_quantity.view[to_slice], buffer_slice=np.index_exp[rank, :]
-                    )
-                result = recv_quantity
-        else:
-            self._Gather(
-                send_quantity.np,
-                send_quantity.view[:],
-                None,
-                root=constants.ROOT_RANK,
-            )
-            result = None
-        return result
+        return self.get_gather_plan(send_quantity.metadata).gather(
+            send_quantity, recv_quantity
+        )
 
     def gather_state(self, send_state=None, recv_state=None, transfer_type=None):
         """Transfer a state dictionary from subtile ranks to the tile root rank.
@@ -266,41 +228,114 @@ class Communicator(abc.ABC):
         'time' is assumed to be the same on all ranks, and its value will be set
         to the value from the root rank.
 
+        Quantities are batched by dtype: each rank packs all quantities of a
+        dtype in a single buffer, transferred with one Gatherv.
+
         Args:
             send_state: the model state to be sent containing the subtile data
             recv_state: the pre-allocated state in which to recieve the full tile
                 state. Only variables which are scattered will be written to.
+            transfer_type: dtype to cast the data to before the transfer
         Returns:
             recv_state: on the root rank, the state containing the entire tile
         """
         if self.rank == constants.ROOT_RANK and recv_state is None:
             recv_state = {}
+        gather_quantities: Dict[str, Quantity] = {}
         for name, quantity in send_state.items():
-            if name == "time":
-                if self.rank == constants.ROOT_RANK:
-                    recv_state["time"] = send_state["time"]
-            else:
-                gather_value = to_numpy(quantity.view[:], dtype=transfer_type)
-                gather_quantity = Quantity(
-                    data=gather_value,
+            if name != "time":
+                gather_quantities[name] = Quantity(
+                    data=to_numpy(quantity.view[:], dtype=transfer_type),
                     dims=quantity.dims,
                     units=quantity.units,
                     allow_mismatch_float_precision=True,
                 )
-                if recv_state is not None and name in recv_state:
-                    tile_quantity = self.gather(
-                        gather_quantity, recv_quantity=recv_state[name]
-                    )
+        groups: Dict[np.dtype, Dict[str, Quantity]] = {}
+        for name, quantity in gather_quantities.items():
+            groups.setdefault(quantity.data.dtype, {})[name] = quantity
+        tile_quantities: Dict[str, Quantity] = {}
+        for quantities in groups.values():
+            tile_quantities.update(self._gather_quantities(quantities, recv_state))
+        if self.rank == constants.ROOT_RANK:
+            for name in send_state.keys():
+                if name == "time":
+                    recv_state["time"] = send_state["time"]
                 else:
-                    tile_quantity = self.gather(gather_quantity)
-                if self.rank == constants.ROOT_RANK:
-                    recv_state[name] = tile_quantity
-                del gather_quantity
+                    recv_state[name] = tile_quantities[name]
         return recv_state
 
+    def _gather_quantities(
+        self,
+        quantities: Mapping[str, Quantity],
+        recv_state: Optional[Mapping[str, Quantity]],
+    ) -> Dict[str, Quantity]:
+        """Gather host quantities of the same dtype with a single Gatherv.
+
+        Returns:
+            tile quantities by name on the root rank, an empty dict otherwise
+        """
+        dtype = next(iter(quantities.values())).data.dtype
+        send_size = sum(quantity.view[:].size for quantity in quantities.values())
+        with array_buffer(np.zeros, (send_size,), dtype=dtype) as sendbuf:
+            offset = 0
+            for quantity in quantities.values():
+                size = quantity.view[:].size
+                sendbuf.assign_from(
+                    quantity.view[:].reshape(-1),
+                    buffer_slice=np.index_exp[offset : offset + size],
+                )
+                offset += size
+            if self.rank != constants.ROOT_RANK:
+                self.comm.Gatherv(sendbuf.array, None, root=constants.ROOT_RANK)
+                return {}
+
+            recv_quantities: Dict[str, Quantity] = {}
+            for name, quantity in quantities.items():
+                if recv_state is not None and name in recv_state:
+                    recv_quantities[name] = recv_state[name]
+                else:
+                    recv_quantities[name] = self._get_gather_recv_quantity(
+                        self.partitioner.global_extent(quantity.metadata),
+                        quantity.metadata,
+                    )
+            rank_views = []
+            for rank in range(self.partitioner.total_ranks):
+                rank_views.append(
+                    [
+                        recv_quantity.view[
+                            self.partitioner.subtile_slice(
+                                rank=rank,
+                                global_dims=recv_quantity.dims,
+                                global_extent=recv_quantity.extent,
+                                overlap=True,
+                            )
+                        ]
+                        for recv_quantity in recv_quantities.values()
+                    ]
+                )
+            counts = [sum(view.size for view in views) for views in rank_views]
+            with array_buffer(np.zeros, (sum(counts),), dtype=dtype) as recvbuf:
+                self.comm.Gatherv(
+                    sendbuf.array, [recvbuf.array, counts], root=constants.ROOT_RANK
+                )
+                offset = 0
+                for views in rank_views:
+                    for view in views:
+                        recvbuf.assign_to(
+                            view,
+                            buffer_slice=np.index_exp[offset : offset + view.size],
+                            buffer_reshape=view.shape,
+                        )
+                        offset += view.size
+        return recv_quantities
+
     def scatter_state(self, send_state=None, recv_state=None):
         """Transfer a state dictionary from the tile root rank to all subtiles.
 
+        Metadata of all quantities is broadcast at once, then quantities are
+        batched by dtype: the root rank packs the subtiles of all quantities of
+        a dtype in a single buffer, transferred with one Scatterv.
+
         Args:
             send_state: the model state to be sent containing the entire tile,
                 required only from the root rank
@@ -309,43 +344,116 @@ class Communicator(abc.ABC):
         Returns:
             rank_state: the state corresponding to this rank's subdomain
         """
-
-        def scatter_root():
-            if send_state is None:
-                raise TypeError("send_state is a required argument on the root rank")
-            name_list = list(send_state.keys())
-            while "time" in name_list:
-                name_list.remove("time")
-            name_list = self.comm.bcast(name_list, root=constants.ROOT_RANK)
-            array_list = [send_state[name] for name in name_list]
-            for name, array in zip(name_list, array_list):
-                if name in recv_state:
-                    self.scatter(send_quantity=array, recv_quantity=recv_state[name])
-                else:
-                    recv_state[name] = self.scatter(send_quantity=array)
-            recv_state["time"] = self.comm.bcast(
-                send_state.get("time", None), root=constants.ROOT_RANK
-            )
-
-        def scatter_client():
-            name_list = self.comm.bcast(None, root=constants.ROOT_RANK)
-            for name in name_list:
-                if name in recv_state:
-                    self.scatter(recv_quantity=recv_state[name])
-                else:
-                    recv_state[name] = self.scatter()
-            recv_state["time"] = self.comm.bcast(None, root=constants.ROOT_RANK)
-
         if recv_state is None:
             recv_state = {}
         if self.rank == constants.ROOT_RANK:
-            scatter_root()
+            if send_state is None:
+                raise TypeError("send_state is a required argument on the root rank")
+            metadata = {
+                name: quantity.metadata
+                for name, quantity in send_state.items()
+                if name != "time"
+            }
+            header = (metadata, send_state.get("time", None))
         else:
-            scatter_client()
+            header = None
+        metadata, time = self.comm.bcast(header, root=constants.ROOT_RANK)
+        groups: Dict[Tuple[np.dtype, NumpyModule], Dict[str, QuantityMetadata]] = {}
+        for name, quantity_metadata in metadata.items():
+            key = (
+                np.dtype(quantity_metadata.dtype),
+                self._maybe_force_cpu(quantity_metadata.np),
+            )
+            groups.setdefault(key, {})[name] = quantity_metadata
+        rank_quantities: Dict[str, Quantity] = {}
+        for group_metadata in groups.values():
+            rank_quantities.update(
+                self._scatter_quantities(group_metadata, send_state, recv_state)
+            )
+        for name in metadata.keys():
+            recv_state[name] = rank_quantities[name]
+        recv_state["time"] = time
         if recv_state["time"] is None:
             recv_state.pop("time")
         return recv_state
 
+    def _scatter_quantities(
+        self,
+        metadata: Mapping[str, QuantityMetadata],
+        send_state: Optional[Mapping[str, Quantity]],
+        recv_state: Mapping[str, Quantity],
+    ) -> Dict[str, Quantity]:
+        """Scatter quantities of the same dtype and device with a single Scatterv.
+
+        Returns:
+            subtile quantities by name
+        """
+        first_metadata = next(iter(metadata.values()))
+        numpy_module = self._maybe_force_cpu(first_metadata.np)
+        recv_quantities: Dict[str, Quantity] = {}
+        for name, quantity_metadata in metadata.items():
+            if name in recv_state:
+                recv_quantities[name] = recv_state[name]
+            else:
+                recv_quantities[name] = self._get_scatter_recv_quantity(
+                    self.partitioner.subtile_extent(quantity_metadata, self.rank),
+                    quantity_metadata,
+                )
+        recv_size = sum(
+            recv_quantity.view[:].size for recv_quantity in recv_quantities.values()
+        )
+        with array_buffer(
+            numpy_module.zeros, (recv_size,), dtype=first_metadata.dtype
+        ) as recvbuf:
+            if self.rank == constants.ROOT_RANK:
+                assert send_state is not None
+                rank_views = []
+                for rank in range(self.partitioner.total_ranks):
+                    rank_views.append(
+                        [
+                            send_state[name].view[
+                                self.partitioner.subtile_slice(
+                                    rank=rank,
+                                    global_dims=quantity_metadata.dims,
+                                    global_extent=quantity_metadata.extent,
+                                    overlap=True,
+                                )
+                            ]
+                            for name, quantity_metadata in metadata.items()
+                        ]
+                    )
+                counts = [sum(view.size for view in views) for views in rank_views]
+                with array_buffer(
+                    numpy_module.zeros, (sum(counts),), dtype=first_metadata.dtype
+                ) as sendbuf:
+                    offset = 0
+                    for views in rank_views:
+                        for view in views:
+                            safe_assign_array(
+                                sendbuf.array[offset : offset + view.size].reshape(
+                                    view.shape
+                                ),
+                                view,
+                            )
+                            offset += view.size
+                    self.comm.Scatterv(
+                        [sendbuf.array, counts],
+                        recvbuf.array,
+                        root=constants.ROOT_RANK,
+                    )
+            else:
+                self.comm.Scatterv(None, recvbuf.array, root=constants.ROOT_RANK)
+            offset = 0
+            for recv_quantity in recv_quantities.values():
+                view = recv_quantity.view[:]
+                recvbuf.assign_to(
+                    view,
+                    buffer_slice=np.index_exp[offset : offset + view.size],
+                    buffer_reshape=view.shape,
+                )
+                offset += view.size
+        return recv_quantities
+
     def halo_update(self, quantity: Union[Quantity, List[Quantity]], n_points: int):
         """Perform a halo update on a quantity or quantities
 
@@ -487,6 +595,74 @@ class Communicator(abc.ABC):
         halo_updater.start(x_quantities, y_quantities)
         return halo_updater
 
+    def combined_halo_update(
+        self,
+        quantities: List[Quantity],
+        x_quantities: List[Quantity],
+        y_quantities: List[Quantity],
+        n_points: int,
+    ):
+        """Perform a halo update of scalar and horizontal vector quantities at once.
+
+        All data going to a neighboring rank is sent in a single message.
+
+        Args:
+            quantities: the scalar quantities to be halo updated
+            x_quantities: the x-component quantities to be halo updated
+            y_quantities: the y-component quantities to be halo updated
+            n_points: how many halo points to update, starting at the interior
+        """
+        halo_updater = self.start_combined_halo_update(
+            quantities, x_quantities, y_quantities, n_points
+        )
+        halo_updater.wait()
+
+    def start_combined_halo_update(
+        self,
+        quantities: List[Quantity],
+        x_quantities: List[Quantity],
+        y_quantities: List[Quantity],
+        n_points: int,
+    ) -> HaloUpdater:
+        """Start an asynchronous halo update of scalar and vector quantities at once.
+
+        All data going to a neighboring rank is sent in a single message.
+        Assumes the x and y dimension indices are the same between the x and y
+        quantities.
+
+        Args:
+            quantities: the scalar quantities to be halo updated
+            x_quantities: the x-component quantities to be halo updated
+            y_quantities: the y-component quantities to be halo updated
+            n_points: how many halo points to update, starting at the interior
+
+        Returns:
+            request: an asynchronous request object with a .wait() method
+        """
+        halo_updater = self.get_halo_updater(
+            [self._halo_specification(q, n_points) for q in quantities],
+            [self._halo_specification(q, n_points) for q in x_quantities],
+            [self._halo_specification(q, n_points) for q in y_quantities],
+        )
+        halo_updater.force_finalize_on_wait()
+        halo_updater.start(list(quantities) + list(x_quantities), list(y_quantities))
+        return halo_updater
+
+    def _halo_specification(
+        self, quantity: Quantity, n_points: int
+    ) -> QuantityHaloSpec:
+        return QuantityHaloSpec(
+            n_points=n_points,
+            shape=quantity.data.shape,
+            strides=quantity.data.strides,
+            itemsize=quantity.data.itemsize,
+            origin=quantity.metadata.origin,
+            extent=quantity.metadata.extent,
+            dims=quantity.metadata.dims,
+            numpy_module=self._maybe_force_cpu(quantity.np),
+            dtype=quantity.metadata.dtype,
+        )
+
     def synchronize_vector_interfaces(self, x_quantity: Quantity, y_quantity: Quantity):
         """
         Synchronize shared points at the edges of a vector interface variable.
@@ -569,6 +745,28 @@ class Communicator(abc.ABC):
             self.timer,
         )
 
+    def get_halo_updater(
+        self,
+        specifications: List[QuantityHaloSpec],
+        specifications_x: List[QuantityHaloSpec],
+        specifications_y: List[QuantityHaloSpec],
+    ):
+        all_specifications = specifications + specifications_x + specifications_y
+        if len(all_specifications) == 0:
+            raise RuntimeError("Cannot create updater with empty specifications list")
+        if any(spec.n_points == 0 for spec in all_specifications):
+            raise ValueError("Cannot perform a halo update on zero halo points")
+        return HaloUpdater.from_specifications(
+            self,
+            self._maybe_force_cpu(all_specifications[0].numpy_module),
+            specifications,
+            specifications_x,
+            specifications_y,
+            self.boundaries.values(),
+            self._get_halo_tag(),
+            self.timer,
+        )
+
     def _get_halo_tag(self) -> int:
         self._last_halo_tag += 1
         return self._last_halo_tag
@@ -671,6 +869,35 @@ class TileCommunicator(Communicator):
         else:
             return super().start_vector_halo_update(x_quantity, y_quantity, n_points)
 
+    def start_combined_halo_update(
+        self,
+        quantities: List[Quantity],
+        x_quantities: List[Quantity],
+        y_quantities: List[Quantity],
+        n_points: int,
+    ) -> HaloUpdater:
+        """Start an asynchronous halo update of scalar and vector quantities at once.
+
+        Args:
+            quantities: the scalar quantities to be halo updated
+            x_quantities: the x-component quantities to be halo updated
+            y_quantities: the y-component quantities to be halo updated
+            n_points: how many halo points to update, starting at the interior
+
+        Returns:
+            request: an asynchronous request object with a .wait() method
+        """
+        if self.partitioner.layout[0] < 3 or self.partitioner.layout[1] < 3:
+            raise NotImplementedError(
+                "implementing halo updates on smaller layouts requires "
+                "refactoring our code to remove the assumption that any pair "
+                "of ranks only share one boundary"
+            )
+        else:
+            return super().start_combined_halo_update(
+                quantities, x_quantities, y_quantities, n_points
+            )
+
     def start_synchronize_vector_interfaces(
         self, x_quantity: Quantity, y_quantity: Quantity
     ) -> HaloUpdateRequest:
@@ -731,6 +958,7 @@ class CubedSphereCommunicator(Communicator):
             )
         self._tile_communicator: Optional[TileCommunicator] = None
         self._force_cpu = force_cpu
+        self.rank_map: Optional[RankMap] = None
         super(CubedSphereCommunicator, self).__init__(
             comm, partitioner, force_cpu, timer
         )
@@ -747,6 +975,37 @@ class CubedSphereCommunicator(Communicator):
         partitioner = CubedSpherePartitioner(tile=TilePartitioner(layout=layout))
         return cls(comm=comm, partitioner=partitioner, force_cpu=force_cpu, timer=timer)
 
+    @classmethod
+    def from_rank_map(
+        cls,
+        comm,
+        rank_map: RankMap,
+        force_cpu: bool = False,
+        timer: Optional[Timer] = None,
+    ) -> "CubedSphereCommunicator":
+        """Initialize a CubedSphereCommunicator whose ranks follow a RankMap.
+
+        The communicator is split so the rank of each process within it is its
+        partition rank, a collective call on comm.
+
+        Args:
+            comm: mpi4py.Comm object, ranks placed on nodes as assumed by rank_map
+            rank_map: assignment of subtiles to the ranks of comm
+            force_cpu: Force all communication to go through central memory.
+            timer: Time communication operations.
+        """
+        reordered_comm = comm.Split(
+            color=0, key=rank_map.partition_rank(comm.Get_rank())
+        )
+        communicator = cls(
+            comm=reordered_comm,
+            partitioner=rank_map.partitioner,
+            force_cpu=force_cpu,
+            timer=timer,
+        )
+        communicator.rank_map = rank_map
+        return communicator
+
     @property
     def tile(self) -> TileCommunicator:
         """communicator for within a tile"""
@@ -94,6 +94,13 @@ class LocalComm(Comm):
             self._buffer["gather"] = [None for i in range(self.total_ranks)]
         return self._buffer["gather"]
 
+    @property
+    def _gatherv_buffer(self):
+        # queue per rank, as a rank may post several Gatherv before the root
+        if "gatherv" not in self._buffer:
+            self._buffer["gatherv"] = [[] for i in range(self.total_ranks)]
+        return self._buffer["gatherv"]
+
     def bcast(self, value, root=0):
         if root != 0:
             raise NotImplementedError(
@@ -141,6 +148,44 @@ class LocalComm(Comm):
             for i, sendbuf in enumerate(gather_buffer):
                 safe_assign_array(recvbuf[i, :], sendbuf)
 
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(recvbuf)
+        if root != 0:
+            raise NotImplementedError(
+                "LocalComm assumes ranks are called in order, so root must be "
+                "the scatter source"
+            )
+        if sendbuf is not None:
+            array, counts = sendbuf
+            ensure_contiguous(array)
+            sendbuf = self._get_buffer("scatterv", (copy.deepcopy(array), list(counts)))
+        else:
+            sendbuf = self._get_buffer("scatterv", None)
+        array, counts = sendbuf
+        offset = sum(counts[: self.rank])
+        safe_assign_array(recvbuf, array[offset : offset + counts[self.rank]])
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(sendbuf)
+        gather_buffer = self._gatherv_buffer
+        if self.rank != root:
+            gather_buffer[self.rank].append(copy.deepcopy(sendbuf))
+        else:
+            uncalled_ranks = [
+                i for i, queue in enumerate(gather_buffer) if i != root and not queue
+            ]
+            if uncalled_ranks:
+                raise ConcurrencyError(
+                    f"gatherv called on root rank before ranks {uncalled_ranks}"
+                )
+            array, counts = recvbuf
+            ensure_contiguous(array)
+            offset = 0
+            for i, count in enumerate(counts):
+                data = sendbuf if i == root else gather_buffer[i].pop(0)
+                safe_assign_array(array[offset : offset + count], data)
+                offset += count
+
     def allgather(self, sendobj):
         raise NotImplementedError(
             "cannot implement allgather on local comm due to its inherent parallelism"
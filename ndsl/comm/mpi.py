@@ -2,9 +2,9 @@ try:
     from mpi4py import MPI
 except ImportError:
     MPI = None
-from typing import List, Optional, TypeVar, cast
+from typing import List, Optional, Sequence, TypeVar, cast
 
-from ndsl.comm.comm_abc import Comm, Request
+from ndsl.comm.comm_abc import Comm, PersistentRequest, Request
 from ndsl.logging import ndsl_log
 
 
@@ -42,6 +42,14 @@ class MPIComm(Comm):
         ndsl_log.debug("Gather on rank %s with root %s", self._comm.Get_rank(), root)
         self._comm.Gather(sendbuf, recvbuf, root=root, **kwargs)
 
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ndsl_log.debug("Scatterv on rank %s with root %s", self._comm.Get_rank(), root)
+        self._comm.Scatterv(sendbuf, recvbuf, root=root, **kwargs)
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ndsl_log.debug("Gatherv on rank %s with root %s", self._comm.Get_rank(), root)
+        self._comm.Gatherv(sendbuf, recvbuf, root=root, **kwargs)
+
     def allgather(self, sendobj: T) -> List[T]:
         ndsl_log.debug("allgather on rank %s", self._comm.Get_rank())
         return self._comm.allgather(sendobj)
@@ -66,6 +74,29 @@ class MPIComm(Comm):
         ndsl_log.debug("Irecv on rank %s with source %s", self._comm.Get_rank(), source)
         return self._comm.Irecv(recvbuf, source, tag=tag, **kwargs)
 
+    def Send_init(self, sendbuf, dest, tag: int = 0, **kwargs) -> PersistentRequest:
+        ndsl_log.debug(
+            "Send_init on rank %s with dest %s", self._comm.Get_rank(), dest
+        )
+        return self._comm.Send_init(sendbuf, dest, tag=tag, **kwargs)
+
+    def Recv_init(
+        self, recvbuf, source, tag: int = 0, **kwargs
+    ) -> PersistentRequest:
+        ndsl_log.debug(
+            "Recv_init on rank %s with source %s", self._comm.Get_rank(), source
+        )
+        return self._comm.Recv_init(recvbuf, source, tag=tag, **kwargs)
+
+    def Startall(self, requests: Sequence[PersistentRequest]):
+        MPI.Prequest.Startall(list(requests))
+
+    def Waitall(self, requests: Sequence[Request]):
+        MPI.Request.Waitall(list(requests))
+
+    def Waitany(self, requests: Sequence[Request]) -> int:
+        return MPI.Request.Waitany(list(requests))
+
     def Split(self, color, key) -> "Comm":
         ndsl_log.debug(
             "Split on rank %s with color %s, key %s", self._comm.Get_rank(), color, key
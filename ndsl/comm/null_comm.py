@@ -58,6 +58,14 @@ class NullComm(Comm):
         if recvbuf is not None:
             recvbuf[:] = self._fill_value
 
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        if recvbuf is not None:
+            recvbuf[:] = self._fill_value
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        if recvbuf is not None:
+            recvbuf[0][:] = self._fill_value
+
     def allgather(self, sendobj):
         return [copy.deepcopy(sendobj) for _ in range(self.total_ranks)]
 
@@ -1,7 +1,18 @@
 import abc
 import copy
 import functools
-from typing import Callable, List, Optional, Sequence, Tuple, TypeVar, Union, cast
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import numpy as np
 
@@ -26,7 +37,16 @@ from ndsl.utils import list_by_dims
 # should not be that many
 DEFAULT_CACHE_SIZE = None
 
-__all__ = ["TilePartitioner", "CubedSpherePartitioner", "get_tile_index"]
+# (y, x) number of cell centers of each subtile row and column
+SubtileCellCounts = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+__all__ = [
+    "TilePartitioner",
+    "CubedSpherePartitioner",
+    "PartitionerTopology",
+    "RankMap",
+    "get_tile_index",
+]
 
 
 def get_tile_index(rank: int, total_ranks: int) -> int:
@@ -130,18 +150,107 @@ class Partitioner(abc.ABC):
     def total_ranks(self) -> int:
         pass
 
+    def subtile_slices(
+        self,
+        global_dims: Sequence[str],
+        global_extent: Sequence[int],
+        overlap: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the subtile slices of all ranks on an array.
+
+        Args:
+            global_dims: dimensions of the global quantity being partitioned
+            global_extent: extent of the global quantity being partitioned
+            overlap (optional): as for subtile_slice
+
+        Returns:
+            start: (rank, dimension) array of slice starts
+            stop: (rank, dimension) array of slice stops
+        """
+        return rank_slices_from_tile_metadata(
+            global_dims,
+            extent=global_extent,
+            layout=self.layout,
+            total_ranks=self.total_ranks,
+            edge_interior_ratio=self.tile.edge_interior_ratio,
+            overlap=overlap,
+            subtile_cell_counts=self.tile.subtile_cell_counts,
+        )
+
+    @property
+    def topology(self) -> "PartitionerTopology":
+        """Boundaries of all ranks, computed on first access."""
+        return _get_topology(self)
+
 
 class TilePartitioner(Partitioner):
     def __init__(
         self,
         layout: Tuple[int, int],
         edge_interior_ratio: float = 1.0,
+        subtile_cell_counts: Optional[SubtileCellCounts] = None,
     ):
-        """Create an object for fv3gfs tile decomposition."""
+        """Create an object for fv3gfs tile decomposition.
+
+        Args:
+            layout: the (y, x) number of ranks along each tile axis
+            edge_interior_ratio: target value for the relative 1-dimensional
+                extent of the compute domains of ranks on tile edges and corners
+                compared to ranks on the tile interior
+            subtile_cell_counts (optional): the (y, x) number of cell centers of
+                each subtile row and column, for uneven decompositions such as
+                those given by from_weights. Tiles must then have as many cell
+                centers as the sum of the counts.
+        """
         self.layout = layout
         self.edge_interior_ratio = edge_interior_ratio
+        if subtile_cell_counts is not None:
+            if edge_interior_ratio != 1.0:
+                raise ValueError(
+                    "cannot give both subtile_cell_counts and an edge_interior_ratio"
+                )
+            subtile_cell_counts = (
+                tuple(int(count) for count in subtile_cell_counts[0]),
+                tuple(int(count) for count in subtile_cell_counts[1]),
+            )
+            for counts, n_ranks in zip(subtile_cell_counts, layout):
+                if len(counts) != n_ranks or min(counts) < 1:
+                    raise ValueError(
+                        f"subtile_cell_counts {subtile_cell_counts} must give a "
+                        f"positive count for each subtile of layout {layout}"
+                    )
+        self.subtile_cell_counts = subtile_cell_counts
         self.tile = self
 
+    @classmethod
+    def from_weights(
+        cls,
+        weights: np.ndarray,
+        layout: Tuple[int, int],
+        min_cells: int = constants.N_HALO_DEFAULT,
+    ) -> "TilePartitioner":
+        """Create a TilePartitioner balancing the cost of its subtiles.
+
+        Subtile rows and columns are sized so each holds close to an equal share
+        of the total cost, keeping a rectilinear decomposition so that subtile
+        edges still match up one to one.
+
+        Args:
+            weights: (y, x) cost of each cell center of the tile, for example
+                from physics timings or a land/sea mask
+            layout: the (y, x) number of ranks along each tile axis
+            min_cells: minimum number of cell centers along each subtile axis,
+                at least the halo width for halo updates to work
+        """
+        weights = np.asarray(weights)
+        return cls(
+            layout,
+            subtile_cell_counts=(
+                balanced_cell_counts(weights.sum(axis=1), layout[0], min_cells),
+                balanced_cell_counts(weights.sum(axis=0), layout[1], min_cells),
+            ),
+        )
+
     def tile_index(self, rank: int):
         return 0
 
@@ -176,6 +285,10 @@ class TilePartitioner(Partitioner):
         Returns:
             extent: shape of full tile representation
         """
+        if self.subtile_cell_counts is not None:
+            return tile_extent_from_cell_counts(
+                rank_metadata.dims, rank_metadata.extent, self.subtile_cell_counts
+            )
         return tile_extent_from_rank_metadata(
             rank_metadata.dims, rank_metadata.extent, self.layout
         )
@@ -201,6 +314,7 @@ class TilePartitioner(Partitioner):
             subtile_index=self.subtile_index(rank),
             edge_interior_ratio=self.edge_interior_ratio,
             overlap=True,
+            subtile_cell_counts=self.subtile_cell_counts,
         )
         return tuple(item.stop - item.start for item in rank_slice)
 
@@ -236,6 +350,7 @@ class TilePartitioner(Partitioner):
             subtile_index=self.subtile_index(rank),
             edge_interior_ratio=self.edge_interior_ratio,
             overlap=overlap,
+            subtile_cell_counts=self.subtile_cell_counts,
         )
 
     def on_tile_top(self, rank: int) -> bool:
@@ -380,6 +495,53 @@ class CubedSpherePartitioner(Partitioner):
         if not isinstance(tile, TilePartitioner):
             raise TypeError("tile must be a TilePartitioner")
         self.tile = tile
+        if tile.subtile_cell_counts is not None:
+            self._ensure_matching_edges()
+
+    @classmethod
+    def from_weights(
+        cls,
+        weights: np.ndarray,
+        layout: Tuple[int, int],
+        min_cells: int = constants.N_HALO_DEFAULT,
+    ) -> "CubedSpherePartitioner":
+        """Create a CubedSpherePartitioner balancing the cost of its subtiles.
+
+        All tiles share one decomposition, the same along both axes and
+        symmetric so that subtile edges match across tile edges. It balances
+        the cost summed over tiles, axes and mirrored positions.
+
+        Args:
+            weights: (tile, y, x) cost of each cell center of the cube
+            layout: the (y, x) number of ranks along each tile axis
+            min_cells: minimum number of cell centers along each subtile axis,
+                at least the halo width for halo updates to work
+        """
+        weights = np.asarray(weights)
+        costs = weights.sum(axis=(0, 1)) + weights.sum(axis=(0, 2))
+        counts = balanced_cell_counts(costs + costs[::-1], layout[0], min_cells)
+        return cls(TilePartitioner(layout, subtile_cell_counts=(counts, counts)))
+
+    def _ensure_matching_edges(self) -> None:
+        """Check each subtile edge has the same length as the edge it borders."""
+        counts = self.tile.subtile_cell_counts
+        topology = self.topology
+        ranks = np.arange(self.total_ranks) % self.tile.total_ranks
+        lengths = (
+            np.asarray(counts[0])[ranks // self.layout[1]],
+            np.asarray(counts[1])[ranks % self.layout[1]],
+        )
+        for boundary_type, axis in ((WEST, 0), (EAST, 0), (NORTH, 1), (SOUTH, 1)):
+            to_rank = topology.to_rank[:, boundary_type]
+            rotated = topology.n_clockwise_rotations[:, boundary_type] % 2 == 1
+            to_length = np.where(
+                rotated, lengths[1 - axis][to_rank], lengths[axis][to_rank]
+            )
+            if np.any(lengths[axis] != to_length):
+                raise ValueError(
+                    f"subtile_cell_counts {counts} give subtile edges which do "
+                    "not match across tile edges"
+                )
 
     @classmethod
     def from_namelist(cls, namelist):
@@ -622,9 +784,7 @@ class CubedSpherePartitioner(Partitioner):
         Returns:
             extent: shape of full cube representation
         """
-        return (6,) + tile_extent_from_rank_metadata(
-            rank_metadata.dims, rank_metadata.extent, self.layout
-        )
+        return (6,) + self.tile.global_extent(rank_metadata)
 
     def subtile_extent(
         self,
@@ -682,6 +842,337 @@ class CubedSpherePartitioner(Partitioner):
         )
 
 
+BOUNDARY_OFFSETS = {
+    # (y, x) offset of the neighbor of a rank within the tile interior
+    WEST: (0, -1),
+    EAST: (0, 1),
+    NORTH: (1, 0),
+    SOUTH: (-1, 0),
+    NORTHWEST: (1, -1),
+    NORTHEAST: (1, 1),
+    SOUTHWEST: (-1, -1),
+    SOUTHEAST: (-1, 1),
+}
+
+
+class PartitionerTopology:
+    """Boundaries of all ranks of a partitioner, stored as arrays.
+
+    Ranks away from tile edges are handled with array arithmetic, only ranks
+    on tile edges go through the boundary logic of the partitioner. Lookups
+    are then constant time, and the tables can be saved and loaded to skip
+    this work entirely. Rank slices and extents of a quantity are computed
+    for all ranks at once by subtile_slices and subtile_extents.
+    """
+
+    def __init__(
+        self,
+        layout: Tuple[int, int],
+        n_tiles: int,
+        to_rank: np.ndarray,
+        n_clockwise_rotations: np.ndarray,
+        edge_interior_ratio: float = 1.0,
+        subtile_cell_counts: Optional[SubtileCellCounts] = None,
+    ):
+        """
+        Args:
+            layout: the (y, x) number of ranks along each tile axis
+            n_tiles: number of tiles, 6 for a cubed sphere and 1 for a tile
+            to_rank: (rank, boundary_type) table of neighbor ranks, -1 where
+                there is no boundary
+            n_clockwise_rotations: (rank, boundary_type) table of rotations
+            edge_interior_ratio: as for TilePartitioner
+            subtile_cell_counts: as for TilePartitioner
+        """
+        self.layout = (int(layout[0]), int(layout[1]))
+        self.n_tiles = n_tiles
+        self.to_rank = to_rank
+        self.n_clockwise_rotations = n_clockwise_rotations
+        self.edge_interior_ratio = edge_interior_ratio
+        self.subtile_cell_counts = subtile_cell_counts
+
+    @classmethod
+    def from_partitioner(cls, partitioner: Partitioner) -> "PartitionerTopology":
+        layout = partitioner.layout
+        n_tiles = partitioner.total_ranks // (layout[0] * layout[1])
+        ranks = np.arange(partitioner.total_ranks)
+        tile_ranks = ranks % (layout[0] * layout[1])
+        j, i = tile_ranks // layout[1], tile_ranks % layout[1]
+        n_boundary_types = len(constants.BOUNDARY_TYPES)
+        to_rank = np.full((len(ranks), n_boundary_types), -1, dtype=np.int64)
+        rotations = np.zeros((len(ranks), n_boundary_types), dtype=np.int8)
+        interior = (0 < j) & (j < layout[0] - 1) & (0 < i) & (i < layout[1] - 1)
+        for boundary_type, (j_offset, i_offset) in BOUNDARY_OFFSETS.items():
+            to_rank[interior, boundary_type] = (
+                ranks[interior] + j_offset * layout[1] + i_offset
+            )
+        for rank in ranks[~interior]:
+            for boundary_type in constants.BOUNDARY_TYPES:
+                boundary = partitioner.boundary(boundary_type, int(rank))
+                if boundary is not None:
+                    to_rank[rank, boundary_type] = boundary.to_rank
+                    rotations[rank, boundary_type] = boundary.n_clockwise_rotations
+        return cls(
+            layout,
+            n_tiles,
+            to_rank,
+            rotations,
+            edge_interior_ratio=partitioner.tile.edge_interior_ratio,
+            subtile_cell_counts=partitioner.tile.subtile_cell_counts,
+        )
+
+    @property
+    def total_ranks(self) -> int:
+        return len(self.to_rank)
+
+    def boundary(self, boundary_type: int, rank: int) -> Optional[bd.SimpleBoundary]:
+        """Returns a boundary of the requested type for a given rank, or None."""
+        to_rank = int(self.to_rank[rank, boundary_type])
+        if to_rank < 0:
+            return None
+        return bd.SimpleBoundary(
+            boundary_type=boundary_type,
+            from_rank=rank,
+            to_rank=to_rank,
+            n_clockwise_rotations=int(self.n_clockwise_rotations[rank, boundary_type]),
+        )
+
+    def boundaries(self, rank: int) -> Dict[int, bd.SimpleBoundary]:
+        """All boundaries of a rank, by boundary type."""
+        boundaries = {}
+        for boundary_type in constants.BOUNDARY_TYPES:
+            boundary = self.boundary(boundary_type, rank)
+            if boundary is not None:
+                boundaries[boundary_type] = boundary
+        return boundaries
+
+    def subtile_slices(
+        self,
+        global_dims: Sequence[str],
+        global_extent: Sequence[int],
+        overlap: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the subtile slices of all ranks on an array.
+
+        Args:
+            global_dims: dimensions of the global quantity being partitioned,
+                the tile dimension first if partitioning a cubed sphere
+            global_extent: extent of the global quantity being partitioned
+            overlap (optional): as for Partitioner.subtile_slice
+
+        Returns:
+            start: (rank, dimension) array of slice starts
+            stop: (rank, dimension) array of slice stops
+        """
+        return rank_slices_from_tile_metadata(
+            global_dims,
+            extent=global_extent,
+            layout=self.layout,
+            total_ranks=self.total_ranks,
+            edge_interior_ratio=self.edge_interior_ratio,
+            overlap=overlap,
+            subtile_cell_counts=self.subtile_cell_counts,
+        )
+
+    def subtile_extents(self, global_metadata: QuantityMetadata) -> np.ndarray:
+        """Return the (rank, dimension) array of the extents of all ranks.
+
+        As for Partitioner.subtile_extent, the tile dimension is not included.
+        """
+        start, stop = self.subtile_slices(
+            global_metadata.dims, global_metadata.extent, overlap=True
+        )
+        keep = [dim != constants.TILE_DIM for dim in global_metadata.dims]
+        return (stop - start)[:, keep]
+
+    def dump(self, file: BinaryIO):
+        # cell counts are stored empty if not given
+        y_cell_counts, x_cell_counts = self.subtile_cell_counts or ((), ())
+        np.savez(
+            file,
+            layout=np.asarray(self.layout),
+            n_tiles=self.n_tiles,
+            to_rank=self.to_rank,
+            n_clockwise_rotations=self.n_clockwise_rotations,
+            edge_interior_ratio=self.edge_interior_ratio,
+            y_cell_counts=np.asarray(y_cell_counts, dtype=np.int64),
+            x_cell_counts=np.asarray(x_cell_counts, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, file: BinaryIO) -> "PartitionerTopology":
+        with np.load(file) as data:
+            subtile_cell_counts: Optional[SubtileCellCounts] = None
+            if len(data["y_cell_counts"]) > 0:
+                subtile_cell_counts = (
+                    tuple(int(count) for count in data["y_cell_counts"]),
+                    tuple(int(count) for count in data["x_cell_counts"]),
+                )
+            return cls(
+                layout=tuple(data["layout"]),
+                n_tiles=int(data["n_tiles"]),
+                to_rank=data["to_rank"],
+                n_clockwise_rotations=data["n_clockwise_rotations"],
+                edge_interior_ratio=float(data["edge_interior_ratio"]),
+                subtile_cell_counts=subtile_cell_counts,
+            )
+
+
+@functools.lru_cache(maxsize=DEFAULT_CACHE_SIZE)
+def _get_topology(partitioner: Partitioner) -> PartitionerTopology:
+    return PartitionerTopology.from_partitioner(partitioner)
+
+
+RANK_ORDERINGS = ("linear", "tile_blocked", "hilbert")
+
+
+class RankMap:
+    """Assignment of the subtiles of a CubedSpherePartitioner to ranks, so that
+    most halo neighbors share a node.
+
+    Ranks are assumed to be placed on nodes in blocks of ranks_per_node
+    consecutive ranks. Subtiles are ordered along a curve within each tile,
+    and consecutive ranks get consecutive subtiles of that order:
+
+    - "linear": the default partitioner order, rows of subtiles
+    - "tile_blocked": rectangular blocks of ranks_per_node subtiles, falling
+      back to "hilbert" if such blocks don't tile the layout
+    - "hilbert": a Hilbert space-filling curve
+
+    The partition rank of a rank is its rank in the partitioner, use it as the
+    key to Split the communicator (see CubedSphereCommunicator.from_rank_map)
+    so all rank-based partitioner queries follow the mapping.
+    """
+
+    def __init__(
+        self,
+        partitioner: CubedSpherePartitioner,
+        ranks_per_node: int,
+        ordering: str = "tile_blocked",
+    ):
+        """
+        Args:
+            partitioner: partitioner of the cubed sphere
+            ranks_per_node: number of consecutive ranks sharing a node
+            ordering: one of "linear", "tile_blocked" or "hilbert"
+        """
+        if ordering not in RANK_ORDERINGS:
+            raise ValueError(
+                f"ordering must be one of {RANK_ORDERINGS}, got {ordering}"
+            )
+        if ranks_per_node < 1:
+            raise ValueError(f"ranks_per_node must be positive, got {ranks_per_node}")
+        self.partitioner = partitioner
+        self.ranks_per_node = ranks_per_node
+        self.ordering = ordering
+        tile_order = _tile_rank_order(partitioner.layout, ranks_per_node, ordering)
+        ranks_per_tile = partitioner.tile.total_ranks
+        self._partition_ranks = [
+            tile * ranks_per_tile + tile_rank
+            for tile in range(6)
+            for tile_rank in tile_order
+        ]
+        self._ranks = [0] * len(self._partition_ranks)
+        for rank, partition_rank in enumerate(self._partition_ranks):
+            self._ranks[partition_rank] = rank
+
+    def partition_rank(self, rank: int) -> int:
+        """Rank in the partitioner of the subtile assigned to a rank."""
+        return self._partition_ranks[rank]
+
+    def rank(self, partition_rank: int) -> int:
+        """Rank assigned to the subtile of a partition rank."""
+        return self._ranks[partition_rank]
+
+    def node(self, partition_rank: int) -> int:
+        """Node of the rank assigned to the subtile of a partition rank."""
+        return self.rank(partition_rank) // self.ranks_per_node
+
+    def edges(self) -> np.ndarray:
+        """Pairs of partition ranks sharing a subtile edge, each listed once."""
+        to_rank = self.partitioner.topology.to_rank[:, [WEST, EAST, NORTH, SOUTH]]
+        from_rank = np.broadcast_to(np.arange(len(to_rank))[:, None], to_rank.shape)
+        pairs = np.stack([from_rank.ravel(), to_rank.ravel()], axis=1)
+        pairs = pairs[(pairs[:, 1] >= 0) & (pairs[:, 0] != pairs[:, 1])]
+        return np.unique(np.sort(pairs, axis=1), axis=0)
+
+    def inter_node_edge_count(self) -> int:
+        """Number of subtile edges whose two ranks are on different nodes."""
+        nodes = np.asarray(self._ranks) // self.ranks_per_node
+        edges = self.edges()
+        return int(np.sum(nodes[edges[:, 0]] != nodes[edges[:, 1]]))
+
+
+def _tile_rank_order(
+    layout: Tuple[int, int], ranks_per_node: int, ordering: str
+) -> List[int]:
+    """Ranks within a tile in the order they are assigned."""
+    if ordering == "tile_blocked":
+        block = _node_block(layout, ranks_per_node)
+        if block is not None:
+            return _blocked_order(layout, block)
+        ordering = "hilbert"
+    if ordering == "hilbert":
+        return _hilbert_order(layout)
+    return list(range(layout[0] * layout[1]))
+
+
+def _node_block(
+    layout: Tuple[int, int], ranks_per_node: int
+) -> Optional[Tuple[int, int]]:
+    """Most square (y, x) block of ranks_per_node subtiles tiling the layout."""
+    blocks = [
+        (ranks_per_node // width, width)
+        for width in range(1, layout[1] + 1)
+        if ranks_per_node % width == 0
+        and layout[1] % width == 0
+        and layout[0] % (ranks_per_node // width) == 0
+    ]
+    if len(blocks) == 0:
+        return None
+    return min(blocks, key=lambda block: abs(block[0] - block[1]))
+
+
+def _blocked_order(layout: Tuple[int, int], block: Tuple[int, int]) -> List[int]:
+    order = []
+    for block_j in range(0, layout[0], block[0]):
+        for block_i in range(0, layout[1], block[1]):
+            for j in range(block_j, block_j + block[0]):
+                for i in range(block_i, block_i + block[1]):
+                    order.append(j * layout[1] + i)
+    return order
+
+
+def _hilbert_order(layout: Tuple[int, int]) -> List[int]:
+    size = 1
+    while size < max(layout):
+        size *= 2
+    order = []
+    for distance in range(size * size):
+        i, j = _hilbert_point(size, distance)
+        if j < layout[0] and i < layout[1]:
+            order.append(j * layout[1] + i)
+    return order
+
+
+def _hilbert_point(size: int, distance: int) -> Tuple[int, int]:
+    """Point at a distance along the Hilbert curve filling a size x size square."""
+    x = y = 0
+    scale = 1
+    while scale < size:
+        rx = 1 & (distance // 2)
+        ry = 1 & (distance ^ rx)
+        if ry == 0:
+            if rx == 1:
+                x, y = scale - 1 - x, scale - 1 - y
+            x, y = y, x
+        x += scale * rx
+        y += scale * ry
+        distance //= 4
+        scale *= 2
+    return x, y
+
+
 def on_tile_left(subtile_index: Tuple[int, int]) -> bool:
     return subtile_index[1] == 0
 
@@ -797,6 +1288,117 @@ def tile_extent_from_rank_metadata(
     return extent_from_metadata(dims, rank_extent, layout_factors)
 
 
+def tile_extent_from_cell_counts(
+    dims: Sequence[str],
+    rank_extent: Sequence[int],
+    subtile_cell_counts: SubtileCellCounts,
+) -> Tuple[int, ...]:
+    """
+    Returns the extent of a tile decomposed into subtiles of the given number
+    of cell centers, given the extent of a single rank for non-horizontal
+    dimensions.
+    """
+    return_extents = []
+    for dim, extent in zip(dims, rank_extent):
+        if dim in constants.Y_DIMS:
+            extent = sum(subtile_cell_counts[0])
+        elif dim in constants.X_DIMS:
+            extent = sum(subtile_cell_counts[1])
+        if dim in constants.HORIZONTAL_DIMS and dim in constants.INTERFACE_DIMS:
+            extent += 1
+        return_extents.append(extent)
+    return tuple(return_extents)
+
+
+def balanced_cell_counts(
+    costs: np.ndarray, n_subtiles: int, min_cells: int = 1
+) -> Tuple[int, ...]:
+    """
+    Returns the number of cells of each of n_subtiles consecutive subtiles
+    which best balance the total cost of their cells.
+
+    Args:
+        costs: cost of each cell along an axis
+        n_subtiles: number of subtiles along the axis
+        min_cells: minimum number of cells of a subtile
+    """
+    n_cells = len(costs)
+    if n_cells < n_subtiles * min_cells:
+        raise ValueError(
+            f"cannot split {n_cells} cells into {n_subtiles} subtiles of at "
+            f"least {min_cells} cells"
+        )
+    cumulative_costs = np.cumsum(costs, dtype=np.float64)
+    ends: List[int] = []
+    start = 0
+    for n_remaining in range(n_subtiles, 1, -1):
+        start_cost = cumulative_costs[start - 1] if start > 0 else 0.0
+        # the next subtile takes an equal share of the remaining cost
+        target = start_cost + (cumulative_costs[-1] - start_cost) / n_remaining
+        earliest = start + min_cells
+        latest = n_cells - (n_remaining - 1) * min_cells
+        candidates = cumulative_costs[earliest - 1 : latest]
+        start = earliest + int(np.abs(candidates - target).argmin())
+        ends.append(start)
+    return tuple(int(count) for count in np.diff([0] + ends + [n_cells]))
+
+
+def rank_slices_from_tile_metadata(
+    dims: Sequence[str],
+    *,
+    extent: Sequence[int],
+    layout: Tuple[int, int],
+    total_ranks: int,
+    edge_interior_ratio: float,
+    overlap: bool,
+    subtile_cell_counts: Optional[SubtileCellCounts] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the slices of all ranks on a tile or cube, as (rank, dimension)
+    arrays of slice starts and stops. A tile dimension is sliced to the tile
+    of each rank.
+    """
+    tile_ranks = np.arange(total_ranks) % (layout[0] * layout[1])
+    position = {
+        "y": tile_ranks // layout[1],
+        "x": tile_ranks % layout[1],
+    }
+    axis_slices = {
+        axis: [
+            rank_slice_from_tile_metadata(
+                dims,
+                extent=extent,
+                layout=layout,
+                subtile_index=(index, 0) if axis == "y" else (0, index),
+                edge_interior_ratio=edge_interior_ratio,
+                overlap=overlap,
+                subtile_cell_counts=subtile_cell_counts,
+            )
+            for index in range(layout[0 if axis == "y" else 1])
+        ]
+        for axis in ("y", "x")
+    }
+    start = np.zeros((total_ranks, len(dims)), dtype=np.int64)
+    stop = np.zeros((total_ranks, len(dims)), dtype=np.int64)
+    i_slice = 0
+    for i_dim, dim in enumerate(dims):
+        if dim == constants.TILE_DIM:
+            start[:, i_dim] = np.arange(total_ranks) // (layout[0] * layout[1])
+            stop[:, i_dim] = start[:, i_dim] + 1
+            continue
+        axis = "y" if dim in constants.Y_DIMS else "x"
+        starts = np.array([item[i_slice].start for item in axis_slices[axis]])
+        stops = np.array([item[i_slice].stop for item in axis_slices[axis]])
+        if dim in constants.HORIZONTAL_DIMS:
+            start[:, i_dim] = starts[position[axis]]
+            stop[:, i_dim] = stops[position[axis]]
+        else:
+            start[:, i_dim] = starts[0]
+            stop[:, i_dim] = stops[0]
+        i_slice += 1
+    return start, stop
+
+
 def rank_slice_from_tile_metadata(
     dims: Sequence[str],
     *,
@@ -805,6 +1407,7 @@ def rank_slice_from_tile_metadata(
     subtile_index: Tuple[int, int],
     edge_interior_ratio: float,
     overlap: bool,
+    subtile_cell_counts: Optional[SubtileCellCounts] = None,
 ) -> Tuple[slice, ...]:
     return _rank_slice_from_tile_metadata_cached(
         dims=tuple(dims),
@@ -813,6 +1416,7 @@ def rank_slice_from_tile_metadata(
         subtile_index=tuple(subtile_index),
         edge_interior_ratio=edge_interior_ratio,
         overlap=overlap,
+        subtile_cell_counts=subtile_cell_counts,
     )
 
 
@@ -825,36 +1429,57 @@ def _rank_slice_from_tile_metadata_cached(
     subtile_index: Tuple[int, int],
     edge_interior_ratio: float,
     overlap: bool,
+    subtile_cell_counts: Optional[SubtileCellCounts],
 ) -> Tuple[slice, ...]:
     # detect if one of the given dims is the tile dimension and ignore it
     cartesian_dims = discard_dimension(dims, constants.TILE_DIM, data=dims)
     cartesian_extent = discard_dimension(dims, constants.TILE_DIM, data=extent)
 
-    interior_extents, edge_extents = _subtile_extents_from_tile_metadata(
-        cartesian_dims, cartesian_extent, layout, edge_interior_ratio
-    )
+    if subtile_cell_counts is None:
+        interior_extents, edge_extents = _subtile_extents_from_tile_metadata(
+            cartesian_dims, cartesian_extent, layout, edge_interior_ratio
+        )
+    else:
+        # only used for non-horizontal dimensions, which are not decomposed
+        interior_extents = edge_extents = tuple(
+            size - 1 if dim in constants.INTERFACE_DIMS else size
+            for dim, size in zip(cartesian_dims, cartesian_extent)
+        )
     return_slice = []
 
-    for dim, dim_interior_extent, dim_edge_extent in zip(
-        cartesian_dims, interior_extents, edge_extents
+    for dim, dim_extent, dim_interior_extent, dim_edge_extent in zip(
+        cartesian_dims, cartesian_extent, interior_extents, edge_extents
     ):
         if dim in constants.HORIZONTAL_DIMS:
             if dim in constants.Y_DIMS:
-                index = subtile_index[0]
-                n_ranks = layout[0]
+                axis = 0
+            else:
+                axis = 1
+            index = subtile_index[axis]
+            n_ranks = layout[axis]
+            if subtile_cell_counts is not None:
+                counts = subtile_cell_counts[axis]
+                n_cells = dim_extent
+                if dim in constants.INTERFACE_DIMS:
+                    n_cells -= 1
+                if n_cells != sum(counts):
+                    raise ValueError(
+                        f"dimension {dim} has {n_cells} cell centers, but the "
+                        f"subtile_cell_counts {counts} add up to {sum(counts)}"
+                    )
+                start = sum(counts[:index])
+                end = start + counts[index]
             else:
-                index = subtile_index[1]
-                n_ranks = layout[1]
-            start, end = 0, 0
-            for i in range(index + 1):
-                if i == 0:
-                    end += dim_edge_extent
-                elif i == n_ranks - 1:
-                    start = end
-                    end += dim_edge_extent
-                else:
-                    start = end
-                    end += dim_interior_extent
+                start, end = 0, 0
+                for i in range(index + 1):
+                    if i == 0:
+                        end += dim_edge_extent
+                    elif i == n_ranks - 1:
+                        start = end
+                        end += dim_edge_extent
+                    else:
+                        start = end
+                        end += dim_interior_extent
             if dim in constants.INTERFACE_DIMS and (overlap or (index == n_ranks - 1)):
                 end += 1
         else:
@@ -1008,6 +1633,7 @@ def subtile_slice(
     subtile_index: Tuple[int, int],
     edge_interior_ratio: float = 1.0,
     overlap: bool = False,
+    subtile_cell_counts: Optional[SubtileCellCounts] = None,
 ) -> Tuple[slice, ...]:
     """
     Returns the slice of data within a tile's computational domain belonging
@@ -1028,6 +1654,8 @@ def subtile_slice(
             of the array shared by adjacent ranks in both ranks. If False, ensure
             only one of those ranks (the greater rank) is assigned the overlapping
             section. Default is False.
+        subtile_cell_counts (optional): the (y, x) number of cell centers of
+            each subtile row and column, see TilePartitioner
     """
     return rank_slice_from_tile_metadata(
         dims=dims,
@@ -1036,4 +1664,5 @@ def subtile_slice(
         subtile_index=subtile_index,
         edge_interior_ratio=edge_interior_ratio,
         overlap=overlap,
+        subtile_cell_counts=subtile_cell_counts,
     )
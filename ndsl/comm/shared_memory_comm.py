@@ -0,0 +1,628 @@
+import collections
+import functools
+import multiprocessing
+import multiprocessing.connection
+import operator
+import pickle
+import queue
+import time
+import traceback
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
+
+from ndsl.comm.comm_abc import Comm, Request
+from ndsl.comm.local_comm import ConcurrencyError
+from ndsl.types import Allocator, NumpyModule
+from ndsl.utils import ensure_contiguous, safe_assign_array
+
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = 60.0
+
+# segments start with a flag byte, padded so the payload stays aligned
+_HEADER_BYTES = 64
+_FREE = 0
+_FULL = 1
+# seconds between checks of sent segments being freed
+_POLL_INTERVAL = 1e-4
+
+# tags of the collectives, user tags are non-negative
+_BCAST_TAG = -1
+_BARRIER_TAG = -2
+_SCATTER_TAG = -3
+_GATHER_TAG = -4
+_SCATTERV_TAG = -5
+_GATHERV_TAG = -6
+_ALLGATHER_TAG = -7
+
+_ARRAY = "array"
+_OBJECT = "object"
+_INLINE_OBJECT = "inline_object"
+# objects up to this size go through the pipe, well below its buffer size
+_MAX_INLINE_BYTES = 4096
+
+# (communicator context, source world rank, tag)
+_Key = Tuple[Tuple[Any, ...], int, int]
+
+
+def _attach(name: str) -> SharedMemory:
+    shm = SharedMemory(name=name)
+    # the sending rank owns and unlinks the segment, not this process
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+    return shm
+
+
+def _capacity(nbytes: int) -> int:
+    """Segment size for a payload, rounded up so segments get re-used."""
+    return 1 << max(nbytes - 1, 0).bit_length()
+
+
+def _address(array) -> int:
+    return array.__array_interface__["data"][0]
+
+
+def _release(buffers: Dict[int, Any], address: int, shm: SharedMemory):
+    if buffers.get(address, (None,))[0] is shm:
+        del buffers[address]
+    # the memory is unmapped once the segment is garbage collected
+    shm.unlink()
+
+
+class _PostedRecv:
+    """Array receive waiting for its message."""
+
+    def __init__(self, recvbuf):
+        self.recvbuf = recvbuf
+        self.done = False
+
+
+class _Endpoint:
+    """Messaging of one process, shared by all its communicators.
+
+    Arrays and large objects live in shared memory segments owned by the
+    sender, and a small control message naming the segment is sent through a
+    pipe per pair of ranks. A segment is flagged full when sent and free once
+    the receiver copied it out. Arrays allocated with zeros are segments
+    themselves and are sent without a copy, other data is first copied into
+    a segment re-used once free. Small objects go through the pipe directly.
+
+    Receives are matched in the order they were posted. Waiting on a request
+    progresses all posted receives, so ranks waiting for their sends to be
+    received by each other don't deadlock.
+    """
+
+    def __init__(self, rank: int, pipes: Dict[Tuple[int, int], Any], timeout: float):
+        """
+        Args:
+            rank: rank of this process
+            pipes: (reader, writer) connections by (source, dest) rank pair
+            timeout: seconds a request may block before failing
+        """
+        self.rank = rank
+        self._pipes = pipes
+        self._readers = [
+            reader for (_, dest), (reader, _) in pipes.items() if dest == rank
+        ]
+        self._timeout = timeout
+        self._pending: Dict[_Key, Deque[Tuple[str, Any]]] = {}
+        self._posted: Dict[_Key, Deque[_PostedRecv]] = {}
+        self._segments: Dict[Tuple[int, int], List[SharedMemory]] = {}
+        self._buffers: Dict[int, Tuple[SharedMemory, int, weakref.finalize]] = {}
+        self._attached: Dict[str, SharedMemory] = {}
+
+    def zeros(self, shape, dtype=float) -> np.ndarray:
+        """Allocate an array sent by this endpoint without a copy.
+
+        Its segment is unlinked once the array is garbage collected.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        shm = SharedMemory(create=True, size=_HEADER_BYTES + max(nbytes, 1))
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=_HEADER_BYTES)
+        array[...] = 0
+        address = _address(array)
+        release = weakref.finalize(array, _release, self._buffers, address, shm)
+        self._buffers[address] = (shm, nbytes, release)
+        return array
+
+    def _segment(self, dest: int, nbytes: int) -> SharedMemory:
+        segments = self._segments.setdefault((dest, _capacity(nbytes)), [])
+        for shm in segments:
+            if shm.buf[0] == _FREE:
+                return shm
+        shm = SharedMemory(create=True, size=_HEADER_BYTES + _capacity(nbytes))
+        segments.append(shm)
+        return shm
+
+    def _own_buffer(self, array) -> Optional[SharedMemory]:
+        """Segment of an array allocated by zeros, if it can be sent as is."""
+        shm, nbytes, _ = self._buffers.get(_address(array), (None, 0, None))
+        if (
+            shm is None
+            or nbytes != array.nbytes
+            or not array.flags.c_contiguous
+            or shm.buf[0] != _FREE
+        ):
+            return None
+        return shm
+
+    def _send(
+        self, dest: int, key: _Key, kind: str, array, copy: bool = True
+    ) -> Optional[SharedMemory]:
+        ensure_contiguous(array)
+        shm = None if copy else self._own_buffer(array)
+        sent = shm
+        if shm is None:
+            shm = self._segment(dest, array.size * array.dtype.itemsize)
+            payload = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=shm.buf, offset=_HEADER_BYTES
+            )
+            safe_assign_array(payload, array)
+            del payload  # the segment can't be closed while views exist
+        shm.buf[0] = _FULL
+        _, writer = self._pipes[(self.rank, dest)]
+        writer.send((key, kind, shm.name, tuple(array.shape), array.dtype.str))
+        return sent
+
+    def send_array(self, dest: int, key: _Key, array):
+        """Send a copy of an array, complete when returning."""
+        self._send(dest, key, _ARRAY, array)
+
+    def isend_array(self, dest: int, key: _Key, array) -> Optional[SharedMemory]:
+        """Send an array, returning its segment if sent without a copy.
+
+        Such an array must not be modified until the segment is free.
+        """
+        return self._send(dest, key, _ARRAY, array, copy=False)
+
+    def send_object(self, dest: int, key: _Key, value: Any):
+        data = pickle.dumps(value)
+        if len(data) <= _MAX_INLINE_BYTES:
+            _, writer = self._pipes[(self.rank, dest)]
+            writer.send((key, _INLINE_OBJECT, data))
+        else:
+            self._send(dest, key, _OBJECT, np.frombuffer(data, np.uint8))
+
+    def _deliver(self, key: _Key, kind: str, payload):
+        posted = self._posted.get(key)
+        if posted:
+            self._complete(posted.popleft(), kind, payload)
+        else:
+            self._pending.setdefault(key, collections.deque()).append((kind, payload))
+
+    def _progress(self):
+        """Receive the messages sent so far and complete the posted receives."""
+        for reader in self._readers:
+            while reader.poll():
+                key, kind, *payload = reader.recv()
+                self._deliver(key, kind, payload)
+
+    def wait_until(self, done: Callable[[], bool], description: str):
+        deadline = time.monotonic() + self._timeout
+        while True:
+            self._progress()
+            if done():
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ConcurrencyError(f"rank {self.rank} timed out {description}")
+            # freed segments don't notify, so poll them at a short interval
+            multiprocessing.connection.wait(
+                self._readers, timeout=min(remaining, _POLL_INTERVAL)
+            )
+
+    def _read(self, kind: str, payload, receive: Callable[[np.ndarray], Any]):
+        name, shape, dtype = payload
+        if name not in self._attached:
+            self._attached[name] = _attach(name)
+        shm = self._attached[name]
+        data = np.ndarray(
+            shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=_HEADER_BYTES
+        )
+        result = receive(data)
+        del data
+        shm.buf[0] = _FREE
+        return result
+
+    def _complete(self, posted: _PostedRecv, kind: str, payload):
+        if kind != _ARRAY:
+            raise TypeError(f"expected {_ARRAY} message, got {kind}")
+        recvbuf = posted.recvbuf
+
+        def receive(data: np.ndarray):
+            if data.shape != recvbuf.shape and data.size == recvbuf.size:
+                # MPI transfers raw items, e.g. into a flat buffer
+                data = data.reshape(recvbuf.shape)
+            safe_assign_array(recvbuf, data)
+
+        self._read(kind, payload, receive)
+        posted.done = True
+
+    def irecv_array(self, key: _Key, recvbuf) -> _PostedRecv:
+        posted = _PostedRecv(recvbuf)
+        pending = self._pending.get(key)
+        if pending:
+            self._complete(posted, *pending.popleft())
+        else:
+            self._posted.setdefault(key, collections.deque()).append(posted)
+        return posted
+
+    def recv_array(self, key: _Key, recvbuf):
+        posted = self.irecv_array(key, recvbuf)
+        self.wait_recv(key, posted)
+
+    def wait_recv(self, key: _Key, posted: _PostedRecv):
+        self.wait_until(
+            lambda: posted.done,
+            f"receiving from rank {key[1]} with tag {key[2]}",
+        )
+
+    def wait_send(self, shm: SharedMemory):
+        self.wait_until(lambda: shm.buf[0] == _FREE, "waiting for a send")
+
+    def recv_object(self, key: _Key) -> Any:
+        self.wait_until(
+            lambda: bool(self._pending.get(key)),
+            f"receiving from rank {key[1]} with tag {key[2]}",
+        )
+        kind, payload = self._pending[key].popleft()
+        if kind == _INLINE_OBJECT:
+            return pickle.loads(payload[0])
+        elif kind != _OBJECT:
+            raise TypeError(f"expected {_OBJECT} message for {key}, got {kind}")
+        return self._read(kind, payload, lambda data: pickle.loads(data.tobytes()))
+
+    def close(self):
+        """Release the shared memory, peers must be done receiving from this rank."""
+        for shm in self._attached.values():
+            shm.close()
+        for segments in self._segments.values():
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+        # arrays allocated by zeros may still be referenced, e.g. by the
+        # buffer cache, their memory is unmapped with them
+        for _, _, release in list(self._buffers.values()):
+            release()
+        self._attached.clear()
+        self._segments.clear()
+
+
+class _SendRequest(Request):
+    """Send complete once the receiver copied the segment sent without a copy."""
+
+    def __init__(self, endpoint: _Endpoint, shm: Optional[SharedMemory]):
+        self._endpoint = endpoint
+        self._shm = shm
+
+    def wait(self):
+        if self._shm is not None:
+            self._endpoint.wait_send(self._shm)
+            self._shm = None
+
+    def Test(self) -> bool:
+        return self._shm is None or self._shm.buf[0] == _FREE
+
+
+class _RecvRequest(Request):
+    def __init__(self, endpoint: _Endpoint, key: _Key, posted: _PostedRecv):
+        self._endpoint = endpoint
+        self._key = key
+        self._posted = posted
+
+    def wait(self):
+        self._endpoint.wait_recv(self._key, self._posted)
+
+    def Test(self) -> bool:
+        return self._posted.done
+
+
+class SharedMemoryComm(Comm):
+    """
+    Communicator between processes of a single node through shared memory.
+
+    Arrays live in shared memory segments of the sending rank and are
+    copied out by the receiving rank, only a small control message goes
+    through a pipe. Buffers from buffer_allocator, e.g. the pack buffers of
+    halo updates, are segments themselves: Isend posts them without a copy
+    and completes once the receiver copied them out. Other arrays are
+    copied into segments re-used once received, and their sends complete
+    when posted.
+
+    Use run_processes to run a function on all ranks.
+    """
+
+    def __init__(
+        self,
+        endpoint: _Endpoint,
+        world_ranks: List[int],
+        context: Tuple[Any, ...] = (),
+    ):
+        """
+        Args:
+            endpoint: messaging of this process
+            world_ranks: rank of the process of each rank of this communicator
+            context: identifies the communicator, so the messages of different
+                communicators don't match
+        """
+        self._endpoint = endpoint
+        self._world_ranks = world_ranks
+        self._context = context
+        self.rank = world_ranks.index(endpoint.rank)
+        self._n_splits = 0
+
+    def __repr__(self):
+        return (
+            f"SharedMemoryComm(rank={self.rank}, "
+            f"total_ranks={len(self._world_ranks)})"
+        )
+
+    def Get_rank(self):
+        return self.rank
+
+    def Get_size(self):
+        return len(self._world_ranks)
+
+    def _send_key(self, tag: int) -> _Key:
+        return (self._context, self._endpoint.rank, tag)
+
+    def _recv_key(self, source: int, tag: int) -> _Key:
+        return (self._context, self._world_ranks[source], tag)
+
+    def _send_object(self, value, dest: int, tag: int):
+        self._endpoint.send_object(self._world_ranks[dest], self._send_key(tag), value)
+
+    def _recv_object(self, source: int, tag: int):
+        return self._endpoint.recv_object(self._recv_key(source, tag))
+
+    def bcast(self, value, root=0):
+        if self.rank == root:
+            for rank in range(self.Get_size()):
+                if rank != root:
+                    self._send_object(value, rank, _BCAST_TAG)
+            return value
+        return self._recv_object(root, _BCAST_TAG)
+
+    def Barrier(self):
+        if self.rank == 0:
+            for rank in range(1, self.Get_size()):
+                self._recv_object(rank, _BARRIER_TAG)
+        else:
+            self._send_object(None, 0, _BARRIER_TAG)
+        self.bcast(None)
+
+    def barrier(self):
+        self.Barrier()
+
+    def Scatter(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(recvbuf)
+        if self.rank == root:
+            ensure_contiguous(sendbuf)
+            for rank in range(self.Get_size()):
+                if rank == root:
+                    safe_assign_array(recvbuf, sendbuf[rank])
+                else:
+                    self.Send(sendbuf[rank], rank, tag=_SCATTER_TAG)
+        else:
+            self.Recv(recvbuf, root, tag=_SCATTER_TAG)
+
+    def Gather(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(sendbuf)
+        if self.rank == root:
+            ensure_contiguous(recvbuf)
+            for rank in range(self.Get_size()):
+                if rank == root:
+                    safe_assign_array(recvbuf[rank, :], sendbuf)
+                else:
+                    self.Recv(recvbuf[rank, :], rank, tag=_GATHER_TAG)
+        else:
+            self.Send(sendbuf, root, tag=_GATHER_TAG)
+
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(recvbuf)
+        if self.rank == root:
+            array, counts = sendbuf
+            ensure_contiguous(array)
+            offset = 0
+            for rank, count in enumerate(counts):
+                segment = array[offset : offset + count]
+                if rank == root:
+                    safe_assign_array(recvbuf, segment)
+                else:
+                    self.Send(segment, rank, tag=_SCATTERV_TAG)
+                offset += count
+        else:
+            self.Recv(recvbuf, root, tag=_SCATTERV_TAG)
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(sendbuf)
+        if self.rank == root:
+            array, counts = recvbuf
+            ensure_contiguous(array)
+            offset = 0
+            for rank, count in enumerate(counts):
+                segment = array[offset : offset + count]
+                if rank == root:
+                    safe_assign_array(segment, sendbuf)
+                else:
+                    self.Recv(segment, rank, tag=_GATHERV_TAG)
+                offset += count
+        else:
+            self.Send(sendbuf, root, tag=_GATHERV_TAG)
+
+    def allgather(self, sendobj):
+        if self.rank == 0:
+            values = [sendobj] + [
+                self._recv_object(rank, _ALLGATHER_TAG)
+                for rank in range(1, self.Get_size())
+            ]
+        else:
+            self._send_object(sendobj, 0, _ALLGATHER_TAG)
+            values = None
+        return self.bcast(values)
+
+    def allreduce(self, sendobj, op=None) -> Any:
+        if op is None:
+            op = operator.add
+        return functools.reduce(op, self.allgather(sendobj))
+
+    def Send(self, sendbuf, dest, tag: int = 0, **kwargs):
+        self._endpoint.send_array(self._world_ranks[dest], self._send_key(tag), sendbuf)
+
+    def Isend(self, sendbuf, dest, tag: int = 0, **kwargs):
+        shm = self._endpoint.isend_array(
+            self._world_ranks[dest], self._send_key(tag), sendbuf
+        )
+        return _SendRequest(self._endpoint, shm)
+
+    def Recv(self, recvbuf, source, tag: int = 0, **kwargs):
+        ensure_contiguous(recvbuf)
+        self._endpoint.recv_array(self._recv_key(source, tag), recvbuf)
+
+    def Irecv(self, recvbuf, source, tag: int = 0, **kwargs):
+        ensure_contiguous(recvbuf)
+        key = self._recv_key(source, tag)
+        posted = self._endpoint.irecv_array(key, recvbuf)
+        return _RecvRequest(self._endpoint, key, posted)
+
+    def Waitany(self, requests: Sequence[Request]) -> int:
+        completed: List[int] = []
+
+        def any_completed() -> bool:
+            completed.extend(
+                index for index, request in enumerate(requests) if request.Test()
+            )
+            return bool(completed)
+
+        self._endpoint.wait_until(any_completed, "waiting for any request")
+        requests[completed[0]].wait()
+        return completed[0]
+
+    def buffer_allocator(self, numpy_module: NumpyModule) -> Allocator:
+        if numpy_module is np:
+            return self._endpoint.zeros
+        return numpy_module.zeros
+
+    def sendrecv(self, sendbuf, dest, **kwargs):
+        self._send_object(sendbuf, dest, kwargs.get("sendtag", 0))
+        return self._recv_object(kwargs.get("source", dest), kwargs.get("recvtag", 0))
+
+    def Split(self, color, key):
+        members = self.allgather((color, key))
+        world_ranks = [
+            self._world_ranks[rank]
+            for _, rank in sorted(
+                (member_key, rank)
+                for rank, (member_color, member_key) in enumerate(members)
+                if member_color == color
+            )
+        ]
+        context = self._context + ((self._n_splits, color),)
+        self._n_splits += 1
+        return SharedMemoryComm(self._endpoint, world_ranks, context)
+
+
+def _run_rank(
+    function: Callable[[SharedMemoryComm], Any],
+    rank: int,
+    total_ranks: int,
+    pipes: Dict[Tuple[int, int], Any],
+    results: Any,
+    timeout: float,
+):
+    endpoint = _Endpoint(rank, pipes, timeout)
+    comm = SharedMemoryComm(endpoint, list(range(total_ranks)))
+    try:
+        result = function(comm)
+        # peers may still be receiving from the segments of this rank
+        comm.Barrier()
+    except BaseException as err:
+        try:
+            pickle.dumps(err)
+        except Exception:
+            err = RuntimeError(traceback.format_exc())
+        results.put((rank, False, err))
+    else:
+        results.put((rank, True, result))
+    finally:
+        endpoint.close()
+
+
+def run_processes(
+    function: Callable[[SharedMemoryComm], T],
+    total_ranks: int,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> List[T]:
+    """Run a function on all ranks of a SharedMemoryComm, one process per rank.
+
+    Processes are forked, so the function does not need to be picklable,
+    but its results do.
+
+    Args:
+        function: called with the communicator of each rank in its own process
+        total_ranks: number of ranks
+        timeout: seconds a rank may block on the others before failing
+
+    Returns:
+        results of the function, by rank
+
+    Raises:
+        the exception of the first failing rank
+    """
+    context = multiprocessing.get_context("fork")
+    pipes = {
+        (source, dest): context.Pipe(duplex=False)
+        for source in range(total_ranks)
+        for dest in range(total_ranks)
+    }
+    results_queue = context.Queue()
+    processes = [
+        context.Process(
+            target=_run_rank,
+            args=(function, rank, total_ranks, pipes, results_queue, timeout),
+            name=f"SharedMemoryComm-{rank}",
+        )
+        for rank in range(total_ranks)
+    ]
+    for process in processes:
+        process.start()
+    results: Dict[int, Any] = {}
+    error: Optional[BaseException] = None
+    try:
+        while len(results) < total_ranks and error is None:
+            try:
+                rank, success, value = results_queue.get(timeout=0.1)
+            except queue.Empty:
+                for rank, process in enumerate(processes):
+                    if rank not in results and process.exitcode not in (None, 0):
+                        error = RuntimeError(
+                            f"rank {rank} exited with code {process.exitcode}"
+                        )
+                continue
+            if success:
+                results[rank] = value
+            else:
+                error = value
+    finally:
+        for process in processes:
+            if error is not None:
+                process.terminate()
+            process.join()
+    if error is not None:
+        raise error
+    return [results[rank] for rank in range(total_ranks)]
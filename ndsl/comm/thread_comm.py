@@ -0,0 +1,343 @@
+import collections
+import copy
+import functools
+import operator
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from ndsl.comm.comm_abc import Comm, Request
+from ndsl.comm.local_comm import ConcurrencyError
+from ndsl.utils import ensure_contiguous, safe_assign_array
+
+
+T = TypeVar("T")
+
+DEFAULT_TIMEOUT = 60.0
+
+
+class _Message:
+    def __init__(self, data):
+        self.data = data
+        self.received = threading.Event()
+
+
+class _PostedRecv:
+    def __init__(self, recvbuf):
+        # None to receive the sent object itself
+        self.recvbuf = recvbuf
+        self.data = None
+        self.done = threading.Event()
+
+
+def _frozen(array):
+    """Read-only view of a numpy array, other arrays are returned as is."""
+    if isinstance(array, np.ndarray):
+        array = array.view()
+        array.flags.writeable = False
+    return array
+
+
+def _deliver(message: _Message, recv: _PostedRecv):
+    if recv.recvbuf is None:
+        recv.data = message.data
+    else:
+        safe_assign_array(recv.recvbuf, message.data)
+    message.received.set()
+    recv.done.set()
+
+
+class _ThreadGroup:
+    """State shared by the ranks of a ThreadComm.
+
+    Messages are matched in order per (source, dest, tag), as with MPI. The
+    rank arriving second copies the data, so a posted receive is filled as
+    soon as the send is posted and the other way around.
+    """
+
+    def __init__(self, size: int, timeout: float):
+        self.size = size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._messages: Dict[Tuple[int, int, int], Deque[_Message]] = {}
+        self._receives: Dict[Tuple[int, int, int], Deque[_PostedRecv]] = {}
+        self._barrier = threading.Barrier(size, timeout=timeout)
+        self._slots: List[Any] = [None] * size
+        self._split_groups: Dict[Tuple[int, Any], "_ThreadGroup"] = {}
+        self._aborted = False
+
+    def abort(self):
+        """Make blocked and future calls of all ranks fail, e.g. when one crashed."""
+        self._aborted = True
+        self._barrier.abort()
+        with self._lock:
+            split_groups = list(self._split_groups.values())
+        for group in split_groups:
+            group.abort()
+
+    def send(self, source: int, dest: int, tag: int, message: _Message):
+        key = (source, dest, tag)
+        with self._lock:
+            receives = self._receives.get(key)
+            if not receives:
+                self._messages.setdefault(key, collections.deque()).append(message)
+                return
+            recv = receives.popleft()
+        _deliver(message, recv)
+
+    def post_recv(self, source: int, dest: int, tag: int, recvbuf) -> _PostedRecv:
+        key = (source, dest, tag)
+        recv = _PostedRecv(recvbuf)
+        with self._lock:
+            messages = self._messages.get(key)
+            if not messages:
+                self._receives.setdefault(key, collections.deque()).append(recv)
+                return recv
+            message = messages.popleft()
+        _deliver(message, recv)
+        return recv
+
+    def check_aborted(self):
+        if self._aborted:
+            raise ConcurrencyError("another rank of the ThreadComm failed")
+
+    def wait(self, event: threading.Event, description: str):
+        deadline = time.monotonic() + self.timeout
+        # wake up regularly to notice aborts
+        while not event.wait(timeout=0.01):
+            self.check_aborted()
+            if time.monotonic() > deadline:
+                raise ConcurrencyError(f"timed out waiting for {description}")
+
+    def exchange(self, rank: int, value: Any) -> List[Any]:
+        """Collective giving every rank the values of all ranks."""
+        self._slots[rank] = value
+        self._barrier.wait()
+        values = list(self._slots)
+        # don't let a rank overwrite its slot before all ranks have read it
+        self._barrier.wait()
+        return values
+
+    def split_group(self, i_split: int, color: Any, size: int) -> "_ThreadGroup":
+        with self._lock:
+            return self._split_groups.setdefault(
+                (i_split, color), _ThreadGroup(size, self.timeout)
+            )
+
+
+class _SendRequest(Request):
+    def __init__(self, group: _ThreadGroup, message: _Message, dest: int):
+        self._group = group
+        self._message = message
+        self._dest = dest
+
+    def wait(self):
+        self._group.wait(self._message.received, f"send to rank {self._dest}")
+
+    def Test(self) -> bool:
+        self._group.check_aborted()
+        return self._message.received.is_set()
+
+
+class _RecvRequest(Request):
+    def __init__(self, group: _ThreadGroup, recv: _PostedRecv, source: int):
+        self._group = group
+        self._recv = recv
+        self._source = source
+
+    def wait(self):
+        self._group.wait(self._recv.done, f"receive from rank {self._source}")
+
+    def Test(self) -> bool:
+        self._group.check_aborted()
+        return self._recv.done.is_set()
+
+
+class ThreadComm(Comm):
+    """
+    In-process communicator whose ranks each run on their own thread.
+
+    Unlike LocalComm, ranks run concurrently and block on each other as they
+    would with MPI, so code using the communicator runs unchanged. Isend
+    does not copy its buffer: the receiver copies from a read-only view of
+    it, and the send completes once received. The buffer must not be modified
+    until then, as with MPI.
+
+    Use run_ranks to run a function on all ranks.
+    """
+
+    def __init__(self, rank: int, group: _ThreadGroup):
+        self.rank = rank
+        self._group = group
+        self._n_splits = 0
+
+    @classmethod
+    def create(
+        cls, total_ranks: int, timeout: float = DEFAULT_TIMEOUT
+    ) -> List["ThreadComm"]:
+        """Communicators for all ranks of a run.
+
+        Args:
+            total_ranks: number of ranks
+            timeout: seconds a rank may block on the others before failing
+        """
+        group = _ThreadGroup(total_ranks, timeout)
+        return [cls(rank, group) for rank in range(total_ranks)]
+
+    def __repr__(self):
+        return f"ThreadComm(rank={self.rank}, total_ranks={self._group.size})"
+
+    def Get_rank(self):
+        return self.rank
+
+    def Get_size(self):
+        return self._group.size
+
+    def _exchange(self, value: Any) -> List[Any]:
+        return self._group.exchange(self.rank, value)
+
+    def bcast(self, value, root=0):
+        values = self._exchange(value)
+        if self.rank == root:
+            return value
+        return copy.deepcopy(values[root])
+
+    def Barrier(self):
+        self._group._barrier.wait()
+
+    def barrier(self):
+        self._group._barrier.wait()
+
+    def Scatter(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(sendbuf)
+        ensure_contiguous(recvbuf)
+        sendbuf = self._exchange(sendbuf)[root]
+        safe_assign_array(recvbuf, sendbuf[self.rank])
+        # keep the root buffer in use until all ranks copied from it
+        self.Barrier()
+
+    def Gather(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(sendbuf)
+        ensure_contiguous(recvbuf)
+        values = self._exchange(sendbuf)
+        if self.rank == root:
+            for i, value in enumerate(values):
+                safe_assign_array(recvbuf[i, :], value)
+        self.Barrier()
+
+    def Scatterv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(recvbuf)
+        array, counts = self._exchange(sendbuf)[root]
+        offset = sum(counts[: self.rank])
+        safe_assign_array(recvbuf, array[offset : offset + counts[self.rank]])
+        self.Barrier()
+
+    def Gatherv(self, sendbuf, recvbuf, root=0, **kwargs):
+        ensure_contiguous(sendbuf)
+        values = self._exchange(sendbuf)
+        if self.rank == root:
+            array, counts = recvbuf
+            offset = 0
+            for value, count in zip(values, counts):
+                safe_assign_array(array[offset : offset + count], value)
+                offset += count
+        self.Barrier()
+
+    def allgather(self, sendobj):
+        return [copy.deepcopy(value) for value in self._exchange(sendobj)]
+
+    def allreduce(self, sendobj, op=None) -> Any:
+        if op is None:
+            op = operator.add
+        return copy.deepcopy(functools.reduce(op, self._exchange(sendobj)))
+
+    def Send(self, sendbuf, dest, tag: int = 0, **kwargs):
+        ensure_contiguous(sendbuf)
+        # buffered, so the sender can proceed before the receive is posted
+        self._group.send(self.rank, dest, tag, _Message(copy.deepcopy(sendbuf)))
+
+    def Isend(self, sendbuf, dest, tag: int = 0, **kwargs):
+        ensure_contiguous(sendbuf)
+        message = _Message(_frozen(sendbuf))
+        self._group.send(self.rank, dest, tag, message)
+        return _SendRequest(self._group, message, dest)
+
+    def Recv(self, recvbuf, source, tag: int = 0, **kwargs):
+        self.Irecv(recvbuf, source, tag).wait()
+
+    def Irecv(self, recvbuf, source, tag: int = 0, **kwargs):
+        ensure_contiguous(recvbuf)
+        recv = self._group.post_recv(source, self.rank, tag, recvbuf)
+        return _RecvRequest(self._group, recv, source)
+
+    def sendrecv(self, sendbuf, dest, **kwargs):
+        source = kwargs.get("source", dest)
+        self._group.send(
+            self.rank, dest, kwargs.get("sendtag", 0), _Message(copy.deepcopy(sendbuf))
+        )
+        recv = self._group.post_recv(source, self.rank, kwargs.get("recvtag", 0), None)
+        self._group.wait(recv.done, f"receive from rank {source}")
+        return recv.data
+
+    def Split(self, color, key):
+        members = self._exchange((color, key))
+        ranks = sorted(
+            (member_key, rank)
+            for rank, (member_color, member_key) in enumerate(members)
+            if member_color == color
+        )
+        group = self._group.split_group(self._n_splits, color, len(ranks))
+        self._n_splits += 1
+        return ThreadComm(ranks.index((key, self.rank)), group)
+
+
+def run_ranks(
+    function: Callable[[ThreadComm], T],
+    total_ranks: int,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> List[T]:
+    """Run a function concurrently on all ranks of a ThreadComm.
+
+    Args:
+        function: called with the communicator of each rank on its own thread
+        total_ranks: number of ranks
+        timeout: seconds a rank may block on the others before failing
+
+    Returns:
+        results of the function, by rank
+
+    Raises:
+        the exception of the lowest failing rank
+    """
+    comms = ThreadComm.create(total_ranks, timeout=timeout)
+    results: List[Any] = [None] * total_ranks
+    errors: List[Optional[BaseException]] = [None] * total_ranks
+
+    def run(comm: ThreadComm):
+        try:
+            results[comm.rank] = function(comm)
+        except BaseException as err:
+            errors[comm.rank] = err
+            # unblock the other ranks rather than waiting for the timeout
+            comm._group.abort()
+
+    threads = [
+        threading.Thread(target=run, args=(comm,), name=f"ThreadComm-{comm.rank}")
+        for comm in comms
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # errors caused by the abort hide the original one
+    raised: Sequence[BaseException] = [
+        err
+        for err in errors
+        if err is not None
+        and not isinstance(err, (ConcurrencyError, threading.BrokenBarrierError))
+    ] or [err for err in errors if err is not None]
+    if raised:
+        raise raised[0]
+    return results
@@ -0,0 +1,305 @@
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import ndsl.constants as constants
+from ndsl.buffer import array_buffer, recv_buffer, send_buffer
+from ndsl.optional_imports import cupy
+from ndsl.quantity import Quantity, QuantityMetadata
+from ndsl.utils import safe_assign_array
+
+
+if TYPE_CHECKING:
+    from ndsl.comm.communicator import Communicator
+
+LayoutKey = Tuple[Any, ...]
+RankSlice = Tuple[Union[int, slice], ...]
+
+
+def layout_key(metadata: QuantityMetadata, numpy_module) -> LayoutKey:
+    """Hashable key of what a transfer plan depends on: the dimensions and
+    extent of the data, its dtype and the array module of its buffers."""
+    return (
+        tuple(metadata.dims),
+        tuple(metadata.extent),
+        np.dtype(metadata.dtype),
+        numpy_module,
+    )
+
+
+def _as_strided(array, shape: Tuple[int, ...], strides: Tuple[int, ...]):
+    if cupy is not None and isinstance(array, cupy.ndarray):
+        return cupy.lib.stride_tricks.as_strided(array, shape=shape, strides=strides)
+    return np.lib.stride_tricks.as_strided(array, shape=shape, strides=strides)
+
+
+class _SubtileLayout:
+    """Placement of the subtiles of all ranks on a global array.
+
+    When all subtiles have the same shape and start at regular intervals, the
+    global array is seen as a (tile, y, x, *subtile shape) array through a
+    single strided view, so packing and unpacking take one copy instead of
+    one per rank.
+    """
+
+    def __init__(
+        self,
+        start: np.ndarray,
+        stop: np.ndarray,
+        dims: Sequence[str],
+        layout: Tuple[int, int],
+    ):
+        """
+        Args:
+            start: (rank, dimension) array of subtile slice starts
+            stop: (rank, dimension) array of subtile slice stops
+            dims: dimensions of the global array
+            layout: the (y, x) number of ranks along each tile axis
+        """
+        self._start = start
+        self._stop = stop
+        self._tile_axis = (
+            list(dims).index(constants.TILE_DIM) if constants.TILE_DIM in dims else None
+        )
+        # the tile dimension is indexed rather than sliced, so it has no length
+        self.block_dims = [i for i in range(len(dims)) if i != self._tile_axis]
+        shapes = (stop - start)[:, self.block_dims]
+        self.counts: List[int] = [int(count) for count in np.prod(shapes, axis=1)]
+        self.uniform = bool(np.all(shapes == shapes[0]))
+        self.rank_shape = (len(start) // (layout[0] * layout[1]),) + tuple(layout)
+        self._steps: Optional[np.ndarray] = None
+        if self.uniform:
+            self._steps = self._regular_steps()
+
+    @property
+    def total_ranks(self) -> int:
+        return len(self._start)
+
+    def block_shape(self, rank: int) -> Tuple[int, ...]:
+        return tuple(
+            int(self._stop[rank, i] - self._start[rank, i]) for i in self.block_dims
+        )
+
+    def rank_slice(self, rank: int) -> RankSlice:
+        return tuple(
+            int(start) if i == self._tile_axis else slice(int(start), int(stop))
+            for i, (start, stop) in enumerate(zip(self._start[rank], self._stop[rank]))
+        )
+
+    def _regular_steps(self) -> Optional[np.ndarray]:
+        """Index steps between subtiles along the tile, y and x rank axes, or
+        None if subtiles are not regularly spaced."""
+        start = self._start.reshape(self.rank_shape + (-1,))
+        steps = np.zeros((3, start.shape[-1]), dtype=np.int64)
+        for axis in range(3):
+            if self.rank_shape[axis] > 1:
+                index = [0, 0, 0]
+                index[axis] = 1
+                steps[axis] = start[tuple(index)] - start[0, 0, 0]
+        rank_index = np.indices(self.rank_shape).reshape(3, -1).T
+        if np.array_equal(self._start, self._start[0] + rank_index @ steps):
+            return steps
+        return None
+
+    @property
+    def regular(self) -> bool:
+        return self._steps is not None
+
+    @property
+    def disjoint(self) -> bool:
+        """Whether regularly spaced subtiles never share points."""
+        if self._steps is None:
+            return False
+        # subtiles span a single index of the tile dimension
+        lengths = np.ones(self._start.shape[1], dtype=np.int64)
+        lengths[self.block_dims] = self.block_shape(0)
+        return all(
+            bool(np.any(np.abs(self._steps[axis]) >= lengths))
+            for axis in range(3)
+            if self.rank_shape[axis] > 1
+        )
+
+    def blocks(self, array):
+        """A (tile, y, x, *subtile shape) view of the subtiles on an array."""
+        assert self._steps is not None
+        base = array[tuple(slice(int(start), None) for start in self._start[0])]
+        rank_strides = tuple(
+            int(stride) for stride in self._steps @ np.asarray(array.strides)
+        )
+        return _as_strided(
+            base,
+            shape=self.rank_shape + self.block_shape(0),
+            strides=rank_strides + tuple(base.strides[i] for i in self.block_dims),
+        )
+
+    def pack(self, array, buffer):
+        """Copy the subtiles of an array into a buffer, in rank order."""
+        if self.regular:
+            safe_assign_array(
+                buffer.reshape(self.rank_shape + self.block_shape(0)),
+                self.blocks(array),
+            )
+        else:
+            offset = 0
+            for rank, count in enumerate(self.counts):
+                safe_assign_array(
+                    buffer[offset : offset + count].reshape(self.block_shape(rank)),
+                    array[self.rank_slice(rank)],
+                )
+                offset += count
+
+    def unpack(self, buffer, array):
+        """Copy subtiles in rank order from a buffer into an array."""
+        if self.regular and self.disjoint:
+            safe_assign_array(
+                self.blocks(array),
+                buffer.reshape(self.rank_shape + self.block_shape(0)),
+            )
+        else:
+            # where subtiles share points, later ranks overwrite earlier ones
+            offset = 0
+            for rank, count in enumerate(self.counts):
+                safe_assign_array(
+                    array[self.rank_slice(rank)],
+                    buffer[offset : offset + count].reshape(self.block_shape(rank)),
+                )
+                offset += count
+
+    def buffer_spec(self, buffer):
+        """Buffer argument of Scatter/Gather, or Scatterv/Gatherv if subtiles
+        differ in size."""
+        if self.uniform:
+            return buffer.reshape((self.total_ranks,) + self.block_shape(0))
+        return [buffer, self.counts]
+
+
+class ScatterPlan:
+    """Subtile layout to repeatedly scatter quantities of one layout from the
+    root rank to all ranks.
+
+    The plan is created collectively by Communicator.get_scatter_plan, which
+    broadcasts the metadata once. Scattering with the plan only sends data.
+    The staging buffer of the root rank is taken from the buffer cache for
+    each transfer.
+    """
+
+    def __init__(self, communicator: "Communicator", metadata: QuantityMetadata):
+        """
+        Args:
+            communicator: communicator to scatter with
+            metadata: metadata of the quantity on the root rank
+        """
+        self.metadata = metadata
+        self._communicator = communicator
+        self._numpy = communicator._maybe_force_cpu(metadata.np)
+        partitioner = communicator.partitioner
+        self.rank_extent = partitioner.subtile_extent(metadata, communicator.rank)
+        start, stop = partitioner.subtile_slices(
+            metadata.dims, metadata.extent, overlap=True
+        )
+        self._layout = _SubtileLayout(start, stop, metadata.dims, partitioner.layout)
+
+    def scatter(
+        self,
+        send_quantity: Optional[Quantity] = None,
+        recv_quantity: Optional[Quantity] = None,
+        metadata: Optional[QuantityMetadata] = None,
+    ) -> Quantity:
+        """Transfer subtile regions of a full-tile quantity
+        from the tile root rank to all subtiles.
+
+        Args:
+            send_quantity: quantity to send, only required/used on the tile root rank
+            recv_quantity: if provided, assign received data into this Quantity.
+            metadata: metadata of the quantity on the root rank, used to create
+                recv_quantity, defaults to the one the plan was created with
+        Returns:
+            recv_quantity
+        """
+        if recv_quantity is None:
+            recv_quantity = self._communicator._get_scatter_recv_quantity(
+                self.rank_extent, self.metadata if metadata is None else metadata
+            )
+        if self._communicator.rank == constants.ROOT_RANK:
+            if send_quantity is None:
+                raise TypeError("send_quantity is a required argument on the root rank")
+            with array_buffer(
+                self._numpy.zeros, (sum(self._layout.counts),), self.metadata.dtype
+            ) as sendbuf:
+                self._layout.pack(send_quantity.view[:], sendbuf.array)
+                self._scatter(self._layout.buffer_spec(sendbuf.array), recv_quantity)
+        else:
+            self._scatter(None, recv_quantity)
+        return recv_quantity
+
+    def _scatter(self, sendbuf, recv_quantity: Quantity):
+        comm = self._communicator.comm
+        with recv_buffer(self._numpy.zeros, recv_quantity.view[:]) as recv:
+            if self._layout.uniform:
+                comm.Scatter(sendbuf, recv, root=constants.ROOT_RANK)
+            else:
+                comm.Scatterv(sendbuf, recv.reshape(-1), root=constants.ROOT_RANK)
+
+
+class GatherPlan:
+    """Subtile layout to repeatedly gather quantities of one layout from all
+    ranks to the root rank.
+
+    The staging buffer of the root rank is taken from the buffer cache for
+    each transfer.
+    """
+
+    def __init__(self, communicator: "Communicator", metadata: QuantityMetadata):
+        """
+        Args:
+            communicator: communicator to gather with
+            metadata: metadata of the quantity on this rank
+        """
+        self.metadata = metadata
+        self._communicator = communicator
+        self._numpy = communicator._maybe_force_cpu(metadata.np)
+        partitioner = communicator.partitioner
+        self.global_extent = partitioner.global_extent(metadata)
+        global_dims = tuple(metadata.dims)
+        if len(self.global_extent) > len(global_dims):
+            # gathering a cube adds a leading tile dimension
+            global_dims = (constants.TILE_DIM,) + global_dims
+        start, stop = partitioner.subtile_slices(
+            global_dims, self.global_extent, overlap=True
+        )
+        self._layout = _SubtileLayout(start, stop, global_dims, partitioner.layout)
+
+    def gather(
+        self, send_quantity: Quantity, recv_quantity: Optional[Quantity] = None
+    ) -> Optional[Quantity]:
+        """Transfer subtile regions of a full-tile quantity
+        from each rank to the tile root rank.
+
+        Args:
+            send_quantity: quantity to send
+            recv_quantity: if provided, assign received data into this Quantity (only
+                used on the tile root rank)
+        Returns:
+            recv_quantity: quantity if on root rank, otherwise None
+        """
+        if self._communicator.rank != constants.ROOT_RANK:
+            self._gather(send_quantity, None)
+            return None
+        with array_buffer(
+            self._numpy.zeros, (sum(self._layout.counts),), self.metadata.dtype
+        ) as recvbuf:
+            self._gather(send_quantity, self._layout.buffer_spec(recvbuf.array))
+            if recv_quantity is None:
+                recv_quantity = self._communicator._get_gather_recv_quantity(
+                    self.global_extent, send_quantity.metadata
+                )
+            self._layout.unpack(recvbuf.array, recv_quantity.view[:])
+        return recv_quantity
+
+    def _gather(self, send_quantity: Quantity, recvbuf):
+        comm = self._communicator.comm
+        with send_buffer(self._numpy.zeros, send_quantity.view[:]) as send:
+            if self._layout.uniform:
+                comm.Gather(send, recvbuf, root=constants.ROOT_RANK)
+            else:
+                comm.Gatherv(send.reshape(-1), recvbuf, root=constants.ROOT_RANK)
@@ -32,6 +32,7 @@ from ndsl.dsl.dace.utils import (
     report_memory_static_analysis,
 )
 from ndsl.logging import ndsl_log
+from ndsl.performance.memory import MEMORY_REGISTRY
 
 
 try:
@@ -194,10 +195,21 @@ def _build_sdfg(
 
         # Printing analysis of the compiled SDFG
         with DaCeProgress(config, "Build finished. Running memory static analysis"):
-            report = report_memory_static_analysis(
-                sdfg, memory_static_analysis(sdfg), False
-            )
+            allocations = memory_static_analysis(sdfg)
+            report = report_memory_static_analysis(sdfg, allocations, False)
             ndsl_log.info(f"{DaCeProgress.default_prefix(config)} {report}")
+            for storage, storage_report in allocations.items():
+                nbytes = (
+                    storage_report.referenced_in_bytes
+                    + storage_report.unreferenced_in_bytes
+                )
+                if nbytes > 0:
+                    MEMORY_REGISTRY.record(
+                        "dace",
+                        f"{sdfg.name}:{storage.name}",
+                        nbytes,
+                        device="device" if "GPU" in storage.name else "host",
+                    )
 
     # Compilation done.
     # On Build: all ranks sync, then exit.
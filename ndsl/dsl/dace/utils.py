@@ -210,6 +210,35 @@ class MaxBandwithBenchmarkProgram:
             self.copy_stencil(A, B)
 
 
+def measure_copy_time(size, backend: str, n: int = 1000, m: int = 4) -> float:
+    """Median time in seconds of a copy stencil between two arrays of a size,
+    over m repetitions of n copies, with the orchestrated DaCe backend given."""
+    bench = MaxBandwithBenchmarkProgram(size, backend)
+    if backend == "dace:gpu":
+        A = cp.ones(size, dtype=Float)
+        B = cp.ones(size, dtype=Float)
+    else:
+        A = np.ones(size, dtype=Float)
+        B = np.ones(size, dtype=Float)
+    dt = []
+    # Warm up run (build, allocation)
+    # to remove from timing the common runtime
+    bench(A, B, n)
+    # Time
+    for _ in range(m):
+        s = time.time()
+        bench(A, B, n)
+        dt.append((time.time() - s) / n)
+    return float(np.median(dt))
+
+
+def measure_peak_bandwidth(size, backend: str, n: int = 1000, m: int = 4) -> float:
+    """Achieved bandwidth in bytes per second of a copy stencil between two
+    arrays of a size, which reads one and writes the other."""
+    memory_size_in_b = 2 * np.prod(size) * np.dtype(Float).itemsize
+    return float(memory_size_in_b / measure_copy_time(size, backend, n=n, m=m))
+
+
 def kernel_theoretical_timing(
     sdfg: dace.sdfg.SDFG,
     hardware_bw_in_GB_s=None,
@@ -229,26 +258,8 @@ def kernel_theoretical_timing(
             f"Calculating experimental hardware bandwith on {size}"
             f" arrays at {Float} precision..."
         )
-        bench = MaxBandwithBenchmarkProgram(size, backend)
-        if backend == "dace:gpu":
-            A = cp.ones(size, dtype=Float)
-            B = cp.ones(size, dtype=Float)
-        else:
-            A = np.ones(size, dtype=Float)
-            B = np.ones(size, dtype=Float)
-        n = 1000
-        m = 4
-        dt = []
-        # Warm up run (build, allocation)
-        # to remove from timing the common runtime
-        bench(A, B, n)
-        # Time
-        for _ in range(m):
-            s = time.time()
-            bench(A, B, n)
-            dt.append((time.time() - s) / n)
         memory_size_in_b = np.prod(size) * np.dtype(Float).itemsize * 8
-        bandwidth_in_bytes_s = memory_size_in_b / np.median(dt)
+        bandwidth_in_bytes_s = memory_size_in_b / measure_copy_time(size, backend)
         print(
             f"Hardware bandwith computed: {bandwidth_in_bytes_s/(1024*1024*1024)} GB/s"
         )
@@ -1,17 +1,23 @@
+import concurrent.futures
+import contextlib
 import copy
 import dataclasses
 import inspect
+import multiprocessing
+import os
+import pickle
+import time
 from typing import (
     Any,
     Callable,
     Dict,
+    Hashable,
     Iterable,
     List,
     Mapping,
     Optional,
     Sequence,
     Tuple,
-    Type,
     Union,
     cast,
 )
@@ -30,8 +36,10 @@ from ndsl.comm.mpi import MPI
 from ndsl.constants import X_DIM, X_DIMS, Y_DIM, Y_DIMS, Z_DIM, Z_DIMS
 from ndsl.dsl.dace.orchestration import SDFGConvertible
 from ndsl.dsl.stencil_config import CompilationConfig, RunMode, StencilConfig
+from ndsl.dsl.stencil_fusion import StencilStage, fuse_definitions
 from ndsl.dsl.typing import Float, Index3D, cast_to_index3d
 from ndsl.initialization import GridSizer, SubtileGridSizer
+from ndsl.performance.stencil_profiler import StencilProfiler, estimate_bytes_moved
 from ndsl.quantity import Quantity
 
 
@@ -110,17 +118,31 @@ class TimingCollector:
     Attributes:
         build_info: contains info about the generation process for each stencil.
         exec_info: contains info about the execution of each stencil.
+        parallel_build_info: wall time and counts of the last parallel build
+            of deferred stencils, empty if there was none.
+        profiler: if given, records the run time and bytes moved of each
+            stencil call.
     """
 
     build_info: Dict[str, dict] = dataclasses.field(default_factory=dict)
     exec_info: Dict[str, Any] = dataclasses.field(
         default_factory=lambda: {"__aggregate_data": True}
     )
+    parallel_build_info: Dict[str, Any] = dataclasses.field(default_factory=dict)
+    profiler: Optional[StencilProfiler] = None
 
     def build_report(self, key: str = "build_time", **kwargs) -> str:
-        return type(self)._show_report(
+        report = type(self)._show_report(
             self.build_info, self.build_info.keys(), key, **kwargs
         )
+        if self.parallel_build_info:
+            info = self.parallel_build_info
+            report = (
+                f"Parallel build: {info['wall_time']:.3e} wall time, "
+                f"{info['n_compiled']} of {info['n_stencils']} stencils compiled "
+                f"by {info['n_workers']} workers\n" + report
+            )
+        return report
 
     def exec_report(self, key: str = "total_run_time", **kwargs) -> str:
         # NOTE: Uses the build_info keys to distinguish stencils
@@ -289,6 +311,8 @@ class FrozenStencil(SDFGConvertible):
         skip_passes: Tuple[str, ...] = (),
         timing_collector: Optional[TimingCollector] = None,
         comm: Optional[Comm] = None,
+        deferred_builds: Optional["DeferredStencilBuilds"] = None,
+        registry: Optional["StencilRegistry"] = None,
     ):
         """
         Args:
@@ -301,6 +325,11 @@ class FrozenStencil(SDFGConvertible):
             timing_collector: Optional object that accumulates timings
             comm: if given, inputs and outputs will be compared to the "twin"
                 rank of this rank
+            deferred_builds: if given, the stencil is not built here but
+                added to these deferred builds, and stencil_object is None
+                until they are built
+            registry: if given, the stencil object is shared with the
+                stencils built from the same request through this registry
         """
         if isinstance(origin, tuple):
             origin = cast_to_index3d(origin)
@@ -309,6 +338,11 @@ class FrozenStencil(SDFGConvertible):
         self.domain: Index3D = cast_to_index3d(domain)
         self.stencil_config: StencilConfig = stencil_config
         self.comm = comm
+        self.fast_call = (
+            not stencil_config.compilation_config.validate_args and comm is None
+        )
+        """whether calls skip argument validation and rank comparison, and
+        pass arguments straight to the run method of the stencil object"""
 
         if timing_collector is None:
             self._timing_collector = TimingCollector()
@@ -318,7 +352,10 @@ class FrozenStencil(SDFGConvertible):
         if externals is None:
             externals = {}
         self.externals = externals
+        self._func = func
         self._func_name = func.__name__
+        self._skip_passes = tuple(skip_passes)
+        self._registry = registry
         stencil_kwargs = self.stencil_config.stencil_kwargs(
             skip_passes=skip_passes, func=func
         )
@@ -343,6 +380,7 @@ class FrozenStencil(SDFGConvertible):
         # If we orchestrate, move the compilation at call time to make sure
         # disable_codegen do not lead to call to uncompiled stencils, which fails
         # silently
+        self._deferred_builds: Optional[DeferredStencilBuilds] = None
         if self.stencil_config.dace_config.is_dace_orchestrated():
             self.stencil_object = gtscript.lazy_stencil(
                 definition=func,
@@ -351,30 +389,73 @@ class FrozenStencil(SDFGConvertible):
                 **stencil_kwargs,
                 build_info=(build_info := {}),  # type: ignore
             )
+            self._set_stencil_object(build_info)
+        elif deferred_builds is not None:
+            self._stencil_kwargs = stencil_kwargs
+            self._deferred_builds = deferred_builds
+            deferred_builds.add(self)
         else:
-            compilation_config = stencil_config.compilation_config
-            if (
-                compilation_config.use_minimal_caching
-                and not compilation_config.is_compiling
-                and compilation_config.run_mode != RunMode.Run
-            ):
-                block_waiting_for_compilation(MPI.COMM_WORLD, compilation_config)
+            self._build(stencil_kwargs)
 
-            self.stencil_object = gtscript.stencil(
-                definition=func,
-                externals=externals,
-                dtypes={float: Float},
-                **stencil_kwargs,
-                build_info=(build_info := {}),
-            )
+    @property
+    def build_key(self) -> Optional[Hashable]:
+        """Key of the stencil definition, externals and configuration
+        the stencil object is built from, None if the externals cannot be
+        compared reliably."""
+        return _stencil_build_key(
+            self._func, self.externals, self._skip_passes, self.stencil_config
+        )
 
-            if (
-                compilation_config.use_minimal_caching
-                and compilation_config.is_compiling
-                and compilation_config.run_mode != RunMode.Run
-            ):
-                unblock_waiting_tiles(MPI.COMM_WORLD)
+    def _build(
+        self,
+        stencil_kwargs: Dict[str, Any],
+        build_info: Optional[Dict[str, Any]] = None,
+    ):
+        """Build the gt4py stencil object, or take it from the registry.
+
+        Args:
+            stencil_kwargs: keyword arguments of gtscript.stencil
+            build_info: if given, reported as the build info of this stencil
+                instead of the one of this build, for stencils compiled
+                by DeferredStencilBuilds in another process
+        """
+        build_key = self.build_key
+        if self._registry is not None and build_key is not None:
+            registered = self._registry.get(build_key)
+            if registered is not None:
+                self.stencil_object, registered_info = registered
+                self._set_stencil_object(registered_info)
+                return
+        compilation_config = self.stencil_config.compilation_config
+        if (
+            compilation_config.use_minimal_caching
+            and not compilation_config.is_compiling
+            and compilation_config.run_mode != RunMode.Run
+        ):
+            block_waiting_for_compilation(MPI.COMM_WORLD, compilation_config)
+
+        self.stencil_object = gtscript.stencil(
+            definition=self._func,
+            externals=self.externals,
+            dtypes={float: Float},
+            **stencil_kwargs,
+            build_info=(load_info := {}),
+        )
 
+        if (
+            compilation_config.use_minimal_caching
+            and compilation_config.is_compiling
+            and compilation_config.run_mode != RunMode.Run
+        ):
+            unblock_waiting_tiles(MPI.COMM_WORLD)
+        if build_info is None:
+            build_info = load_info
+        if self._registry is not None and build_key is not None:
+            self._registry.add(build_key, self.stencil_object, build_info)
+        self._set_stencil_object(build_info)
+
+    def _set_stencil_object(self, build_info: Dict[str, Any]):
+        """Record build info and derive call arguments from the stencil object."""
         self._timing_collector.build_info[
             _stencil_object_name(self.stencil_object)
         ] = build_info
@@ -389,10 +470,17 @@ class FrozenStencil(SDFGConvertible):
             "_origin_": self._field_origins,
             "_domain_": self.domain,
         }
+        self._run_kwargs: Dict[str, Any] = {
+            **self._stencil_run_kwargs,
+            "exec_info": self._timing_collector.exec_info,
+        }
+        self._run = self.stencil_object.run
+        self.bytes_moved: int = estimate_bytes_moved(field_info, self.domain)
+        """estimated bytes moved to and from memory by each call"""
 
         self._written_fields: List[str] = FrozenStencil._get_written_fields(field_info)
 
-        if stencil_config.compilation_config.run_mode == RunMode.Build:
+        if self.stencil_config.compilation_config.run_mode == RunMode.Build:
 
             def nothing_function(*args, **kwargs):
                 pass
@@ -400,6 +488,20 @@ class FrozenStencil(SDFGConvertible):
             setattr(self, "__call__", nothing_function)
 
     def __call__(self, *args, **kwargs) -> None:
+        if self.stencil_object is None:
+            cast(DeferredStencilBuilds, self._deferred_builds).build()
+        if self.fast_call:
+            # arguments are bound to field names and origin, domain and
+            # exec_info are merged in once, in _set_stencil_object
+            run_kwargs = self._run_kwargs.copy()
+            for name, arg in zip(self._argument_names, args):
+                run_kwargs[name] = arg.data if isinstance(arg, Quantity) else arg
+            for name, arg in kwargs.items():
+                run_kwargs[name] = arg.data if isinstance(arg, Quantity) else arg
+            self._run(**run_kwargs)
+            if self._timing_collector.profiler is not None:
+                self._record_profile()
+            return
         args_list = list(args)
         _convert_quantities_to_storage(args_list, kwargs)
         args = tuple(args_list)
@@ -432,6 +534,8 @@ class FrozenStencil(SDFGConvertible):
                 **self._stencil_run_kwargs,
                 exec_info=self._timing_collector.exec_info,
             )
+        if self._timing_collector.profiler is not None:
+            self._record_profile()
         if self.comm is not None:
             differences = compare_ranks(self.comm, {**args_as_kwargs, **kwargs})
             if len(differences) > 0:
@@ -440,6 +544,14 @@ class FrozenStencil(SDFGConvertible):
                     f"after calling {self._func_name}"
                 )
 
+    def _record_profile(self):
+        exec_info = self._timing_collector.exec_info
+        cast(StencilProfiler, self._timing_collector.profiler).record(
+            _stencil_object_name(self.stencil_object),
+            exec_info["run_end_time"] - exec_info["run_start_time"],
+            self.bytes_moved,
+        )
+
     @classmethod
     def _compute_field_origins(
         cls, field_info_mapping, origin: Union[Index3D, Mapping[str, Tuple[int, ...]]]
@@ -525,6 +637,206 @@ class FrozenStencil(SDFGConvertible):
         )
 
 
+def _compile_stencil(
+    func: Callable[..., None],
+    externals: Mapping[str, Any],
+    stencil_kwargs: Dict[str, Any],
+    cache_settings: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Build a stencil into the gt4py cache, returning its build info.
+
+    Runs in the worker processes of DeferredStencilBuilds.
+    """
+    gt4py.cartesian.config.cache_settings.update(cache_settings)
+    build_info: Dict[str, Any] = {}
+    start = time.perf_counter()
+    gtscript.stencil(
+        definition=func,
+        externals=externals,
+        dtypes={float: Float},
+        **stencil_kwargs,
+        build_info=build_info,
+    )
+    build_info["wall_time"] = time.perf_counter() - start
+    return build_info
+
+
+class DeferredStencilBuilds:
+    """
+    Stencils recorded for a later build, which compiles the distinct ones
+    in parallel in a pool of processes before loading all of them.
+
+    Stencils differing only by origin and domain compile to the same code,
+    so they are compiled once. Requests which cannot be sent to another process
+    (e.g. locally defined stencil functions) are compiled when loaded instead.
+    """
+
+    def __init__(
+        self,
+        timing_collector: TimingCollector,
+        n_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            timing_collector: collects the wall time of the parallel build
+            n_workers: number of compiling processes, by default the
+                number of CPUs
+        """
+        self._timing_collector = timing_collector
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self._stencils: List[FrozenStencil] = []
+
+    def __len__(self) -> int:
+        return len(self._stencils)
+
+    def add(self, stencil: FrozenStencil):
+        self._stencils.append(stencil)
+
+    @staticmethod
+    def _request_key(stencil: FrozenStencil) -> Hashable:
+        build_key = stencil.build_key
+        # stencils without a reliable build key are compiled on their own
+        return build_key if build_key is not None else id(stencil)
+
+    def _compile_requests(self) -> Dict[Hashable, Tuple[Any, ...]]:
+        """Arguments of _compile_stencil for each distinct stencil which can be
+        compiled in another process."""
+        compilation_config = self._stencils[0].stencil_config.compilation_config
+        if (
+            compilation_config.use_minimal_caching
+            and not compilation_config.is_compiling
+        ):
+            # this rank reads the stencils compiled by another rank
+            return {}
+        cache_settings = dict(gt4py.cartesian.config.cache_settings)
+        requests: Dict[Hashable, Tuple[Any, ...]] = {}
+        for stencil in self._stencils:
+            key = self._request_key(stencil)
+            if key in requests or (
+                stencil._registry is not None and stencil._registry.get(key)
+            ):
+                continue
+            request = (
+                stencil._func,
+                dict(stencil.externals),
+                stencil._stencil_kwargs,
+                cache_settings,
+            )
+            try:
+                pickle.dumps(request)
+            except (pickle.PicklingError, AttributeError, TypeError):
+                continue
+            requests[key] = request
+        return requests
+
+    def build(self):
+        """Compile all recorded stencils and load them."""
+        if len(self._stencils) == 0:
+            return
+        start = time.perf_counter()
+        requests = self._compile_requests()
+        build_infos: Dict[Hashable, Dict[str, Any]] = {}
+        n_workers = min(self.n_workers, len(requests))
+        if n_workers > 1:
+            context = multiprocessing.get_context("spawn")
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=n_workers, mp_context=context
+            ) as executor:
+                futures = {
+                    key: executor.submit(_compile_stencil, *request)
+                    for key, request in requests.items()
+                }
+                for key, future in futures.items():
+                    try:
+                        build_infos[key] = future.result()
+                    except Exception:
+                        # compiled again below, to raise the error in this process
+                        pass
+        stencils, self._stencils = self._stencils, []
+        for stencil in stencils:
+            stencil_kwargs = stencil._stencil_kwargs
+            build_info = build_infos.get(self._request_key(stencil))
+            if build_info is not None:
+                # load what the worker compiled, even if rebuild is configured
+                stencil_kwargs = {**stencil_kwargs, "rebuild": False}
+            stencil._build(stencil_kwargs, build_info=build_info)
+        self._timing_collector.parallel_build_info = {
+            "wall_time": time.perf_counter() - start,
+            "n_stencils": len(stencils),
+            "n_compiled": len(build_infos),
+            "n_workers": n_workers,
+        }
+
+
+_SCALAR_EXTERNAL_TYPES = (type(None), bool, int, float, complex, str, np.generic)
+
+
+def _external_key(value: Any) -> Optional[Hashable]:
+    """Key comparing equal for external values giving the same stencil, None
+    for values which cannot be compared reliably."""
+    if isinstance(value, _SCALAR_EXTERNAL_TYPES):
+        # the type is part of the key as True == 1 == 1.0
+        return (type(value), value)
+    if isinstance(value, gtscript.AxisIndex):
+        return (gtscript.AxisIndex, value.axis, value.index, value.offset)
+    if isinstance(value, tuple):
+        keys = tuple(_external_key(item) for item in value)
+        if any(key is None for key in keys):
+            return None
+        return (tuple, keys)
+    if inspect.isfunction(value):
+        # gtscript functions are compared by identity
+        return value
+    return None
+
+
+def _stencil_build_key(
+    func: Callable[..., None],
+    externals: Mapping[str, Any],
+    skip_passes: Tuple[str, ...],
+    stencil_config: StencilConfig,
+) -> Optional[Hashable]:
+    """Key identifying the gt4py stencil object built from a request, None if
+    an external value cannot be compared reliably, e.g. an array."""
+    externals_key = []
+    for name, value in sorted(externals.items()):
+        key = _external_key(value)
+        if key is None:
+            return None
+        externals_key.append((name, key))
+    return (func, tuple(externals_key), skip_passes, stencil_config)
+
+
+class StencilRegistry:
+    """
+    Built gt4py stencil objects, by definition, externals, skipped passes and
+    stencil configuration.
+
+    Stencils built from the same request, e.g. with varied bounds or once per
+    vertical restriction, share one stencil object instead of each loading
+    their own from the gt4py cache.
+    """
+
+    def __init__(self):
+        self._stencils: Dict[Hashable, Tuple[Any, Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._stencils)
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """The stencil object and build info registered for a key, if any."""
+        return self._stencils.get(key)
+
+    def add(self, key: Hashable, stencil_object, build_info: Dict[str, Any]):
+        self._stencils[key] = (stencil_object, build_info)
+
+    def clear(self):
+        self._stencils.clear()
+
+
+STENCIL_REGISTRY = StencilRegistry()
+
+
 def _convert_quantities_to_storage(args, kwargs):
     for i, arg in enumerate(args):
         try:
@@ -883,11 +1195,45 @@ class StencilFactory:
         self.grid_indexing: GridIndexing = grid_indexing
         self.timing_collector = TimingCollector()
         self.comm = comm
+        self._deferred_builds: Optional[DeferredStencilBuilds] = None
+        # factory this one was restricted from, which may defer its builds
+        self._parent: Optional["StencilFactory"] = None
 
     @property
     def backend(self):
         return self.config.compilation_config.backend
 
+    @contextlib.contextmanager
+    def deferred_build(self, n_workers: Optional[int] = None):
+        """
+        Context in which stencils created by this factory are not built
+        immediately, but compiled in parallel when the context exits.
+
+        Stencils called within the context trigger the build of all stencils
+        recorded so far.
+
+        Args:
+            n_workers: number of compiling processes, by default the
+                number of CPUs
+        """
+        if self._current_deferred_builds() is not None:
+            raise RuntimeError("stencil builds are already deferred")
+        deferred_builds = DeferredStencilBuilds(self.timing_collector, n_workers)
+        self._deferred_builds = deferred_builds
+        try:
+            yield deferred_builds
+        finally:
+            self._deferred_builds = None
+        deferred_builds.build()
+
+    def _current_deferred_builds(self) -> Optional[DeferredStencilBuilds]:
+        """Builds deferred by this factory or the one it was restricted from."""
+        if self._deferred_builds is not None:
+            return self._deferred_builds
+        if self._parent is not None:
+            return self._parent._current_deferred_builds()
+        return None
+
     def from_origin_domain(
         self,
         func: Callable[..., None],
@@ -906,10 +1252,17 @@ class StencilFactory:
             skip_passes: compiler passes to skip when building stencil
         """
         if self.config.compare_to_numpy:
-            cls: Type = CompareToNumpyStencil
-        else:
-            cls = FrozenStencil
-        return cls(
+            return CompareToNumpyStencil(
+                func=func,
+                origin=origin,
+                domain=domain,
+                stencil_config=self.config,
+                externals=externals,
+                skip_passes=skip_passes,
+                timing_collector=self.timing_collector,
+                comm=self.comm,
+            )
+        return FrozenStencil(
             func=func,
             origin=origin,
             domain=domain,
@@ -918,6 +1271,8 @@ class StencilFactory:
             skip_passes=skip_passes,
             timing_collector=self.timing_collector,
             comm=self.comm,
+            deferred_builds=self._current_deferred_builds(),
+            registry=STENCIL_REGISTRY,
         )
 
     def from_dims_halo(
@@ -961,12 +1316,55 @@ class StencilFactory:
             skip_passes=skip_passes,
         )
 
+    def fuse(
+        self,
+        stages: Sequence[StencilStage],
+        origin: Union[Tuple[int, ...], Mapping[str, Tuple[int, ...]]],
+        domain: Tuple[int, ...],
+        externals: Optional[Mapping[str, Any]] = None,
+        temporaries: Sequence[str] = (),
+        skip_passes: Tuple[str, ...] = (),
+        name: Optional[str] = None,
+    ) -> Union[FrozenStencil, CompareToNumpyStencil]:
+        """
+        Build one stencil running several stencil definitions one after the
+        other on the same origin and domain, traversing memory once.
+
+        Stages may only read fields written by previous stages without offset.
+        Corner copies, e.g. those of CopyCorners and FillCornersBGrid, work in
+        place on a field through offset reads, which gtscript forbids in one
+        stencil: they can only be fused writing another field, and not with a
+        later corner copy reading the corners they fill.
+
+        Args:
+            stages: stencil definitions to run, in order, with the fused
+                arguments they are called on
+            origin: gt4py origin to use at call time
+            domain: gt4py domain to use at call time
+            externals: compile-time external variables required by the stages
+            temporaries: fused arguments only passed between stages, which
+                become temporaries of the fused stencil
+            skip_passes: compiler passes to skip when building stencil
+            name: name of the fused definition, by default joins the stage names
+        """
+        return self.from_origin_domain(
+            func=fuse_definitions(stages, temporaries=temporaries, name=name),
+            origin=origin,
+            domain=domain,
+            externals=externals,
+            skip_passes=skip_passes,
+        )
+
     def restrict_vertical(self, k_start=0, nk=None) -> "StencilFactory":
-        return StencilFactory(
+        factory = StencilFactory(
             config=self.config,
             grid_indexing=self.grid_indexing.restrict_vertical(k_start=k_start, nk=nk),
             comm=self.comm,
         )
+        # stencils of the restricted factory are built with the ones of this one
+        # while this one defers its builds
+        factory._parent = self
+        return factory
 
     def build_report(self, key: str = "build_time", **kwargs) -> str:
         """Report all stencils built by this factory."""
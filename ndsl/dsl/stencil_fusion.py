@@ -0,0 +1,281 @@
+import ast
+import dataclasses
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+from gt4py.cartesian.frontend.gtscript_frontend import PYTHON_AST_VERSION
+from gt4py.cartesian.utils import meta as gt_meta
+
+
+@dataclasses.dataclass(frozen=True)
+class StencilStage:
+    """
+    A stencil definition run as one stage of a fused stencil.
+
+    Attributes:
+        func: stencil definition function
+        arguments: names of the fused stencil arguments (or temporaries) given
+            to the parameters of func, parameters not in this mapping are given
+            the fused argument of the same name
+    """
+
+    func: Callable[..., None]
+    arguments: Mapping[str, str] = dataclasses.field(default_factory=dict)
+
+    def argument(self, parameter: str) -> str:
+        return self.arguments.get(parameter, parameter)
+
+
+class _RenameNames(ast.NodeTransformer):
+    def __init__(self, names: Mapping[str, str]):
+        self._names = names
+
+    def visit_Name(self, node: ast.Name) -> ast.Name:
+        if node.id in self._names:
+            return ast.copy_location(
+                ast.Name(id=self._names[node.id], ctx=node.ctx), node
+            )
+        return node
+
+
+def _is_horizontal_region(node: ast.With) -> bool:
+    return any(
+        isinstance(item.context_expr, ast.Call)
+        and isinstance(item.context_expr.func, ast.Name)
+        and item.context_expr.func.id == "horizontal"
+        for item in node.items
+    )
+
+
+def _writes_outside_regions(statements: Iterable[ast.stmt], name: str) -> bool:
+    """Whether a name is assigned by statements not nested in a horizontal region."""
+    for statement in statements:
+        if isinstance(statement, ast.With):
+            if not _is_horizontal_region(statement) and _writes_outside_regions(
+                statement.body, name
+            ):
+                return True
+        elif isinstance(statement, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            targets = (
+                statement.targets
+                if isinstance(statement, ast.Assign)
+                else [statement.target]
+            )
+            if any(
+                isinstance(node, ast.Name) and node.id == name
+                for target in targets
+                for node in ast.walk(target)
+            ):
+                return True
+    return False
+
+
+def _offset_reads(function: ast.FunctionDef, name: str) -> List[ast.Subscript]:
+    """Reads of a name with an offset other than [0, 0, 0]."""
+    reads = []
+    for node in ast.walk(function):
+        if (
+            isinstance(node, ast.Subscript)
+            and isinstance(node.value, ast.Name)
+            and node.value.id == name
+        ):
+            offset = node.slice
+            # Python 3.8 wraps subscripts in ast.Index
+            offset = getattr(offset, "value", offset)
+            elements = offset.elts if isinstance(offset, ast.Tuple) else [offset]
+            if not all(
+                isinstance(element, ast.Constant) and element.value == 0
+                for element in elements
+            ):
+                reads.append(node)
+    return reads
+
+
+def _written_names(function: ast.FunctionDef) -> Set[str]:
+    return {
+        node.id
+        for node in ast.walk(function)
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)
+    }
+
+
+def _stage_ast(func: Callable[..., None]) -> ast.FunctionDef:
+    module = gt_meta.get_ast(func, feature_version=PYTHON_AST_VERSION)
+    function = module.body[0]
+    if not isinstance(function, ast.FunctionDef):
+        raise ValueError(f"{func} is not a stencil definition function")
+    return function
+
+
+def _stage_namespace(func: Callable[..., None]) -> Dict[str, Any]:
+    closure = inspect.getclosurevars(func)
+    return {**closure.globals, **closure.nonlocals}
+
+
+def fuse_definitions(
+    stages: Sequence[StencilStage],
+    temporaries: Sequence[str] = (),
+    name: Optional[str] = None,
+) -> Callable[..., None]:
+    """
+    Generate a stencil definition running the computations of several stencil
+    definitions one after the other.
+
+    The fused definition takes the arguments of all stages, in order of first
+    use, except for temporaries. Those are only passed between stages: the
+    first stage using a temporary must write it outside of horizontal regions
+    without reading it, and stages may only read it without offset. Later
+    stages may likewise only read fields written by a previous stage without
+    offset, as gt4py can't read a field written in the same stencil with an
+    offset. Results
+    match running the stages one after the other as long as each temporary is
+    written over the whole domain by that stage.
+
+    Args:
+        stages: stencil definitions to run, in order
+        temporaries: fused argument names to turn into temporaries
+        name: name of the fused definition, by default joins the stage names
+
+    Returns:
+        fused stencil definition function
+
+    Raises:
+        ValueError: if stages give different types to an argument, refer to
+            different objects by the same name, use a temporary in a way
+            which would not match running the stages one after the other, or
+            read a field written by a previous stage with an offset
+    """
+    if len(stages) == 0:
+        raise ValueError("at least one stage is required to fuse stencils")
+    if name is None:
+        name = "__".join(stage.func.__name__ for stage in stages)
+    annotations: Dict[str, Any] = {}
+    namespace: Dict[str, Any] = {}
+    externals: Set[str] = set()
+    body: List[ast.stmt] = []
+    written_temporaries: Set[str] = set()
+    # stage writing each fused argument or temporary
+    writers: Dict[str, str] = {}
+    for i_stage, stage in enumerate(stages):
+        function = _stage_ast(stage.func)
+        parameters = list(inspect.signature(stage.func).parameters.values())
+        unknown = set(stage.arguments) - {parameter.name for parameter in parameters}
+        if unknown:
+            raise ValueError(
+                f"{stage.func.__name__} has no parameters {sorted(unknown)}"
+            )
+        names = {
+            parameter.name: stage.argument(parameter.name) for parameter in parameters
+        }
+        for parameter in parameters:
+            argument = names[parameter.name]
+            if argument in temporaries:
+                continue
+            if argument not in annotations:
+                annotations[argument] = parameter.annotation
+            elif annotations[argument] != parameter.annotation:
+                raise ValueError(
+                    f"argument {argument} is a {annotations[argument]} in a "
+                    f"previous stage but a {parameter.annotation} in "
+                    f"{stage.func.__name__}"
+                )
+        stage_body = []
+        for statement in function.body:
+            if (
+                isinstance(statement, ast.ImportFrom)
+                and statement.module == "__externals__"
+            ):
+                externals.update(alias.name for alias in statement.names)
+            elif not (
+                isinstance(statement, ast.Expr)
+                and isinstance(statement.value, ast.Constant)
+                and isinstance(statement.value.value, str)
+            ):
+                stage_body.append(statement)
+        # local variables of each stage are kept apart
+        stage_function = ast.FunctionDef(
+            name=function.name,
+            args=function.args,
+            body=stage_body,
+            decorator_list=[],
+            returns=None,
+            type_comment=None,
+        )
+        for node in ast.walk(stage_function):
+            if (
+                isinstance(node, ast.Name)
+                and isinstance(node.ctx, ast.Store)
+                and node.id not in names
+            ):
+                names[node.id] = f"stage{i_stage}_{node.id}"
+        stage_function = _RenameNames(names).visit(stage_function)
+        for field in sorted(set(writers).intersection(names.values())):
+            if _offset_reads(stage_function, field):
+                raise ValueError(
+                    f"{stage.func.__name__} reads {field} with an offset after "
+                    f"{writers[field]} writes it, stages can only be fused if "
+                    "they read fields written by previous stages without offset"
+                )
+        for temporary in set(temporaries).intersection(names.values()):
+            if _offset_reads(stage_function, temporary):
+                raise ValueError(
+                    f"{stage.func.__name__} reads temporary {temporary} with an "
+                    "offset, which would differ from reading the unfused field"
+                )
+            if temporary not in written_temporaries:
+                reads = [
+                    node
+                    for node in ast.walk(stage_function)
+                    if isinstance(node, ast.Name)
+                    and node.id == temporary
+                    and isinstance(node.ctx, ast.Load)
+                ]
+                if reads or not _writes_outside_regions(stage_function.body, temporary):
+                    raise ValueError(
+                        f"{stage.func.__name__} must write temporary {temporary} "
+                        "outside of horizontal regions without reading it"
+                    )
+                written_temporaries.add(temporary)
+        fields = {names[parameter.name] for parameter in parameters}
+        for field in _written_names(stage_function).intersection(fields):
+            writers[field] = stage.func.__name__
+        body.extend(stage_function.body)
+        for symbol, value in _stage_namespace(stage.func).items():
+            if symbol in namespace and namespace[symbol] is not value:
+                raise ValueError(
+                    f"{symbol} refers to different objects in the fused stages"
+                )
+            namespace[symbol] = value
+    if externals:
+        body.insert(
+            0,
+            ast.ImportFrom(
+                module="__externals__",
+                names=[ast.alias(name=external) for external in sorted(externals)],
+                level=0,
+            ),
+        )
+    fused = ast.FunctionDef(
+        name=name,
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg=argument) for argument in annotations],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        ),
+        body=body,
+        decorator_list=[],
+        returns=None,
+        type_comment=None,
+    )
+    source = gt_meta.ast_unparse(
+        ast.fix_missing_locations(ast.Module(body=[fused], type_ignores=[]))
+    )
+    namespace["__name__"] = stages[0].func.__module__
+    exec(compile(source, f"<fused stencil {name}>", "exec"), namespace)
+    definition = namespace.pop(name)
+    definition.__annotations__ = annotations
+    # gt4py reads the source of generated functions from this attribute
+    definition.__exec_source__ = source
+    return definition
@@ -20,7 +20,7 @@ from ndsl.halo.cuda_kernels import (
 from ndsl.halo.rotate import rotate_scalar_data, rotate_vector_data
 from ndsl.optional_imports import cupy as cp
 from ndsl.quantity import Quantity, QuantityHaloSpec
-from ndsl.types import NumpyModule
+from ndsl.types import Allocator, NumpyModule
 from ndsl.utils import device_synchronize
 
 
@@ -99,6 +99,70 @@ def _build_flatten_indices(
     return cp.asarray(arr_indices.flatten(order="C"))
 
 
+# Keyed cached - same string key strategy as INDICES_CACHE, with the
+# dimensions added since they drive the rotation.
+# Indices are numpy arrays used by the CPU transformer.
+CPU_INDICES_CACHE: Dict[str, np.ndarray] = {}
+
+
+def _build_flat_indices(
+    shape: Tuple[int, ...],
+    slices: Tuple[slice, ...],
+    dims: Sequence[str],
+    strides: Tuple[int, ...],
+    itemsize: int,
+    rotation: int,
+) -> np.ndarray:
+    """Build an array of indices into the flat memory of an array from a slice.
+
+    Vectorized numpy equivalent of `_build_flatten_indices`: indices are offsets,
+    in number of items, from the first element of the array. Rotation is applied
+    to the indices so that gathering them in C order reproduces the rotated view.
+    """
+    offsets = np.zeros((1,) * len(shape), dtype=np.intp)
+    for axis, (axis_slice, axis_length, stride) in enumerate(
+        zip(slices, shape, strides)
+    ):
+        axis_shape = [1] * len(shape)
+        axis_shape[axis] = -1
+        axis_offsets = np.arange(*axis_slice.indices(axis_length), dtype=np.intp)
+        offsets = offsets + (axis_offsets * (stride // itemsize)).reshape(axis_shape)
+
+    # sending data across the boundary will rotate the data
+    # n_clockwise_rotations times, due to the difference in axis orientation.
+    # Thus we rotate that number of times counterclockwise before sending,
+    # to get the right final orientation. Rotating the indices here turns the
+    # rotation into a plain gather at pack time.
+    offsets = rotate_scalar_data(offsets, dims, np, -rotation)
+    return offsets.flatten(order="C")
+
+
+# Packing order of the vector components once rotated by n counterclockwise
+# quarter turns, as (component, sign) with component 0 for x and 1 for y.
+# Mirrors the swap & negation of `rotate_vector_data`.
+_VECTOR_PACK_COMPONENTS: Dict[int, Tuple[Tuple[int, int], Tuple[int, int]]] = {
+    0: ((0, 1), (1, 1)),
+    1: ((1, 1), (0, -1)),
+    2: ((0, -1), (1, -1)),
+    3: ((1, -1), (0, 1)),
+}
+
+
+def _flat_view(array: np.ndarray) -> np.ndarray:
+    """1D view on the memory spanned by array, indexable with item offsets.
+
+    No copy is made, even for non-contiguous (e.g. padded) arrays.
+    """
+    if array.flags["C_CONTIGUOUS"]:
+        return array.reshape(-1)
+    span = 1 + sum(
+        (length - 1) * stride for length, stride in zip(array.shape, array.strides)
+    ) // array.itemsize
+    return np.lib.stride_tricks.as_strided(
+        array, shape=(span,), strides=(array.itemsize,)
+    )
+
+
 # ------------------------------------------------------------------------
 # HaloDataTransformer helpers
 
@@ -145,6 +209,7 @@ class _HaloDataTransformerType(Enum):
     UNKNOWN = 0
     SCALAR = 1
     VECTOR = 2
+    COMPOSITE = 3
 
 
 # ------------------------------------------------------------------------
@@ -187,6 +252,7 @@ class HaloDataTransformer(abc.ABC):
         np_module: NumpyModule,
         exchange_descriptors_x: Sequence[HaloExchangeSpec],
         exchange_descriptors_y: Optional[Sequence[HaloExchangeSpec]] = None,
+        pack_allocator: Optional[Allocator] = None,
     ) -> None:
         """
         Args:
@@ -196,6 +262,8 @@ class HaloDataTransformer(abc.ABC):
             exchange_descriptors_y: list of memory information describing an exchange.
                 Optional, used for the y-component of vectors only. If `none` the
                 data will packed as a scalar.
+            pack_allocator: allocates the pack buffers, defaults to
+                np_module.zeros
         """
         self._type = (
             _HaloDataTransformerType.SCALAR
@@ -209,6 +277,9 @@ class HaloDataTransformer(abc.ABC):
                 "Vector halo exchange must have same exchange data for X and Y"
             )
         self._np_module = np_module
+        self._pack_allocator = (
+            pack_allocator if pack_allocator is not None else np_module.zeros
+        )
         self._infos_x = tuple(exchange_descriptors_x)
         self._infos_y = (
             tuple(exchange_descriptors_y)
@@ -217,6 +288,7 @@ class HaloDataTransformer(abc.ABC):
         )
         self._pack_buffer = None
         self._unpack_buffer = None
+        self._owns_buffers = True
         self._compile()
 
     def finalize(self):
@@ -225,16 +297,35 @@ class HaloDataTransformer(abc.ABC):
         self.synchronize()
 
         # Push the buffers back in the cache
-        Buffer.push_to_cache(self._pack_buffer)
+        if self._owns_buffers:
+            Buffer.push_to_cache(self._pack_buffer)
+            Buffer.push_to_cache(self._unpack_buffer)
         self._pack_buffer = None
-        Buffer.push_to_cache(self._unpack_buffer)
         self._unpack_buffer = None
 
+    def _bind_buffers(self, pack_buffer: Buffer, unpack_buffer: Buffer):
+        """Pack/unpack into externally owned buffers.
+
+        The buffers allocated at compile time are pushed back into the cache. The
+        bound buffers are left to their owner on finalize.
+
+        Args:
+            pack_buffer: buffer to pack into, must fit the pack size
+            unpack_buffer: buffer to unpack from, must fit the unpack size
+        """
+        if self._owns_buffers:
+            Buffer.push_to_cache(self._pack_buffer)
+            Buffer.push_to_cache(self._unpack_buffer)
+        self._pack_buffer = pack_buffer
+        self._unpack_buffer = unpack_buffer
+        self._owns_buffers = False
+
     @staticmethod
     def get(
         np_module: NumpyModule,
         exchange_descriptors_x: Sequence[HaloExchangeSpec],
         exchange_descriptors_y: Optional[Sequence[HaloExchangeSpec]] = None,
+        pack_allocator: Optional[Allocator] = None,
     ) -> "HaloDataTransformer":
         """Construct a module from a numpy-like module.
 
@@ -245,6 +336,8 @@ class HaloDataTransformer(abc.ABC):
             exchange_descriptors_y: list of memory information describing an exchange.
                 Optional, used for the y-component of vectors only. If `none` the data
                 will packed as a scalar.
+            pack_allocator: allocates the pack buffers, defaults to
+                np_module.zeros
 
         Returns:
             an initialized packed buffer.
@@ -266,12 +359,14 @@ class HaloDataTransformer(abc.ABC):
                 np,
                 exchange_descriptors_x,
                 exchange_descriptors_y=exchange_descriptors_y,
+                pack_allocator=pack_allocator,
             )
         elif np_module is cp:
             return HaloDataTransformerGPU(
                 cp,
                 exchange_descriptors_x,
                 exchange_descriptors_y=exchange_descriptors_y,
+                pack_allocator=pack_allocator,
             )
 
         raise NotImplementedError(
@@ -313,7 +408,7 @@ class HaloDataTransformer(abc.ABC):
 
         # Retrieve two properly sized buffers
         self._pack_buffer = Buffer.pop_from_cache(
-            self._np_module.zeros, (buffer_size), dtype
+            self._pack_allocator, (buffer_size), dtype
         )
         self._unpack_buffer = Buffer.pop_from_cache(
             self._np_module.zeros, (buffer_size), dtype
@@ -374,11 +469,86 @@ class HaloDataTransformer(abc.ABC):
 
 
 class HaloDataTransformerCPU(HaloDataTransformer):
-    """Pack/unpack data in a single buffer using numpy flattening & slicing.
+    """Pack/unpack data in a single buffer using numpy flat indexing.
+
+    Default behavior. At compile time each exchange is turned into a flat array
+    of indices into the memory of the quantity (see `_build_flat_indices`), with
+    the rotation applied. Packing and unpacking a quantity is then a single
+    `np.take`/`np.put` straight from/into the buffer, without any intermediate
+    flattened copy. Vector rotations swap the components and negate the
+    packed buffer slice in place, so rotated edges cost the same as unrotated.
 
-    Default behavior, could be done with any numpy-like library.
+    Quantities which memory can't be indexed that way (e.g. device memory when
+    communication is forced through the CPU) fall back to slicing & flattening.
     """
 
+    def __init__(
+        self,
+        np_module: NumpyModule,
+        exchange_descriptors_x: Sequence[HaloExchangeSpec],
+        exchange_descriptors_y: Optional[Sequence[HaloExchangeSpec]] = None,
+        pack_allocator: Optional[Allocator] = None,
+    ) -> None:
+        self._pack_indices: Dict[UUID, np.ndarray] = {}
+        self._unpack_indices: Dict[UUID, np.ndarray] = {}
+        super().__init__(
+            np_module,
+            exchange_descriptors_x,
+            exchange_descriptors_y=exchange_descriptors_y,
+            pack_allocator=pack_allocator,
+        )
+
+    def _flatten_indices(
+        self,
+        exchange_data: HaloExchangeSpec,
+        slices: Tuple[slice, ...],
+        rotation: int,
+    ) -> np.ndarray:
+        """Extract a flat array of indices from the memory layout and the slice."""
+        key = str(
+            (
+                slices,
+                rotation,
+                exchange_data.specification.shape,
+                exchange_data.specification.strides,
+                exchange_data.specification.itemsize,
+                exchange_data.specification.dims,
+            )
+        )
+        if key not in CPU_INDICES_CACHE:
+            CPU_INDICES_CACHE[key] = _build_flat_indices(
+                exchange_data.specification.shape,
+                slices,
+                exchange_data.specification.dims,
+                exchange_data.specification.strides,
+                exchange_data.specification.itemsize,
+                rotation,
+            )
+        # Indices are read-only in the algorithm, no copy needed
+        return CPU_INDICES_CACHE[key]
+
+    def _compile(self):
+        # Super to get buffer allocation
+        super()._compile()
+        # Build the indices arrays
+        for info in self._infos_x + self._infos_y:
+            self._pack_indices[info._id] = self._flatten_indices(
+                info, info.pack_slices, info.pack_clockwise_rotation
+            )
+            self._unpack_indices[info._id] = self._flatten_indices(
+                info, info.unpack_slices, 0
+            )
+
+    @staticmethod
+    def _is_indexable(quantity: Quantity, info: HaloExchangeSpec) -> bool:
+        """Check the quantity memory matches the layout the indices were built on."""
+        data = quantity.data
+        return (
+            isinstance(data, np.ndarray)
+            and data.strides == tuple(info.specification.strides)
+            and all(stride >= 0 for stride in data.strides)
+        )
+
     def synchronize(self):
         if self._pack_buffer is not None:
             self._pack_buffer.finalize_memory_transfer()
@@ -413,21 +583,28 @@ class HaloDataTransformerCPU(HaloDataTransformer):
         assert isinstance(self._pack_buffer, Buffer)  # e.g. allocate happened
         offset = 0
         for quantity, info_x in zip(quantities, self._infos_x):
-            data_size = _slices_size(info_x.pack_slices)
-            # sending data across the boundary will rotate the data
-            # n_clockwise_rotations times, due to the difference in axis orientation.\
-            # Thus we rotate that number of times counterclockwise before sending,
-            # to get the right final orientation
-            source_view = rotate_scalar_data(
-                quantity.data[info_x.pack_slices],
-                quantity.dims,
-                quantity.np,
-                -info_x.pack_clockwise_rotation,
-            )
-            self._pack_buffer.assign_from(
-                source_view.flatten(),
-                buffer_slice=np.index_exp[offset : offset + data_size],
-            )
+            data_size = info_x.pack_buffer_size
+            if self._is_indexable(quantity, info_x):
+                np.take(
+                    _flat_view(quantity.data),
+                    self._pack_indices[info_x._id],
+                    out=self._pack_buffer.array[offset : offset + data_size],
+                )
+            else:
+                # sending data across the boundary will rotate the data
+                # n_clockwise_rotations times, due to the difference in axis
+                # orientation. Thus we rotate that number of times counterclockwise
+                # before sending, to get the right final orientation
+                source_view = rotate_scalar_data(
+                    quantity.data[info_x.pack_slices],
+                    quantity.dims,
+                    quantity.np,
+                    -info_x.pack_clockwise_rotation,
+                )
+                self._pack_buffer.assign_from(
+                    source_view.flatten(),
+                    buffer_slice=np.index_exp[offset : offset + data_size],
+                )
             offset += data_size
 
     def _pack_vector(self, quantities_x: List[Quantity], quantities_y: List[Quantity]):
@@ -452,6 +629,28 @@ class HaloDataTransformerCPU(HaloDataTransformer):
             info_x,
             info_y,
         ) in zip(quantities_x, quantities_y, self._infos_x, self._infos_y):
+            if self._is_indexable(quantity_x, info_x) and self._is_indexable(
+                quantity_y, info_y
+            ):
+                # Indices carry the scalar rotation, the vector rotation
+                # is a swap of the components and a sign
+                components = ((quantity_x, info_x), (quantity_y, info_y))
+                for component, sign in _VECTOR_PACK_COMPONENTS[
+                    -info_x.pack_clockwise_rotation % 4
+                ]:
+                    quantity, info = components[component]
+                    data_size = info.pack_buffer_size
+                    packed = self._pack_buffer.array[offset : offset + data_size]
+                    np.take(
+                        _flat_view(quantity.data),
+                        self._pack_indices[info._id],
+                        out=packed,
+                    )
+                    if sign < 0:
+                        np.negative(packed, out=packed)
+                    offset += data_size
+                continue
+
             # sending data across the boundary will rotate the data
             # n_clockwise_rotations times, due to the difference in axis orientation
             # Thus we rotate that number of times counterclockwise before sending,
@@ -492,6 +691,31 @@ class HaloDataTransformerCPU(HaloDataTransformer):
 
         assert isinstance(self._unpack_buffer, Buffer)  # e.g. allocate happened
 
+    def _unpack_quantity(
+        self, quantity: Quantity, info: HaloExchangeSpec, offset: int
+    ) -> int:
+        """Unpack a single quantity from the buffer at offset.
+
+        Returns:
+            offset of the next quantity in the buffer.
+        """
+        assert isinstance(self._unpack_buffer, Buffer)  # e.g. allocate happened
+        data_size = info._unpack_buffer_size
+        if self._is_indexable(quantity, info):
+            np.put(
+                _flat_view(quantity.data),
+                self._unpack_indices[info._id],
+                self._unpack_buffer.array[offset : offset + data_size],
+            )
+        else:
+            quantity_view = quantity.data[info.unpack_slices]
+            self._unpack_buffer.assign_to(
+                quantity_view,
+                buffer_slice=np.index_exp[offset : offset + data_size],
+                buffer_reshape=quantity_view.shape,
+            )
+        return offset + data_size
+
     def _unpack_scalar(self, quantities: List[Quantity]):
         if __debug__:
             if len(quantities) != len(self._infos_x):
@@ -504,14 +728,7 @@ class HaloDataTransformerCPU(HaloDataTransformer):
         assert isinstance(self._unpack_buffer, Buffer)  # e.g. allocate happened
         offset = 0
         for quantity, info_x in zip(quantities, self._infos_x):
-            quantity_view = quantity.data[info_x.unpack_slices]
-            data_size = _slices_size(info_x.unpack_slices)
-            self._unpack_buffer.assign_to(
-                quantity_view,
-                buffer_slice=np.index_exp[offset : offset + data_size],
-                buffer_reshape=quantity_view.shape,
-            )
-            offset += data_size
+            offset = self._unpack_quantity(quantity, info_x, offset)
 
     def _unpack_vector(
         self, quantities_x: List[Quantity], quantities_y: List[Quantity]
@@ -532,22 +749,8 @@ class HaloDataTransformerCPU(HaloDataTransformer):
         for quantity_x, quantity_y, info_x, info_y in zip(
             quantities_x, quantities_y, self._infos_x, self._infos_y
         ):
-            quantity_view = quantity_x.data[info_x.unpack_slices]
-            data_size = _slices_size(info_x.unpack_slices)
-            self._unpack_buffer.assign_to(
-                quantity_view,
-                buffer_slice=np.index_exp[offset : offset + data_size],
-                buffer_reshape=quantity_view.shape,
-            )
-            offset += data_size
-            quantity_view = quantity_y.data[info_y.unpack_slices]
-            data_size = _slices_size(info_y.unpack_slices)
-            self._unpack_buffer.assign_to(
-                quantity_view,
-                buffer_slice=np.index_exp[offset : offset + data_size],
-                buffer_reshape=quantity_view.shape,
-            )
-            offset += data_size
+            offset = self._unpack_quantity(quantity_x, info_x, offset)
+            offset = self._unpack_quantity(quantity_y, info_y, offset)
 
 
 class HaloDataTransformerGPU(HaloDataTransformer):
@@ -581,12 +784,14 @@ class HaloDataTransformerGPU(HaloDataTransformer):
         np_module: NumpyModule,
         exchange_descriptors_x: Sequence[HaloExchangeSpec],
         exchange_descriptors_y: Optional[Sequence[HaloExchangeSpec]] = None,
+        pack_allocator: Optional[Allocator] = None,
     ) -> None:
         self._cu_kernel_args: Dict[UUID, HaloDataTransformerGPU._CuKernelArgs] = {}
         super().__init__(
             np_module,
             exchange_descriptors_x,
             exchange_descriptors_y=exchange_descriptors_y,
+            pack_allocator=pack_allocator,
         )
 
     def _flatten_indices(
@@ -990,3 +1195,139 @@ class HaloDataTransformerGPU(HaloDataTransformer):
         # Push the streams back in the pool
         for cu_info in self._cu_kernel_args.values():
             _push_stream(cu_info.stream)
+
+
+class HaloDataTransformerComposite(HaloDataTransformer):
+    """Pack/unpack scalar and vector data for a single neighbor in one buffer.
+
+    Aggregates a scalar and a vector transformer (CPU or GPU, depending on the
+    numpy-like module), each of them packing into its own region of a shared
+    buffer. All the data going to a rank can then travel in a single message.
+
+    Quantities are given in the vector format, with the scalar quantities first:
+    quantities_x is [scalars..., x-components...] and quantities_y is
+    [y-components...].
+    """
+
+    def __init__(
+        self,
+        np_module: NumpyModule,
+        exchange_descriptors: Sequence[HaloExchangeSpec],
+        exchange_descriptors_x: Sequence[HaloExchangeSpec],
+        exchange_descriptors_y: Sequence[HaloExchangeSpec],
+        pack_allocator: Optional[Allocator] = None,
+    ) -> None:
+        """
+        Args:
+            np_module: numpy-like module for allocation
+            exchange_descriptors: list of memory information describing
+                a scalar exchange.
+            exchange_descriptors_x: list of memory information describing an
+                exchange of the x-component of vectors.
+            exchange_descriptors_y: list of memory information describing an
+                exchange of the y-component of vectors.
+            pack_allocator: allocates the shared pack buffer, defaults to
+                np_module.zeros
+        """
+        if len(exchange_descriptors_x) != len(exchange_descriptors_y):
+            raise RuntimeError(
+                "Vector halo exchange must have same exchange data for X and Y"
+            )
+        all_descriptors = (
+            list(exchange_descriptors)
+            + list(exchange_descriptors_x)
+            + list(exchange_descriptors_y)
+        )
+        if len(all_descriptors) == 0:
+            raise RuntimeError("Attempting to init an empty halo exchange")
+        dtype = all_descriptors[0].specification.dtype
+        for desc in all_descriptors:
+            if dtype != desc.specification.dtype:
+                raise NotImplementedError("Halo exchange process mixed precision")
+
+        self._n_scalars = len(exchange_descriptors)
+        self._scalar_transformer: Optional[HaloDataTransformer] = None
+        self._vector_transformer: Optional[HaloDataTransformer] = None
+        self._descriptors = tuple(exchange_descriptors)
+        self._descriptors_x = tuple(exchange_descriptors_x)
+        self._descriptors_y = tuple(exchange_descriptors_y)
+        # All descriptors are given as scalar so the shared buffers are sized
+        # to hold every exchange
+        super().__init__(np_module, all_descriptors, pack_allocator=pack_allocator)
+        self._type = _HaloDataTransformerType.COMPOSITE
+
+    @property
+    def _transformers(self) -> List[HaloDataTransformer]:
+        return [
+            transformer
+            for transformer in (self._scalar_transformer, self._vector_transformer)
+            if transformer is not None
+        ]
+
+    def _compile(self):
+        # Super to get the shared buffers allocation
+        super()._compile()
+        assert isinstance(self._pack_buffer, Buffer)
+        assert isinstance(self._unpack_buffer, Buffer)
+
+        if len(self._descriptors) > 0:
+            self._scalar_transformer = HaloDataTransformer.get(
+                self._np_module, self._descriptors
+            )
+        if len(self._descriptors_x) > 0:
+            self._vector_transformer = HaloDataTransformer.get(
+                self._np_module,
+                self._descriptors_x,
+                exchange_descriptors_y=self._descriptors_y,
+            )
+
+        # Each transformer packs in its own region of the shared buffers
+        offset = 0
+        for transformer in self._transformers:
+            size = transformer.get_pack_buffer().array.size
+            transformer._bind_buffers(
+                Buffer(
+                    self._pack_buffer._key,
+                    self._pack_buffer.array[offset : offset + size],
+                ),
+                Buffer(
+                    self._unpack_buffer._key,
+                    self._unpack_buffer.array[offset : offset + size],
+                ),
+            )
+            offset += size
+
+    def finalize(self):
+        for transformer in self._transformers:
+            transformer.finalize()
+        super().finalize()
+
+    def synchronize(self):
+        for transformer in self._transformers:
+            transformer.synchronize()
+
+    def async_pack(
+        self,
+        quantities_x: List[Quantity],
+        quantities_y: Optional[List[Quantity]] = None,
+    ):
+        if self._scalar_transformer is not None:
+            self._scalar_transformer.async_pack(quantities_x[: self._n_scalars])
+        if self._vector_transformer is not None:
+            assert quantities_y is not None
+            self._vector_transformer.async_pack(
+                quantities_x[self._n_scalars :], quantities_y
+            )
+
+    def async_unpack(
+        self,
+        quantities_x: List[Quantity],
+        quantities_y: Optional[List[Quantity]] = None,
+    ):
+        if self._scalar_transformer is not None:
+            self._scalar_transformer.async_unpack(quantities_x[: self._n_scalars])
+        if self._vector_transformer is not None:
+            assert quantities_y is not None
+            self._vector_transformer.async_unpack(
+                quantities_x[self._n_scalars :], quantities_y
+            )
@@ -6,11 +6,17 @@ import numpy as np
 import ndsl.constants as constants
 from ndsl.buffer import Buffer
 from ndsl.comm.boundary import Boundary
-from ndsl.halo.data_transformer import HaloDataTransformer, HaloExchangeSpec
+from ndsl.comm.comm_abc import Comm, PersistentRequest, Request
+from ndsl.halo.data_transformer import (
+    HaloDataTransformer,
+    HaloDataTransformerComposite,
+    HaloExchangeSpec,
+)
 from ndsl.halo.rotate import rotate_scalar_data
+from ndsl.performance.memory import MEMORY_REGISTRY
 from ndsl.performance.timer import NullTimer, Timer
 from ndsl.quantity import Quantity, QuantityHaloSpec
-from ndsl.types import AsyncRequest, NumpyModule
+from ndsl.types import Allocator, AsyncRequest, NumpyModule
 from ndsl.utils import device_synchronize
 
 
@@ -26,6 +32,42 @@ _HaloRequestRecvList = List[_HaloRecvTuple]
 TIMER_HALO_EX_KEY = "halo_exchange_global"
 
 
+def _startall(comm, requests: List[PersistentRequest]):
+    # A raw mpi4py comm has no Startall, it lives on the request class
+    if isinstance(comm, Comm):
+        comm.Startall(requests)
+    else:
+        for request in requests:
+            request.Start()
+
+
+def _waitall(comm, requests: List[Request]):
+    if isinstance(comm, Comm):
+        comm.Waitall(requests)
+    else:
+        for request in requests:
+            request.wait()
+
+
+def _waitany(comm, requests: List[Request]) -> int:
+    if isinstance(comm, Comm):
+        return comm.Waitany(requests)
+    # mpi4py requests carry Waitany on their class
+    waitany = getattr(type(requests[0]), "Waitany", None)
+    if waitany is not None:
+        return waitany(requests)
+    requests[0].wait()
+    return 0
+
+
+def _buffer_allocator(comm: "Communicator", numpy_module: NumpyModule) -> Allocator:
+    # Comms able to send some memory without a copy allocate the pack buffers
+    mpi_comm = getattr(comm, "comm", None)
+    if isinstance(mpi_comm, Comm):
+        return mpi_comm.buffer_allocator(numpy_module)
+    return numpy_module.zeros
+
+
 class HaloUpdater:
     """Exchange halo information between ranks.
 
@@ -35,9 +77,15 @@ class HaloUpdater:
 
     - from_scalar_specifications/from_vector_specifications are used to
       create a HaloUpdater from a list of memory specifications
+    - from_specifications mixes scalar and vector specifications, coalescing
+      all data going to a rank into a single message
     - update and start/wait trigger the halo exchange
     - the class creates a "pattern" of exchange that can fit
       any memory given to do/start
+    - use_persistent_requests() opts in to persistent communication requests,
+      created once and restarted on every exchange
+    - use_overlapped_wait() opts in to unpacking each neighbour as soon as
+      its data lands, instead of after all messages are received
     - temporary references to the Quanitites are held between start and wait
     """
 
@@ -66,6 +114,17 @@ class HaloUpdater:
         self._inflight_x_quantities: Optional[Tuple[Quantity, ...]] = None
         self._inflight_y_quantities: Optional[Tuple[Quantity, ...]] = None
         self._finalize_on_wait = False
+        self._use_persistent_requests = False
+        self._persistent_recv_requests: Optional[List[PersistentRequest]] = None
+        self._persistent_send_requests: Optional[List[PersistentRequest]] = None
+        self._overlapped_wait = False
+        if MEMORY_REGISTRY.enabled:
+            for transformer in transformers.values():
+                for buffer in (transformer._pack_buffer, transformer._unpack_buffer):
+                    if buffer is not None:
+                        MEMORY_REGISTRY.track(
+                            buffer.array, "halo", f"HaloUpdater(tag={tag})"
+                        )
 
     def force_finalize_on_wait(self):
         """HaloDataTransformer are finalized after a wait call
@@ -74,6 +133,60 @@ class HaloUpdater:
         """
         self._finalize_on_wait = True
 
+    def use_persistent_requests(self):
+        """Exchange through persistent requests (e.g. MPI Send_init/Recv_init).
+
+        Buffers, peers and tags of an updater never change after construction:
+        requests are created on the first start() and each exchange then only
+        calls Startall/Waitall. Works with `Comm` implementations and mpi4py
+        communicators.
+        """
+        if self._inflight_x_quantities is not None:
+            raise RuntimeError("Cannot change request mode during an exchange")
+        self._use_persistent_requests = True
+
+    def use_overlapped_wait(self):
+        """Unpack each neighbour's halo as soon as its receive completes.
+
+        wait() picks completed receives with Waitany, so unpacking data from
+        the fastest neighbours overlaps with the slowest messages still in
+        flight. Sends are waited on last. Comms whose requests can't tell
+        their completion before being waited on, e.g. LocalComm, unpack in
+        order.
+        """
+        if self._inflight_x_quantities is not None:
+            raise RuntimeError("Cannot change wait mode during an exchange")
+        self._overlapped_wait = True
+
+    def _init_persistent_requests(self):
+        self._persistent_recv_requests = []
+        self._persistent_send_requests = []
+        for to_rank, transformer in self._transformers.items():
+            self._persistent_recv_requests.append(
+                self._comm.comm.Recv_init(
+                    transformer.get_unpack_buffer().array,
+                    source=to_rank,
+                    tag=self._tag,
+                )
+            )
+            self._persistent_send_requests.append(
+                self._comm.comm.Send_init(
+                    transformer.get_pack_buffer().array,
+                    dest=to_rank,
+                    tag=self._tag,
+                )
+            )
+
+    def _free_persistent_requests(self):
+        for request in (self._persistent_recv_requests or []) + (
+            self._persistent_send_requests or []
+        ):
+            free = getattr(request, "Free", None)
+            if free is not None:
+                free()
+        self._persistent_recv_requests = None
+        self._persistent_send_requests = None
+
     def __del__(self):
         """Clean up all buffers on garbage collection"""
         if (
@@ -83,6 +196,7 @@ class HaloUpdater:
             raise RuntimeError(
                 "An halo exchange wasn't completed and a wait() call was expected"
             )
+        self._free_persistent_requests()
         if not self._finalize_on_wait:
             for transformer in self._transformers.values():
                 transformer.finalize()
@@ -134,7 +248,9 @@ class HaloUpdater:
         transformers: Dict[int, HaloDataTransformer] = {}
         for rank, exchange_specs in exchange_specs_dict.items():
             transformers[rank] = HaloDataTransformer.get(
-                numpy_like_module, exchange_specs
+                numpy_like_module,
+                exchange_specs,
+                pack_allocator=_buffer_allocator(comm, numpy_like_module),
             )
 
         return cls(comm, tag, transformers, timer)
@@ -201,6 +317,83 @@ class HaloUpdater:
                 numpy_like_module,
                 exchange_descriptor_x,
                 exchange_descriptors_y=exchange_descriptor_y,
+                pack_allocator=_buffer_allocator(comm, numpy_like_module),
+            )
+
+        return cls(comm, tag, transformers, timer)
+
+    @classmethod
+    def from_specifications(
+        cls,
+        comm: "Communicator",
+        numpy_like_module: NumpyModule,
+        specifications: Iterable[QuantityHaloSpec],
+        specifications_x: Iterable[QuantityHaloSpec],
+        specifications_y: Iterable[QuantityHaloSpec],
+        boundaries: Iterable[Boundary],
+        tag: int,
+        optional_timer: Optional[Timer] = None,
+    ) -> "HaloUpdater":
+        """
+        Create/retrieve one packed buffer per neighboring rank for a mix of
+        scalar and vector data and queue the slices to exchange.
+
+        Quantities given to start/update must be ordered as [scalars...,
+        x-components...] for quantities_x and [y-components...] for quantities_y.
+
+        Args:
+            comm: communicator to post network messages
+            numpy_like_module: module implementing numpy API
+            specifications: scalar data specifications to exchange.
+            specifications_x: vector specifications to exchange along the x axis.
+                Length must match y specifications.
+            specifications_y: vector specifications to exchange along the y axis.
+                Length must match x specifications.
+            boundaries: informations on the exchange boundaries.
+            tag: network tag (to differentiate messaging) for this node.
+            optional_timer: timing of operations.
+
+        Returns:
+            HaloUpdater ready to exchange data.
+        """
+        timer = optional_timer if optional_timer is not None else NullTimer()
+        specifications = list(specifications)
+        specifications_x = list(specifications_x)
+        specifications_y = list(specifications_y)
+        if len(specifications_x) != len(specifications_y):
+            raise ValueError("Vector specifications must have same length for x & y")
+
+        # Sort the specifications per target rank
+        exchange_specs_dict = defaultdict(list)
+        exchange_specs_x_dict = defaultdict(list)
+        exchange_specs_y_dict = defaultdict(list)
+        for boundary in boundaries:
+            for specs, specs_dict in (
+                (specifications, exchange_specs_dict),
+                (specifications_x, exchange_specs_x_dict),
+                (specifications_y, exchange_specs_y_dict),
+            ):
+                for specification in specs:
+                    specs_dict[boundary.to_rank].append(
+                        HaloExchangeSpec(
+                            specification,
+                            boundary.send_slice(specification),
+                            boundary.n_clockwise_rotations,
+                            boundary.recv_slice(specification),
+                        )
+                    )
+
+        # One transformer per target rank, packing scalars and vectors together
+        transformers: Dict[int, HaloDataTransformer] = {}
+        for rank in dict.fromkeys(
+            list(exchange_specs_dict) + list(exchange_specs_x_dict)
+        ):
+            transformers[rank] = HaloDataTransformerComposite(
+                numpy_like_module,
+                exchange_specs_dict[rank],
+                exchange_specs_x_dict[rank],
+                exchange_specs_y_dict[rank],
+                pack_allocator=_buffer_allocator(comm, numpy_like_module),
             )
 
         return cls(comm, tag, transformers, timer)
@@ -233,6 +426,11 @@ class HaloUpdater:
 
         self._timer.start(TIMER_HALO_EX_KEY)
 
+        if self._use_persistent_requests:
+            self._start_persistent(quantities_x, quantities_y)
+            self._timer.stop(TIMER_HALO_EX_KEY)
+            return
+
         # Post recv MPI order
         with self._timer.clock("Irecv"):
             self._recv_requests = []
@@ -269,6 +467,41 @@ class HaloUpdater:
 
         self._timer.stop(TIMER_HALO_EX_KEY)
 
+    def _start_persistent(
+        self,
+        quantities_x: List[Quantity],
+        quantities_y: Optional[List[Quantity]] = None,
+    ):
+        """Start data exchange re-using persistent requests."""
+        if self._persistent_recv_requests is None:
+            self._init_persistent_requests()
+        assert self._persistent_recv_requests is not None
+        assert self._persistent_send_requests is not None
+
+        # Post recv MPI order
+        with self._timer.clock("Irecv"):
+            _startall(self._comm.comm, self._persistent_recv_requests)
+            self._recv_requests = list(self._persistent_recv_requests)
+
+        # Pack quantities halo points data into buffers
+        with self._timer.clock("pack"):
+            for transformer in self._transformers.values():
+                transformer.async_pack(quantities_x, quantities_y)
+            # Requests were bound to the buffers at creation, pack must be
+            # finished before sends start
+            for transformer in self._transformers.values():
+                transformer.synchronize()
+
+        self._inflight_x_quantities = tuple(quantities_x)
+        self._inflight_y_quantities = (
+            tuple(quantities_y) if quantities_y is not None else None
+        )
+
+        # Post send MPI order
+        with self._timer.clock("Isend"):
+            _startall(self._comm.comm, self._persistent_send_requests)
+            self._send_requests = list(self._persistent_send_requests)
+
     def wait(self):
         """Finalize data exchange."""
         if __debug__ and self._inflight_x_quantities is None:
@@ -276,21 +509,32 @@ class HaloUpdater:
 
         self._timer.start(TIMER_HALO_EX_KEY)
 
-        # Wait message to be exchange
-        with self._timer.clock("wait"):
-            for send_req in self._send_requests:
-                send_req.wait()
-            for recv_req in self._recv_requests:
-                recv_req.wait()
+        if self._overlapped_wait:
+            self._wait_overlapped()
+        else:
+            # Wait message to be exchange
+            with self._timer.clock("wait"):
+                if self._use_persistent_requests:
+                    _waitall(self._comm.comm, self._send_requests)
+                    _waitall(self._comm.comm, self._recv_requests)
+                else:
+                    for send_req in self._send_requests:
+                        send_req.wait()
+                    for recv_req in self._recv_requests:
+                        recv_req.wait()
+
+            # Unpack buffers (updated by MPI with neighbouring halos)
+            # to proper quantities
+            with self._timer.clock("unpack"):
+                for buffer in self._transformers.values():
+                    buffer.async_unpack(
+                        self._inflight_x_quantities, self._inflight_y_quantities
+                    )
 
-        # Unpack buffers (updated by MPI with neighbouring halos)
-        # to proper quantities
         with self._timer.clock("unpack"):
-            for buffer in self._transformers.values():
-                buffer.async_unpack(
-                    self._inflight_x_quantities, self._inflight_y_quantities
-                )
             if self._finalize_on_wait:
+                # Buffers go back to the cache, requests bound to them are stale
+                self._free_persistent_requests()
                 for transformer in self._transformers.values():
                     transformer.finalize()
             else:
@@ -302,6 +546,22 @@ class HaloUpdater:
 
         self._timer.stop(TIMER_HALO_EX_KEY)
 
+    def _wait_overlapped(self):
+        """Unpack transformers in order of receive completion, then wait sends."""
+        # Receive requests are posted in transformer order
+        pending_transformers = list(self._transformers.values())
+        pending_requests = list(self._recv_requests)
+        while len(pending_requests) > 0:
+            with self._timer.clock("wait"):
+                index = _waitany(self._comm.comm, pending_requests)
+            pending_requests.pop(index)
+            with self._timer.clock("unpack"):
+                pending_transformers.pop(index).async_unpack(
+                    self._inflight_x_quantities, self._inflight_y_quantities
+                )
+        with self._timer.clock("wait"):
+            _waitall(self._comm.comm, self._send_requests)
+
 
 class HaloUpdateRequest:
     """Asynchronous request object for halo updates."""
@@ -434,8 +694,6 @@ class VectorInterfaceHaloUpdater:
             x_quantity.np,
             -south_boundary.n_clockwise_rotations,
         )
-        if south_boundary.n_clockwise_rotations in (3, 2):
-            south_data = -south_data
         west_data = y_quantity.view.southwest.sel(
             **{
                 constants.X_INTERFACE_DIM: 0,
@@ -450,18 +708,18 @@ class VectorInterfaceHaloUpdater:
             y_quantity.np,
             -west_boundary.n_clockwise_rotations,
         )
-        if west_boundary.n_clockwise_rotations in (1, 2):
-            west_data = -west_data
         send_requests = [
             self._Isend(
                 self._maybe_force_cpu(x_quantity.np),
                 south_data,
+                negate=south_boundary.n_clockwise_rotations in (3, 2),
                 dest=south_boundary.to_rank,
                 tag=tag,
             ),
             self._Isend(
                 self._maybe_force_cpu(y_quantity.np),
                 west_data,
+                negate=west_boundary.n_clockwise_rotations in (1, 2),
                 dest=west_boundary.to_rank,
                 tag=tag,
             ),
@@ -514,13 +772,18 @@ class VectorInterfaceHaloUpdater:
         ]
         return recv_requests
 
-    def _Isend(self, numpy_module, in_array, **kwargs) -> _HaloSendTuple:
+    def _Isend(
+        self, numpy_module, in_array, negate: bool = False, **kwargs
+    ) -> _HaloSendTuple:
         # copy the resulting view in a contiguous array for transfer
         with self.timer.clock("pack"):
             buffer = Buffer.pop_from_cache(
                 numpy_module.zeros, in_array.shape, in_array.dtype
             )
             buffer.assign_from(in_array)
+            if negate:
+                # in place on the buffer, rather than on a negated temporary
+                numpy_module.negative(buffer.array, out=buffer.array)
             buffer.finalize_memory_transfer()
         with self.timer.clock("Isend"):
             request = self.comm.Isend(buffer.array, **kwargs)
@@ -1,2 +1,3 @@
 from .allocator import QuantityFactory
+from .arena import QuantityArena
 from .sizer import GridSizer, SubtileGridSizer
@@ -4,7 +4,9 @@ import numpy as np
 
 from ..constants import SPATIAL_DIMS
 from ..optional_imports import gt4py
+from ..performance.memory import MEMORY_REGISTRY
 from ..quantity import Quantity, QuantityHaloSpec
+from .arena import QuantityArena
 from .sizer import GridSizer
 
 
@@ -29,9 +31,24 @@ class StorageNumpy:
 
 
 class QuantityFactory:
-    def __init__(self, sizer: GridSizer, numpy):
+    def __init__(
+        self,
+        sizer: GridSizer,
+        numpy,
+        arena: Optional[QuantityArena] = None,
+        name: str = "QuantityFactory",
+    ):
+        """
+        Args:
+            sizer: object which determines array sizes
+            numpy: numpy-like module used to allocate data
+            arena: if given, data is allocated from this arena instead
+            name: owner of the allocated data in memory reports
+        """
         self.sizer: GridSizer = sizer
         self._numpy = numpy
+        self.arena = arena
+        self.name = name
 
     def set_extra_dim_lengths(self, **kwargs):
         """
@@ -40,15 +57,23 @@ class QuantityFactory:
         self.sizer.extra_dim_lengths.update(kwargs)
 
     @classmethod
-    def from_backend(cls, sizer: GridSizer, backend: str):
+    def from_backend(
+        cls,
+        sizer: GridSizer,
+        backend: str,
+        arena: Optional[QuantityArena] = None,
+        name: str = "QuantityFactory",
+    ):
         """Initialize a QuantityFactory to use a specific gt4py backend.
 
         Args:
             sizer: object which determines array sizes
             backend: gt4py backend
+            arena: if given, data is allocated from this arena instead
+            name: owner of the allocated data in memory reports
         """
         numpy = StorageNumpy(backend)
-        return cls(sizer, numpy)
+        return cls(sizer, numpy, arena=arena, name=name)
 
     def _backend(self) -> Optional[str]:
         try:
@@ -64,7 +89,12 @@ class QuantityFactory:
         allow_mismatch_float_precision: bool = False,
     ):
         return self._allocate(
-            self._numpy.empty, dims, units, dtype, allow_mismatch_float_precision
+            self._numpy.empty,
+            dims,
+            units,
+            dtype,
+            allow_mismatch_float_precision,
+            fill_value=None,
         )
 
     def zeros(
@@ -75,7 +105,12 @@ class QuantityFactory:
         allow_mismatch_float_precision: bool = False,
     ):
         return self._allocate(
-            self._numpy.zeros, dims, units, dtype, allow_mismatch_float_precision
+            self._numpy.zeros,
+            dims,
+            units,
+            dtype,
+            allow_mismatch_float_precision,
+            fill_value=0,
         )
 
     def ones(
@@ -86,7 +121,12 @@ class QuantityFactory:
         allow_mismatch_float_precision: bool = False,
     ):
         return self._allocate(
-            self._numpy.ones, dims, units, dtype, allow_mismatch_float_precision
+            self._numpy.ones,
+            dims,
+            units,
+            dtype,
+            allow_mismatch_float_precision,
+            fill_value=1,
         )
 
     def from_array(
@@ -118,6 +158,7 @@ class QuantityFactory:
         units: str,
         dtype: type = np.float64,
         allow_mismatch_float_precision: bool = False,
+        fill_value: Optional[int] = None,
     ):
         origin = self.sizer.get_origin(dims)
         extent = self.sizer.get_extent(dims)
@@ -130,13 +171,25 @@ class QuantityFactory:
                 zip(dims, ("I", "J", "K", *([None] * (len(dims) - 3))))
             )
         ]
-        try:
-            data = allocator(
-                shape, dtype=dtype, aligned_index=origin, dimensions=dimensions
+        if self.arena is not None:
+            data = self.arena.allocate(
+                shape,
+                dtype=dtype,
+                backend=self._backend(),
+                aligned_index=origin,
+                dimensions=dimensions,
+                numpy=self._numpy,
             )
-        except TypeError:
-            data = allocator(shape, dtype=dtype)
-        return Quantity(
+            if fill_value is not None:
+                data[...] = fill_value
+        else:
+            try:
+                data = allocator(
+                    shape, dtype=dtype, aligned_index=origin, dimensions=dimensions
+                )
+            except TypeError:
+                data = allocator(shape, dtype=dtype)
+        quantity = Quantity(
             data,
             dims=dims,
             units=units,
@@ -145,6 +198,9 @@ class QuantityFactory:
             gt4py_backend=self._backend(),
             allow_mismatch_float_precision=allow_mismatch_float_precision,
         )
+        if MEMORY_REGISTRY.enabled:
+            MEMORY_REGISTRY.track(quantity.data, "quantity", self.name)
+        return quantity
 
     def get_quantity_halo_spec(
         self,
@@ -167,7 +223,11 @@ class QuantityFactory:
         # we don't allocate
         # Refactor is filed in ticket DSL-820
 
-        temp_quantity = self.zeros(dims=dims, units="", dtype=dtype)
+        if self.arena is None:
+            temp_quantity = self.zeros(dims=dims, units="", dtype=dtype)
+        else:
+            with self.arena.scope():
+                temp_quantity = self.empty(dims=dims, units="", dtype=dtype)
 
         if n_halo is None:
             n_halo = self.sizer.n_halo
@@ -0,0 +1,265 @@
+import contextlib
+import dataclasses
+import functools
+import math
+import operator
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ndsl.optional_imports import cupy, gt4py
+from ndsl.types import NumpyModule
+
+
+# bytes per slab, larger requests get a slab of their own
+DEFAULT_SLAB_BYTES = 64 * 1024 * 1024
+# minimum alignment of every array, in bytes
+MIN_ALIGNMENT_BYTES = 64
+
+DEFAULT_COMPONENT = "default"
+
+ArenaKey = Tuple[Optional[str], str, Any]
+
+
+def _address(array) -> int:
+    if isinstance(array, np.ndarray):
+        return array.ctypes.data
+    return array.data.ptr
+
+
+def _lcm(a: int, b: int) -> int:
+    return a * b // math.gcd(a, b)
+
+
+@dataclasses.dataclass(frozen=True)
+class _Layout:
+    """Strides and padding of an array as gt4py would allocate it."""
+
+    shape: Tuple[int, ...]
+    strides: Tuple[int, ...]
+    nbytes: int
+    alignment: int
+    # bytes from the start of the array to the element which must be aligned
+    aligned_offset: int
+
+    @classmethod
+    def create(
+        cls,
+        shape: Sequence[int],
+        dtype: np.dtype,
+        layout_map: Sequence[int],
+        alignment_bytes: int,
+        aligned_index: Sequence[int],
+    ) -> "_Layout":
+        # follows gt4py.storage.allocators, so gt4py sees the layout as optimal
+        item_size = dtype.itemsize
+        items_per_block = (alignment_bytes // item_size) or 1
+        dims_layout = [list(layout_map).index(i) for i in range(len(shape))]
+        padded_shape = list(shape)
+        aligned_offset = 0
+        if len(shape) > 0:
+            contiguous_dim = dims_layout[-1]
+            padded_shape[contiguous_dim] = (
+                math.ceil(shape[contiguous_dim] / items_per_block) * items_per_block
+            )
+            aligned_offset = aligned_index[contiguous_dim] * item_size
+        strides = [item_size] * len(shape)
+        accumulator = item_size
+        for i in range(len(shape) - 2, -1, -1):
+            accumulator = strides[dims_layout[i]] = (
+                accumulator * padded_shape[dims_layout[i + 1]]
+            )
+        return cls(
+            shape=tuple(shape),
+            strides=tuple(strides),
+            nbytes=item_size * functools.reduce(operator.mul, padded_shape, 1),
+            alignment=_lcm(_lcm(alignment_bytes, item_size), MIN_ALIGNMENT_BYTES),
+            aligned_offset=aligned_offset,
+        )
+
+
+class _Slab:
+    def __init__(self, numpy: NumpyModule, nbytes: int):
+        self.array = numpy.empty(nbytes, dtype=np.uint8)
+        self.nbytes = nbytes
+        self.address = _address(self.array)
+
+    def start(self, offset: int, layout: _Layout) -> Optional[int]:
+        """Offset at which to place an array of the given layout, None if full."""
+        padding = -(self.address + offset + layout.aligned_offset) % layout.alignment
+        start = offset + padding
+        if start + layout.nbytes > self.nbytes:
+            return None
+        return start
+
+    def view(self, start: int, dtype: np.dtype, layout: _Layout):
+        if isinstance(self.array, np.ndarray):
+            return np.ndarray(
+                layout.shape,
+                dtype=dtype,
+                buffer=self.array,
+                offset=start,
+                strides=layout.strides,
+            )
+        return cupy.ndarray(
+            layout.shape,
+            dtype=dtype,
+            memptr=self.array.data + start,
+            strides=layout.strides,
+        )
+
+
+class _SlabGroup:
+    """Slabs of one backend and dtype, filled in order."""
+
+    def __init__(self, numpy: NumpyModule):
+        self.numpy = numpy
+        self.slabs: List[_Slab] = []
+        # slab currently allocated from, and the used bytes of that slab
+        self.index = 0
+        self.offset = 0
+
+    @property
+    def reserved_bytes(self) -> int:
+        return sum(slab.nbytes for slab in self.slabs)
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(slab.nbytes for slab in self.slabs[: self.index]) + self.offset
+
+    def allocate(self, dtype: np.dtype, layout: _Layout, slab_bytes: int):
+        if self.index < len(self.slabs):
+            start = self.slabs[self.index].start(self.offset, layout)
+            if start is not None:
+                self.offset = start + layout.nbytes
+                return self.slabs[self.index].view(start, dtype, layout)
+            self.index += 1
+        if self.index < len(self.slabs):
+            start = self.slabs[self.index].start(0, layout)
+        else:
+            start = None
+        if start is None:
+            # the alignment padding is at most layout.alignment - 1 bytes
+            nbytes = max(slab_bytes, layout.nbytes + layout.alignment)
+            self.slabs.insert(self.index, _Slab(self.numpy, nbytes))
+            start = self.slabs[self.index].start(0, layout)
+        self.offset = start + layout.nbytes
+        return self.slabs[self.index].view(start, dtype, layout)
+
+
+class QuantityArena:
+    """
+    Allocates quantity data as views into a few large slabs, one set of slabs
+    per backend and dtype.
+
+    Arrays have the padding, strides and alignment gt4py would give them, so
+    they are used by stencils as is. Memory is only returned to the arena in
+    bulk, at the end of a scope: arrays allocated within `scope()` must not
+    be used after it exits. Memory use is reported per component, set with
+    `component()`.
+    """
+
+    def __init__(self, slab_bytes: int = DEFAULT_SLAB_BYTES):
+        """
+        Args:
+            slab_bytes: size of the slabs, larger arrays get a slab of their own
+        """
+        self.slab_bytes = slab_bytes
+        self._groups: Dict[ArenaKey, _SlabGroup] = {}
+        self._component_bytes: Dict[str, int] = {}
+        self._component = DEFAULT_COMPONENT
+
+    def allocate(
+        self,
+        shape: Sequence[int],
+        dtype: Any = np.float64,
+        backend: Optional[str] = None,
+        aligned_index: Optional[Sequence[int]] = None,
+        dimensions: Optional[Sequence[str]] = None,
+        numpy: NumpyModule = np,
+    ):
+        """Allocate an uninitialized array.
+
+        Args:
+            shape: shape of the array
+            dtype: dtype of the array
+            backend: gt4py backend whose layout to use, C-ordered if not given
+            aligned_index: index of the element to align, usually the origin
+            dimensions: gt4py dimension names of each axis, as for
+                gt4py.storage.empty
+            numpy: numpy-like module to allocate with if backend is None
+        """
+        dtype = np.dtype(dtype)
+        if aligned_index is None:
+            aligned_index = (0,) * len(shape)
+        if backend is None:
+            layout_map: Sequence[int] = tuple(range(len(shape)))
+            alignment_bytes = dtype.itemsize
+        else:
+            storage_info = gt4py.cartesian.backend.from_name(backend).storage_info
+            if dimensions is None:
+                dimensions = ("I", "J", "K")[: len(shape)]
+            layout_map = storage_info["layout_map"](tuple(dimensions))
+            alignment_bytes = storage_info["alignment"] * dtype.itemsize
+            numpy = cupy if storage_info["device"] == "gpu" else np
+        layout = _Layout.create(
+            shape, dtype, layout_map, alignment_bytes, aligned_index
+        )
+        key = (backend, numpy.__name__, dtype)
+        if key not in self._groups:
+            self._groups[key] = _SlabGroup(numpy)
+        data = self._groups[key].allocate(dtype, layout, self.slab_bytes)
+        self._component_bytes[self._component] = (
+            self._component_bytes.get(self._component, 0) + layout.nbytes
+        )
+        return data
+
+    @contextlib.contextmanager
+    def scope(self) -> Iterator[None]:
+        """Return the memory of arrays allocated within the scope on exit."""
+        marks = {
+            key: (group.index, group.offset) for key, group in self._groups.items()
+        }
+        component_bytes = dict(self._component_bytes)
+        try:
+            yield
+        finally:
+            for key, group in self._groups.items():
+                group.index, group.offset = marks.get(key, (0, 0))
+            self._component_bytes = component_bytes
+
+    @contextlib.contextmanager
+    def component(self, name: str) -> Iterator[None]:
+        """Attribute the memory allocated within the context to a component."""
+        previous, self._component = self._component, name
+        try:
+            yield
+        finally:
+            self._component = previous
+
+    @property
+    def reserved_bytes(self) -> int:
+        """Bytes of all slabs."""
+        return sum(group.reserved_bytes for group in self._groups.values())
+
+    @property
+    def used_bytes(self) -> int:
+        """Bytes of the slabs in use, including alignment padding."""
+        return sum(group.used_bytes for group in self._groups.values())
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-serializable summary of the memory use."""
+        return {
+            "slab_bytes": self.slab_bytes,
+            "reserved_bytes": self.reserved_bytes,
+            "used_bytes": self.used_bytes,
+            "components": dict(self._component_bytes),
+            "slabs": {
+                f"{backend or numpy_name}:{dtype.name}": {
+                    "n_slabs": len(group.slabs),
+                    "reserved_bytes": group.reserved_bytes,
+                    "used_bytes": group.used_bytes,
+                }
+                for (backend, numpy_name, dtype), group in self._groups.items()
+            },
+        }
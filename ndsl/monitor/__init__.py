@@ -1,3 +1,3 @@
-from .netcdf_monitor import NetCDFMonitor
+from .netcdf_monitor import NetCDFMonitor, stitch_rank_files
 from .protocol import Monitor
 from .zarr_monitor import ZarrMonitor
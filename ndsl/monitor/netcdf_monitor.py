@@ -1,11 +1,16 @@
 import os
+import queue
+import re
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 
 import fsspec
 import numpy as np
 
+import ndsl.constants as constants
 from ndsl.comm.communicator import Communicator
+from ndsl.comm.partitioner import TilePartitioner
 from ndsl.optional_imports import xarray as xr
 
 from ..filesystem import get_fs
@@ -19,6 +24,17 @@ class _TimeChunkedVariable:
         self._data = np.zeros(
             (time_chunk_size, *initial.extent), dtype=initial.data.dtype
         )
+        self.reset(initial)
+
+    def reset(self, initial: Quantity):
+        """Start a new chunk at initial, re-using the buffer when it fits."""
+        if (
+            self._data.shape[1:] != tuple(initial.extent)
+            or self._data.dtype != initial.data.dtype
+        ):
+            self._data = np.zeros(
+                (self._data.shape[0], *initial.extent), dtype=initial.data.dtype
+            )
         self._data[0, ...] = to_numpy(initial.view[:])
         self._dims = initial.dims
         self._units = initial.units
@@ -42,11 +58,89 @@ class _TimeChunkedVariable:
         )
 
 
+class _BackgroundWriter:
+    """Runs write jobs in order on a background thread.
+
+    At most max_pending jobs wait in the queue, submitting more blocks
+    the caller until the thread catches up. Once closed, jobs are run on the
+    calling thread.
+    """
+
+    def __init__(self, max_pending: int):
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be at least 1, got {max_pending}")
+        # None is queued to stop the thread
+        self._queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue(
+            maxsize=max_pending
+        )
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name="NetCDFMonitorWriter", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            try:
+                if self._error is None:
+                    job()
+            except BaseException as err:
+                # skip the remaining jobs, the error is raised on the model thread
+                self._error = err
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("background netCDF write failed") from error
+
+    def submit(self, job: Callable[[], None]):
+        self._raise_error()
+        if self._thread.is_alive():
+            self._queue.put(job)
+        else:
+            job()
+
+    def drain(self):
+        """Wait for all submitted jobs to be written."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Write all submitted jobs and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+
+# HDF5 is not thread-safe, serializes the writes of all monitors of the process
+_NETCDF_LOCK = threading.Lock()
+
+
+def _write_netcdf(ds: "xr.Dataset", path: str):
+    with _NETCDF_LOCK:
+        Path(path).parent.mkdir(exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+        ds.to_netcdf(path, format="NETCDF4", engine="netcdf4")
+
+
 class _ChunkedNetCDFWriter:
     FILENAME_FORMAT = "state_{chunk:04d}_tile{tile}.nc"
 
     def __init__(
-        self, path: str, tile: int, fs: fsspec.AbstractFileSystem, time_chunk_size: int
+        self,
+        path: str,
+        tile: int,
+        fs: fsspec.AbstractFileSystem,
+        time_chunk_size: int,
+        background_writer: Optional[_BackgroundWriter] = None,
     ):
         self._path = path
         self._tile = tile
@@ -56,16 +150,48 @@ class _ChunkedNetCDFWriter:
         self._chunked: Optional[Dict[str, _TimeChunkedVariable]] = None
         self._times: List[Any] = []
         self._time_units: Optional[str] = None
+        self._background_writer = background_writer
+        # chunk buffers handed back by the background writer once written
+        self._spare_chunked: "queue.SimpleQueue[Dict[str, _TimeChunkedVariable]]" = (
+            queue.SimpleQueue()
+        )
+
+    def _new_chunk(self, state: Dict[str, Quantity]):
+        try:
+            chunked = self._spare_chunked.get_nowait()
+        except queue.Empty:
+            chunked = None
+        if chunked is not None and chunked.keys() == state.keys():
+            for name, quantity in state.items():
+                chunked[name].reset(quantity)
+            self._chunked = chunked
+        else:
+            self._chunked = {
+                name: _TimeChunkedVariable(quantity, self._time_chunk_size)
+                for name, quantity in state.items()
+            }
+
+    def _filename(self, chunk_index: int) -> str:
+        return _ChunkedNetCDFWriter.FILENAME_FORMAT.format(
+            chunk=chunk_index, tile=self._tile
+        )
+
+    def _attrs(self) -> Dict[str, Any]:
+        return {}
+
+    def _data_array(self, quantity: Quantity) -> "xr.DataArray":
+        return xr.DataArray(
+            quantity.view[:],
+            dims=quantity.dims,
+            attrs=quantity.attrs,
+        ).expand_dims({"tile": [self._tile]}, axis=1)
 
     def append(self, state):
         ndsl_log.debug("appending at time %d", self._i_time)
         state = {**state}  # copy so we don't mutate the input
         time = state.pop("time", None)
         if self._chunked is None:
-            self._chunked = {
-                name: _TimeChunkedVariable(quantity, self._time_chunk_size)
-                for name, quantity in state.items()
-            }
+            self._new_chunk(state)
         else:
             for name, quantity in state.items():
                 self._chunked[name].append(quantity)
@@ -81,28 +207,96 @@ class _ChunkedNetCDFWriter:
         else:
             data_vars = {"time": (["time"], self._times)}
             for name, chunked in self._chunked.items():
-                data_vars[name] = xr.DataArray(
-                    chunked.data.view[:],
-                    dims=chunked.data.dims,
-                    attrs=chunked.data.attrs,
-                ).expand_dims({"tile": [self._tile]}, axis=1)
-            ds = xr.Dataset(data_vars=data_vars)
+                data_vars[name] = self._data_array(chunked.data)
+            ds = xr.Dataset(data_vars=data_vars, attrs=self._attrs())
             chunk_index = self._i_time // self._time_chunk_size
-            chunk_path = str(
-                Path(self._path)
-                / _ChunkedNetCDFWriter.FILENAME_FORMAT.format(
-                    chunk=chunk_index, tile=self._tile
-                )
-            )
-            Path(self._path).mkdir(exist_ok=True)
-            if os.path.exists(chunk_path):
-                os.remove(chunk_path)
-            ds.to_netcdf(chunk_path, format="NETCDF4", engine="netcdf4")
+            chunk_path = str(Path(self._path) / self._filename(chunk_index))
+            if self._background_writer is None:
+                _write_netcdf(ds, chunk_path)
+            else:
+                # the dataset holds views of the chunk buffers, a new chunk
+                # gets other buffers until these are handed back once written
+                chunked = self._chunked
+
+                def write():
+                    _write_netcdf(ds, chunk_path)
+                    self._spare_chunked.put(chunked)
+
+                self._background_writer.submit(write)
 
         self._chunked = None
         self._times.clear()
 
 
+class _RankChunkedNetCDFWriter(_ChunkedNetCDFWriter):
+    """Writes the subtile of a single rank.
+
+    Files hold the tile decomposition and the rank position on the tile,
+    variables their full tile extent, so stitch_rank_files can reassemble
+    the tile.
+    """
+
+    FILENAME_FORMAT = "state_{chunk:04d}_tile{tile}_rank{tile_rank:04d}.nc"
+
+    def __init__(
+        self,
+        path: str,
+        tile: int,
+        fs: fsspec.AbstractFileSystem,
+        time_chunk_size: int,
+        partitioner: TilePartitioner,
+        tile_rank: int,
+        background_writer: Optional[_BackgroundWriter] = None,
+    ):
+        super().__init__(
+            path=path,
+            tile=tile,
+            fs=fs,
+            time_chunk_size=time_chunk_size,
+            background_writer=background_writer,
+        )
+        self._partitioner = partitioner
+        self._tile_rank = tile_rank
+
+    def _filename(self, chunk_index: int) -> str:
+        return _RankChunkedNetCDFWriter.FILENAME_FORMAT.format(
+            chunk=chunk_index, tile=self._tile, tile_rank=self._tile_rank
+        )
+
+    def _attrs(self) -> Dict[str, Any]:
+        attrs = {
+            "tile": self._tile,
+            "tile_rank": self._tile_rank,
+            "layout": list(self._partitioner.layout),
+            "subtile_index": list(self._partitioner.subtile_index(self._tile_rank)),
+            "edge_interior_ratio": self._partitioner.edge_interior_ratio,
+        }
+        if self._partitioner.subtile_cell_counts is not None:
+            # netCDF attributes are flat, the y counts come before the x counts
+            y_counts, x_counts = self._partitioner.subtile_cell_counts
+            attrs["subtile_cell_counts"] = list(y_counts) + list(x_counts)
+        return attrs
+
+    def _data_array(self, quantity: Quantity) -> "xr.DataArray":
+        # the first dimension is time, which global_extent leaves as is
+        tile_extent = self._partitioner.global_extent(quantity)[1:]
+        return xr.DataArray(
+            quantity.view[:],
+            dims=quantity.dims,
+            attrs={**quantity.attrs, "tile_extent": list(tile_extent)},
+        )
+
+
+def _to_float32(quantity: Quantity) -> Quantity:
+    # Allow mismatch precision here since this is I/O
+    return Quantity(
+        to_numpy(quantity.view[:]).astype(np.float32),
+        dims=quantity.dims,
+        units=quantity.units,
+        allow_mismatch_float_precision=True,
+    )
+
+
 class NetCDFMonitor:
     """
     sympl.Monitor-style object for storing model state dictionaries netCDF files.
@@ -115,6 +309,9 @@ class NetCDFMonitor:
         path: str,
         communicator: Communicator,
         time_chunk_size: int = 1,
+        write_in_background: bool = False,
+        max_pending_writes: int = 1,
+        per_rank_output: bool = False,
     ):
         """Create a NetCDFMonitor.
 
@@ -122,6 +319,15 @@ class NetCDFMonitor:
             path: directory in which to store data
             communicator: provides global communication to gather state
             time_chunk_size: number of times per file
+            write_in_background: write files on a background thread of the
+                root ranks, overlapping output with the model. Files are only
+                guaranteed to be written once .cleanup() returns.
+            max_pending_writes: number of files which can wait to be written
+                in the background before store blocks
+            per_rank_output: each rank writes its own subtile to
+                "state_<chunk>_tile<tile>_rank<tile rank>.nc" instead of
+                gathering the tile on its root rank, use stitch_rank_files
+                to read back full tiles. Constants are still gathered.
         """
         rank = communicator.rank
         self._tile_index = communicator.partitioner.tile_index(rank)
@@ -129,17 +335,38 @@ class NetCDFMonitor:
         self._fs = get_fs(path)
         self._communicator = communicator
         self._time_chunk_size = time_chunk_size
+        self._per_rank_output = per_rank_output
+        self._write_in_background = write_in_background
+        self._max_pending_writes = max_pending_writes
+        self.__background_writer: Optional[_BackgroundWriter] = None
         self.__writer: Optional[_ChunkedNetCDFWriter] = None
         self._expected_vars: Optional[Set[str]] = None
 
+    @property
+    def _background_writer(self) -> Optional[_BackgroundWriter]:
+        if self._write_in_background and self.__background_writer is None:
+            self.__background_writer = _BackgroundWriter(self._max_pending_writes)
+        return self.__background_writer
+
     @property
     def _writer(self):
-        if self.__writer is None:
+        if self.__writer is None and self._per_rank_output:
+            self.__writer = _RankChunkedNetCDFWriter(
+                path=self._path,
+                tile=self._tile_index,
+                fs=self._fs,
+                time_chunk_size=self._time_chunk_size,
+                partitioner=self._communicator.tile.partitioner,
+                tile_rank=self._communicator.tile.rank,
+                background_writer=self._background_writer,
+            )
+        elif self.__writer is None:
             self.__writer = _ChunkedNetCDFWriter(
                 path=self._path,
                 tile=self._tile_index,
                 fs=self._fs,
                 time_chunk_size=self._time_chunk_size,
+                background_writer=self._background_writer,
             )
         return self.__writer
 
@@ -165,9 +392,19 @@ class NetCDFMonitor:
                     set(state.keys()), self._expected_vars
                 )
             )
-        state = self._communicator.tile.gather_state(state, transfer_type=np.float32)
-        if state is not None:  # we are on root rank
-            self._writer.append(state)
+        if self._per_rank_output:
+            self._writer.append(
+                {
+                    name: value if name == "time" else _to_float32(value)
+                    for name, value in state.items()
+                }
+            )
+        else:
+            state = self._communicator.tile.gather_state(
+                state, transfer_type=np.float32
+            )
+            if state is not None:  # we are on root rank
+                self._writer.append(state)
 
     def store_constant(self, state: Dict[str, Quantity]) -> None:
         state = self._communicator.gather_state(state, transfer_type=np.float32)
@@ -177,28 +414,124 @@ class NetCDFMonitor:
             )
             for name, quantity in state.items():
                 path_for_grid = constants_filename + "_" + name + ".nc"
-
-                if self._fs.exists(path_for_grid):
-                    ds = xr.open_dataset(path_for_grid)
-                    ds = ds.load()
-                    ds[name] = xr.DataArray(
-                        quantity.view[:],
-                        dims=quantity.dims,
-                        attrs=quantity.attrs,
-                    )
+                if self._background_writer is None:
+                    self._write_constant(name, quantity, path_for_grid)
                 else:
-                    ds = xr.Dataset(
-                        data_vars={
-                            name: xr.DataArray(
-                                quantity.view[:],
-                                dims=quantity.dims,
-                                attrs=quantity.attrs,
+                    self._background_writer.submit(
+                        lambda name=name, quantity=quantity, path=path_for_grid: (
+                            self._write_constant(name, quantity, path)
+                        )
+                    )
+
+    def _write_constant(self, name: str, quantity: Quantity, path_for_grid: str):
+        with _NETCDF_LOCK:
+            if self._fs.exists(path_for_grid):
+                ds = xr.open_dataset(path_for_grid)
+                ds = ds.load()
+                ds[name] = xr.DataArray(
+                    quantity.view[:],
+                    dims=quantity.dims,
+                    attrs=quantity.attrs,
+                )
+            else:
+                ds = xr.Dataset(
+                    data_vars={
+                        name: xr.DataArray(
+                            quantity.view[:],
+                            dims=quantity.dims,
+                            attrs=quantity.attrs,
+                        )
+                    }
+                )
+            if os.path.exists(path_for_grid):
+                os.remove(path_for_grid)
+            ds.to_netcdf(path_for_grid, format="NETCDF4", engine="netcdf4")
+
+    def cleanup(self):
+        if self.__writer is not None:
+            self.__writer.flush()
+        if self.__background_writer is not None:
+            self.__background_writer.close()
+
+
+def _stitch_chunk(datasets: Dict[int, "xr.Dataset"], tile: int) -> "xr.Dataset":
+    first = datasets[min(datasets)]
+    layout = tuple(int(n) for n in first.attrs["layout"])
+    subtile_cell_counts = None
+    if "subtile_cell_counts" in first.attrs:
+        counts = [int(n) for n in first.attrs["subtile_cell_counts"]]
+        subtile_cell_counts = (tuple(counts[: layout[0]]), tuple(counts[layout[0] :]))
+    partitioner = TilePartitioner(
+        layout,
+        edge_interior_ratio=float(first.attrs.get("edge_interior_ratio", 1.0)),
+        subtile_cell_counts=subtile_cell_counts,
+    )
+    if sorted(datasets) != list(range(partitioner.total_ranks)):
+        raise ValueError(
+            f"expected files for ranks 0 to {partitioner.total_ranks - 1} "
+            f"of tile {tile}, got {sorted(datasets)}"
+        )
+    data_vars = {}
+    for name, variable in first.data_vars.items():
+        dims = variable.dims[1:]  # the first dimension is time
+        tile_extent = tuple(int(n) for n in variable.attrs["tile_extent"])
+        x_dim = next((dim for dim in dims if dim in constants.X_DIMS), None)
+        y_dim = next((dim for dim in dims if dim in constants.Y_DIMS), None)
+        rows = []
+        for j in range(layout[0] if y_dim is not None else 1):
+            row = []
+            for i in range(layout[1] if x_dim is not None else 1):
+                tile_rank = j * layout[1] + i
+                # keep the points owned by the rank, interfaces are shared
+                rank_slice = partitioner.subtile_slice(
+                    tile_rank, dims, tile_extent, overlap=True
+                )
+                owned_slice = partitioner.subtile_slice(
+                    tile_rank, dims, tile_extent, overlap=False
+                )
+                row.append(
+                    datasets[tile_rank][name].isel(
+                        {
+                            dim: slice(
+                                owned.start - rank.start, owned.stop - rank.start
                             )
+                            for dim, rank, owned in zip(dims, rank_slice, owned_slice)
                         }
                     )
-                if os.path.exists(path_for_grid):
-                    os.remove(path_for_grid)
-                ds.to_netcdf(path_for_grid, format="NETCDF4", engine="netcdf4")
+                )
+            rows.append(row[0] if len(row) == 1 else xr.concat(row, dim=x_dim))
+        stitched = rows[0] if len(rows) == 1 else xr.concat(rows, dim=y_dim)
+        stitched.attrs = {
+            key: value for key, value in variable.attrs.items() if key != "tile_extent"
+        }
+        data_vars[name] = stitched.expand_dims({"tile": [tile]}, axis=1)
+    return xr.Dataset(data_vars=data_vars)
 
-    def cleanup(self):
-        self._writer.flush()
+
+def stitch_rank_files(path: str, tile: int) -> "xr.Dataset":
+    """Open the files written by a NetCDFMonitor with per_rank_output as
+    full tiles.
+
+    Data is read lazily from the rank files as dask arrays.
+
+    Args:
+        path: directory the monitor stored data in
+        tile: index of the tile to open
+
+    Returns:
+        dataset with the same variables and dimensions as the files written
+            without per_rank_output
+    """
+    pattern = re.compile(rf"state_(\d+)_tile{tile}_rank(\d+)\.nc$")
+    chunks: Dict[int, Dict[int, "xr.Dataset"]] = {}
+    for filename in sorted(os.listdir(path)):
+        match = pattern.match(filename)
+        if match is not None:
+            chunks.setdefault(int(match.group(1)), {})[int(match.group(2))] = (
+                xr.open_dataset(os.path.join(path, filename), chunks={})
+            )
+    if len(chunks) == 0:
+        raise FileNotFoundError(f"no per-rank files of tile {tile} in {path}")
+    return xr.concat(
+        [_stitch_chunk(chunks[chunk], tile) for chunk in sorted(chunks)], dim="time"
+    )
@@ -4,7 +4,7 @@ from typing import List, Tuple, Union
 import cftime
 
 import ndsl.constants as constants
-from ndsl.comm.partitioner import Partitioner, subtile_slice
+from ndsl.comm.partitioner import Partitioner
 from ndsl.logging import ndsl_log
 from ndsl.monitor.convert import to_numpy
 from ndsl.optional_imports import cupy
@@ -229,11 +229,10 @@ class _ZarrVariableWriter:
         target_slice = (
             self.i_time,
             self._partitioner.tile_index(self.rank),
-        ) + subtile_slice(
+        ) + self.partitioner.tile.subtile_slice(
+            self.rank,
             quantity.dims,
             self.array.shape[2:],  # remove time and tile dimensions
-            self.partitioner.layout,
-            self.partitioner.tile.subtile_index(self.rank),
             overlap=False,
         )
 
@@ -301,11 +300,12 @@ class _ZarrConstantWriter(_ZarrVariableWriter):
 
         self.sync_array()
 
-        target_slice = (self._partitioner.tile_index(self.rank),) + subtile_slice(
+        target_slice = (
+            self._partitioner.tile_index(self.rank),
+        ) + self.partitioner.tile.subtile_slice(
+            self.rank,
             quantity.dims,
             self.array.shape[1:],  # remove tile dimensions
-            self.partitioner.layout,
-            self.partitioner.tile.subtile_index(self.rank),
             overlap=False,
         )
 
@@ -1,19 +1,23 @@
 import copy
-import os.path
-import subprocess
 from collections.abc import Mapping
-from typing import List, Protocol
+from typing import Any, Dict, List, Protocol
 
 import numpy as np
 
 from ndsl.comm.comm_abc import Comm
 from ndsl.optional_imports import cupy as cp
+from ndsl.performance.memory import (
+    MEMORY_REGISTRY,
+    gather_memory_report,
+    reduce_memory_reports,
+)
 from ndsl.performance.report import (
     Report,
     TimeReport,
     collect_keys_from_data,
     gather_hit_counts,
     get_experiment_info,
+    get_git_hash,
     write_to_timestamped_json,
 )
 from ndsl.performance.timer import NullTimer, Timer
@@ -58,6 +62,20 @@ class AbstractPerformanceCollector(Protocol):
             cp.cuda.nvtx.Mark(message)
 
 
+def _buffer_cache_report() -> Dict[str, Any]:
+    # Imported here: ndsl.buffer depends on ndsl.performance for its timers
+    from ndsl.buffer import BUFFER_CACHE
+
+    return BUFFER_CACHE.report()
+
+
+def _rank_memory_report() -> Dict[str, Any]:
+    if not MEMORY_REGISTRY.enabled:
+        return {}
+    reports = [MEMORY_REGISTRY.report()]
+    return {"ranks": reports, "reduced": reduce_memory_reports(reports)}
+
+
 class PerformanceCollector(AbstractPerformanceCollector):
     def __init__(self, experiment_name: str, comm: Comm):
         self.times_per_step: List[Mapping[str, float]] = []
@@ -111,6 +129,8 @@ class PerformanceCollector(AbstractPerformanceCollector):
                 times=timing_info,
                 dt_atmos=dt_atmos,
                 sim_status=sim_status,
+                buffer_cache=_buffer_cache_report(),
+                memory=_rank_memory_report(),
             )
             write_to_timestamped_json(report)
         else:
@@ -123,17 +143,7 @@ class PerformanceCollector(AbstractPerformanceCollector):
         dt_atmos: float,
     ):
         if self.comm.Get_rank() == 0:
-            try:
-                driver_path = os.path.dirname(__file__)
-                git_hash = (
-                    subprocess.check_output(
-                        ["git", "-C", driver_path, "rev-parse", "HEAD"]
-                    )
-                    .decode()
-                    .rstrip()
-                )
-            except subprocess.CalledProcessError:
-                git_hash = "None"
+            git_hash = get_git_hash()
         else:
             git_hash = None
         git_hash = self.comm.bcast(git_hash, root=0)
@@ -143,6 +153,10 @@ class PerformanceCollector(AbstractPerformanceCollector):
         self.comm.Barrier()
         while {} in self.hits_per_step:
             self.hits_per_step.remove({})
+        if MEMORY_REGISTRY.enabled:
+            memory = gather_memory_report(self.comm)
+        else:
+            memory = {}
         collect_data_and_write_to_file(
             len(self.hits_per_step) - 1,
             backend,
@@ -153,6 +167,8 @@ class PerformanceCollector(AbstractPerformanceCollector):
             self.times_per_step,
             self.experiment_name,
             dt_atmos,
+            buffer_cache=_buffer_cache_report(),
+            memory=memory,
         )
 
 
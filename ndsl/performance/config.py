@@ -1,6 +1,7 @@
 import dataclasses
 
 from ndsl.comm.comm_abc import Comm
+from ndsl.performance.memory import MEMORY_REGISTRY
 from ndsl.performance.profiler import NullProfiler, Profiler
 
 from .collector import (
@@ -17,6 +18,7 @@ class PerformanceConfig:
     collect_performance: overall flag turning collection on/pff
     collect_cProfile: use cProfile for CPU Python profiling
     collect_communication: collect halo exchange details
+    collect_memory: track live allocations by owner, see MemoryRegistry
     experiment_name: to be printed in the JSON summary
     json_all_rank_threshold: number of nodes above the full performance
         report for all nodes won't be written (rank 0 is always written)
@@ -25,10 +27,13 @@ class PerformanceConfig:
     collect_performance: bool = False
     collect_cProfile: bool = False
     collect_communication: bool = False
+    collect_memory: bool = False
     experiment_name: str = "test"
     json_all_rank_threshold: int = 1000
 
     def build(self, comm: Comm) -> AbstractPerformanceCollector:
+        if self.collect_memory:
+            MEMORY_REGISTRY.enable()
         if self.collect_performance:
             return PerformanceCollector(experiment_name=self.experiment_name, comm=comm)
         else:
@@ -0,0 +1,367 @@
+import copy
+import dataclasses
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import click
+import numpy as np
+
+import ndsl.constants as constants
+from ndsl.comm.comm_abc import Comm
+from ndsl.comm.communicator import CubedSphereCommunicator
+from ndsl.comm.local_comm import LocalComm
+from ndsl.comm.partitioner import CubedSpherePartitioner, TilePartitioner
+from ndsl.comm.shared_memory_comm import run_processes
+from ndsl.comm.thread_comm import run_ranks
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+from ndsl.performance.report import (
+    Report,
+    TimeReport,
+    collect_keys_from_data,
+    gather_hit_counts,
+    gather_timing_data,
+    get_experiment_info,
+    get_git_hash,
+    write_to_json,
+    write_to_timestamped_json,
+)
+from ndsl.performance.timer import Timer
+from ndsl.quantity import Quantity
+
+
+HALO_UPDATE = "halo_update"
+VECTOR_HALO_UPDATE = "vector_halo_update"
+SYNCHRONIZE_VECTOR_INTERFACES = "synchronize_vector_interfaces"
+HALO_BENCHMARK_OPERATIONS = (
+    HALO_UPDATE,
+    VECTOR_HALO_UPDATE,
+    SYNCHRONIZE_VECTOR_INTERFACES,
+)
+
+
+@dataclasses.dataclass
+class HaloBenchmarkConfig:
+    """Problem to benchmark the halo exchanges on.
+
+    Attributes:
+        layout: (y, x) number of ranks along tile edges
+        nx_tile: number of cell centers along a tile edge
+        nz: number of vertical levels
+        n_halo: number of halo points, all of them are exchanged
+        n_quantities: number of quantities (or vector pairs) per exchange
+        dtype: data type of the quantities
+        iterations: number of timed exchanges per operation
+        warmup: number of untimed exchanges run first, filling the caches
+        backend: gt4py backend used to allocate the quantities
+    """
+
+    layout: Tuple[int, int] = (1, 1)
+    nx_tile: int = 48
+    nz: int = 79
+    n_halo: int = constants.N_HALO_DEFAULT
+    n_quantities: int = 1
+    dtype: str = "float64"
+    iterations: int = 10
+    warmup: int = 1
+    backend: str = "numpy"
+
+    @property
+    def total_ranks(self) -> int:
+        return 6 * self.layout[0] * self.layout[1]
+
+    @property
+    def name(self) -> str:
+        return (
+            f"halo_c{self.nx_tile}_{self.layout[0]}x{self.layout[1]}"
+            f"_z{self.nz}_h{self.n_halo}_q{self.n_quantities}_{self.dtype}"
+        )
+
+
+@dataclasses.dataclass
+class HaloBenchmarkResult:
+    """Timings of a benchmark run, per rank ran by this process.
+
+    Keys are "<operation>" for the whole exchange as seen by the rank and
+    "<operation>.<timer key>" for the updater breakdown (pack, wait, unpack...).
+    """
+
+    ranks: List[int]
+    times_per_step: List[List[Mapping[str, float]]]
+    hits_per_step: List[List[Mapping[str, int]]]
+
+
+class _RankState:
+    def __init__(
+        self,
+        comm: Comm,
+        partitioner: CubedSpherePartitioner,
+        config: HaloBenchmarkConfig,
+    ):
+        self.timer = Timer()
+        self.communicator = CubedSphereCommunicator(comm, partitioner, timer=self.timer)
+        sizer = SubtileGridSizer.from_tile_params(
+            nx_tile=config.nx_tile,
+            ny_tile=config.nx_tile,
+            nz=config.nz,
+            n_halo=config.n_halo,
+            extra_dim_lengths={},
+            layout=config.layout,
+            tile_partitioner=partitioner.tile,
+            tile_rank=self.communicator.tile.rank,
+        )
+        factory = QuantityFactory.from_backend(sizer, config.backend)
+
+        def make_quantities(dims) -> List[Quantity]:
+            quantities = []
+            for _ in range(config.n_quantities):
+                quantity = factory.zeros(
+                    dims,
+                    units="",
+                    dtype=np.dtype(config.dtype).type,
+                    allow_mismatch_float_precision=True,
+                )
+                quantity.data[:] = comm.Get_rank()
+                quantities.append(quantity)
+            return quantities
+
+        self.scalars = make_quantities(
+            [constants.X_DIM, constants.Y_DIM, constants.Z_DIM]
+        )
+        # Staggered vector components, as synchronize_vector_interfaces expects
+        self.x_vectors = make_quantities(
+            [constants.X_DIM, constants.Y_INTERFACE_DIM, constants.Z_DIM]
+        )
+        self.y_vectors = make_quantities(
+            [constants.X_INTERFACE_DIM, constants.Y_DIM, constants.Z_DIM]
+        )
+
+
+def _start_operation(
+    operation: str, state: _RankState, n_halo: int
+) -> List[Callable[[], None]]:
+    """Start an exchange, returns the wait calls completing it."""
+    communicator = state.communicator
+    if operation == HALO_UPDATE:
+        return [communicator.start_halo_update(state.scalars, n_halo).wait]
+    elif operation == VECTOR_HALO_UPDATE:
+        return [
+            communicator.start_vector_halo_update(
+                state.x_vectors, state.y_vectors, n_halo
+            ).wait
+        ]
+    elif operation == SYNCHRONIZE_VECTOR_INTERFACES:
+        return [
+            communicator.start_synchronize_vector_interfaces(x, y).wait
+            for x, y in zip(state.x_vectors, state.y_vectors)
+        ]
+    else:
+        raise ValueError(f"unknown halo benchmark operation {operation}")
+
+
+def run_halo_benchmark(
+    comms: Sequence[Comm],
+    config: HaloBenchmarkConfig,
+    operations: Sequence[str] = HALO_BENCHMARK_OPERATIONS,
+) -> HaloBenchmarkResult:
+    """Time halo exchanges over the given ranks.
+
+    Ranks hosted in this process (e.g. all ranks of a LocalComm, or the
+    single rank of an MPIComm) are stepped together: every rank starts an
+    exchange before any rank waits on it.
+
+    Args:
+        comms: communicators of the ranks run by this process
+        config: problem description
+        operations: exchanges to time, from HALO_BENCHMARK_OPERATIONS
+    """
+    partitioner = CubedSpherePartitioner(TilePartitioner(config.layout))
+    if comms[0].Get_size() != partitioner.total_ranks:
+        raise ValueError(
+            f"layout {config.layout} requires {partitioner.total_ranks} ranks, "
+            f"communicator has {comms[0].Get_size()}"
+        )
+    states = [_RankState(comm, partitioner, config) for comm in comms]
+    times_per_step: List[List[Mapping[str, float]]] = [[] for _ in states]
+    hits_per_step: List[List[Mapping[str, int]]] = [[] for _ in states]
+    for i_step in range(config.warmup + config.iterations):
+        step_times: List[Dict[str, float]] = [{} for _ in states]
+        step_hits: List[Dict[str, int]] = [{} for _ in states]
+        for operation in operations:
+            waits = []
+            for state in states:
+                with state.timer.clock(operation):
+                    waits.append(_start_operation(operation, state, config.n_halo))
+            for state, rank_waits in zip(states, waits):
+                with state.timer.clock(operation):
+                    for wait in rank_waits:
+                        wait()
+            for state, times, hits in zip(states, step_times, step_hits):
+                for key, value in state.timer.times.items():
+                    name = operation if key == operation else f"{operation}.{key}"
+                    times[name] = value
+                    # start and wait are clocked separately
+                    hits[name] = 1 if key == operation else state.timer.hits[key]
+                state.timer.reset()
+        if i_step >= config.warmup:
+            for rank_times, rank_hits, times, hits in zip(
+                times_per_step, hits_per_step, step_times, step_hits
+            ):
+                rank_times.append(times)
+                rank_hits.append(hits)
+    return HaloBenchmarkResult(
+        ranks=[comm.Get_rank() for comm in comms],
+        times_per_step=times_per_step,
+        hits_per_step=hits_per_step,
+    )
+
+
+def halo_benchmark_report(
+    result: HaloBenchmarkResult,
+    config: HaloBenchmarkConfig,
+    comm: Optional[Comm] = None,
+    git_hash: str = "None",
+) -> Optional[Report]:
+    """Build a performance Report out of a benchmark result.
+
+    Args:
+        result: timings to report
+        config: problem the timings were measured on
+        comm: when given, gather the timings of all ranks on its root,
+            otherwise all ranks must be part of the result
+        git_hash: commit the benchmark ran on
+
+    Returns:
+        the report on the root rank, None on the other ranks
+    """
+    if comm is not None:
+        timing_info = gather_timing_data(result.times_per_step[0], comm)
+        if comm.Get_rank() != 0:
+            return None
+    else:
+        timing_info = {}
+        for timer_name in collect_keys_from_data(result.times_per_step[0]):
+            timing_info[timer_name] = TimeReport(
+                hits=0,
+                times=[
+                    copy.deepcopy([step[timer_name] for step in rank_times])
+                    for rank_times in result.times_per_step
+                ],
+            )
+    timing_info = gather_hit_counts(result.hits_per_step[0], timing_info)
+    return Report(
+        setup=get_experiment_info(
+            config.name,
+            config.iterations,
+            config.backend,
+            git_hash,
+            is_orchestrated=False,
+        ),
+        times=timing_info,
+        dt_atmos=0.0,
+    )
+
+
+def local_comms(total_ranks: int) -> List[LocalComm]:
+    """In-process communicators for all ranks of a run."""
+    buffer_dict: Dict = {}
+    return [LocalComm(rank, total_ranks, buffer_dict) for rank in range(total_ranks)]
+
+
+@click.command()
+@click.option(
+    "--comm",
+    "comm_type",
+    type=click.Choice(["local", "thread", "shm", "mpi"]),
+    default="local",
+    help=(
+        "run all ranks in-process over LocalComm, concurrently on threads "
+        "over ThreadComm, one rank per forked process over SharedMemoryComm, "
+        "or one rank per MPI process"
+    ),
+)
+@click.option("--layout", type=(int, int), default=(1, 1))
+@click.option("--nx_tile", type=click.INT, default=48)
+@click.option("--nz", type=click.INT, default=79)
+@click.option("--n_halo", type=click.INT, default=constants.N_HALO_DEFAULT)
+@click.option("--n_quantities", type=click.INT, default=1)
+@click.option("--dtype", type=click.STRING, default="float64")
+@click.option("--iterations", type=click.INT, default=10)
+@click.option("--warmup", type=click.INT, default=1)
+@click.option("--backend", type=click.STRING, default="numpy")
+@click.option(
+    "--operation",
+    "operations",
+    type=click.Choice(list(HALO_BENCHMARK_OPERATIONS)),
+    multiple=True,
+    help="operation to time, can be repeated, defaults to all",
+)
+@click.option(
+    "--output",
+    type=click.STRING,
+    default=None,
+    help="JSON report path, defaults to a timestamped file",
+)
+def command_line(
+    comm_type: str,
+    layout: Tuple[int, int],
+    nx_tile: int,
+    nz: int,
+    n_halo: int,
+    n_quantities: int,
+    dtype: str,
+    iterations: int,
+    warmup: int,
+    backend: str,
+    operations: Tuple[str, ...],
+    output: Optional[str],
+):
+    """
+    Benchmark the halo exchanges.
+    """
+    config = HaloBenchmarkConfig(
+        layout=layout,
+        nx_tile=nx_tile,
+        nz=nz,
+        n_halo=n_halo,
+        n_quantities=n_quantities,
+        dtype=dtype,
+        iterations=iterations,
+        warmup=warmup,
+        backend=backend,
+    )
+    if comm_type == "mpi":
+        from ndsl.comm.mpi import MPIComm
+
+        mpi_comm = MPIComm()
+        result = run_halo_benchmark(
+            [mpi_comm], config, operations or HALO_BENCHMARK_OPERATIONS
+        )
+        git_hash = get_git_hash() if mpi_comm.Get_rank() == 0 else "None"
+        report = halo_benchmark_report(result, config, comm=mpi_comm, git_hash=git_hash)
+    elif comm_type in ("thread", "shm"):
+        git_hash = get_git_hash()
+
+        def run_rank(comm: Comm) -> Optional[Report]:
+            result = run_halo_benchmark(
+                [comm], config, operations or HALO_BENCHMARK_OPERATIONS
+            )
+            return halo_benchmark_report(result, config, comm=comm, git_hash=git_hash)
+
+        run = run_ranks if comm_type == "thread" else run_processes
+        report = run(run_rank, config.total_ranks)[0]
+    else:
+        result = run_halo_benchmark(
+            local_comms(config.total_ranks),
+            config,
+            operations or HALO_BENCHMARK_OPERATIONS,
+        )
+        report = halo_benchmark_report(result, config, git_hash=get_git_hash())
+    if report is not None:
+        if output is None:
+            write_to_timestamped_json(report)
+        else:
+            write_to_json(report, output)
+
+
+if __name__ == "__main__":
+    command_line()
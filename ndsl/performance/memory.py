@@ -0,0 +1,183 @@
+import dataclasses
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ndsl.comm.comm_abc import Comm
+
+
+# (category, owner, device)
+MemoryKey = Tuple[str, str, str]
+
+
+@dataclasses.dataclass
+class MemoryUsage:
+    """Live allocations of an owner.
+
+    count: number of live arrays
+    nbytes: bytes of the live arrays
+    """
+
+    count: int = 0
+    nbytes: int = 0
+
+
+def _device(array) -> str:
+    return "host" if isinstance(array, np.ndarray) else "device"
+
+
+class MemoryRegistry:
+    """Registry of live arrays by category and owner, e.g. the quantities
+    of a QuantityFactory or the buffers of a halo updater.
+
+    Arrays are counted until garbage collected, tracking an array again moves
+    it to its new owner. Host (numpy) and device (cupy) memory are reported
+    separately. Tracking is off until enabled, so it costs nothing by default.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._usage: Dict[MemoryKey, MemoryUsage] = {}
+        self._live: Dict[int, Tuple[MemoryKey, int]] = {}
+        self._recorded: Dict[MemoryKey, int] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        """Forget all tracked arrays and recorded sizes."""
+        self._usage.clear()
+        self._live.clear()
+        self._recorded.clear()
+
+    def track(self, array, category: str, owner: str):
+        """Count an array against an owner until it is garbage collected.
+
+        Args:
+            array: numpy or cupy array
+            category: kind of owner, e.g. "quantity" or "buffer"
+            owner: name of the owner within the category
+        """
+        if not self.enabled:
+            return
+        array_id = id(array)
+        if array_id in self._live:
+            self._release(array_id)
+        else:
+            try:
+                weakref.finalize(array, self._release, array_id)
+            except TypeError:  # not weak-referenceable, never released
+                pass
+        key = (category, owner, _device(array))
+        nbytes = int(array.nbytes)
+        usage = self._usage.setdefault(key, MemoryUsage())
+        usage.count += 1
+        usage.nbytes += nbytes
+        self._live[array_id] = (key, nbytes)
+
+    def _release(self, array_id: int):
+        entry = self._live.pop(array_id, None)
+        if entry is not None:
+            key, nbytes = entry
+            usage = self._usage[key]
+            usage.count -= 1
+            usage.nbytes -= nbytes
+
+    def record(self, category: str, owner: str, nbytes: int, device: str = "host"):
+        """Record memory not held by a tracked array, e.g. estimated at build time.
+
+        Recording again for the same owner replaces the previous size.
+        """
+        if not self.enabled:
+            return
+        self._recorded[(category, owner, device)] = int(nbytes)
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-serializable summary of the memory use of this rank."""
+        categories: Dict[str, Dict[str, Any]] = {}
+        totals = {"host": 0, "device": 0}
+        entries: List[Tuple[MemoryKey, int, Optional[int]]] = [
+            (key, usage.nbytes, usage.count) for key, usage in self._usage.items()
+        ] + [(key, nbytes, None) for key, nbytes in self._recorded.items()]
+        for (category, owner, device), nbytes, count in entries:
+            if count == 0:
+                continue
+            category_report = categories.setdefault(
+                category, {"host_bytes": 0, "device_bytes": 0, "owners": {}}
+            )
+            owner_report = category_report["owners"].setdefault(
+                owner, {"count": 0, "host_bytes": 0, "device_bytes": 0}
+            )
+            owner_report[f"{device}_bytes"] += nbytes
+            if count is not None:
+                owner_report["count"] += count
+            category_report[f"{device}_bytes"] += nbytes
+            totals[device] += nbytes
+        return {
+            "host_bytes": totals["host"],
+            "device_bytes": totals["device"],
+            "categories": categories,
+        }
+
+
+MEMORY_REGISTRY = MemoryRegistry()
+
+
+def _reduce(values: List[int]) -> Dict[str, float]:
+    return {
+        "min": min(values),
+        "max": max(values),
+        "mean": sum(values) / len(values),
+        "sum": sum(values),
+    }
+
+
+def reduce_memory_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Statistics over ranks of MemoryRegistry reports.
+
+    Owners missing on a rank count as using no memory there.
+    """
+    reduced: Dict[str, Any] = {
+        "host_bytes": _reduce([report["host_bytes"] for report in reports]),
+        "device_bytes": _reduce([report["device_bytes"] for report in reports]),
+        "categories": {},
+    }
+    category_names = sorted(
+        {category for report in reports for category in report["categories"]}
+    )
+    for category in category_names:
+        rank_categories = [
+            report["categories"].get(category, {"owners": {}}) for report in reports
+        ]
+        owner_names = sorted(
+            {owner for entry in rank_categories for owner in entry["owners"]}
+        )
+        reduced["categories"][category] = {
+            owner: {
+                f"{device}_bytes": _reduce(
+                    [
+                        entry["owners"].get(owner, {}).get(f"{device}_bytes", 0)
+                        for entry in rank_categories
+                    ]
+                )
+                for device in ("host", "device")
+            }
+            for owner in owner_names
+        }
+    return reduced
+
+
+def gather_memory_report(
+    comm: Comm, registry: MemoryRegistry = MEMORY_REGISTRY
+) -> Dict[str, Any]:
+    """Memory reports of all ranks and their reduction, a collective call.
+
+    Returns:
+        {"ranks": report of each rank, "reduced": statistics over ranks}
+    """
+    reports = comm.allgather(registry.report())
+    return {"ranks": reports, "reduced": reduce_memory_reports(reports)}
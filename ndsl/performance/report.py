@@ -1,8 +1,10 @@
 import copy
 import dataclasses
 import json
+import os.path
+import subprocess
 from datetime import datetime
-from typing import Any, Dict, List, Mapping
+from typing import Any, Dict, List, Mapping, Optional
 
 import numpy as np
 
@@ -32,11 +34,26 @@ class Report:
     dt_atmos: float
     sim_status: str = "Finished"
     SYPD: float = 0.0
+    buffer_cache: dict = dataclasses.field(default_factory=dict)
+    memory: dict = dataclasses.field(default_factory=dict)
 
     def __post_init__(self):
         self.SYPD = get_sypd(self.times, self.dt_atmos)
 
 
+def get_git_hash() -> str:
+    """Commit of the ndsl sources, "None" when not run from a git checkout."""
+    try:
+        driver_path = os.path.dirname(__file__)
+        return (
+            subprocess.check_output(["git", "-C", driver_path, "rev-parse", "HEAD"])
+            .decode()
+            .rstrip()
+        )
+    except subprocess.CalledProcessError:
+        return "None"
+
+
 def get_experiment_info(
     experiment_name: str,
     time_step: int,
@@ -96,11 +113,15 @@ def gather_timing_data(
     return timing_info
 
 
+def write_to_json(experiment: Report, filename: str) -> None:
+    with open(filename, "w") as outfile:
+        json.dump(dataclasses.asdict(experiment), outfile, sort_keys=True, indent=4)
+
+
 def write_to_timestamped_json(experiment: Report) -> None:
     now = datetime.now()
     filename = now.strftime("%Y-%m-%d-%H-%M-%S")
-    with open(filename + ".json", "w") as outfile:
-        json.dump(dataclasses.asdict(experiment), outfile, sort_keys=True, indent=4)
+    write_to_json(experiment, filename + ".json")
 
 
 def gather_hit_counts(
@@ -139,9 +160,14 @@ def collect_data_and_write_to_file(
     times_per_step: List,
     experiment_name: str,
     dt_atmos: float,
+    buffer_cache: Optional[Dict[str, Any]] = None,
+    memory: Optional[Dict[str, Any]] = None,
 ) -> None:
     """
     collect the gathered data from all the ranks onto rank 0 and write the timing file
+
+    buffer_cache: optional buffer cache usage of rank 0, see BufferCache.report
+    memory: optional memory use of all ranks, see gather_memory_report
     """
     is_root = comm.Get_rank() == 0
     timing_info = gather_timing_data(times_per_step, comm)
@@ -151,5 +177,11 @@ def collect_data_and_write_to_file(
             experiment_name, time_step, backend, git_hash, is_orchestrated
         )
         timing_info = gather_hit_counts(hits_per_step, timing_info)
-        report = Report(setup=exp_info, times=timing_info, dt_atmos=dt_atmos)
+        report = Report(
+            setup=exp_info,
+            times=timing_info,
+            dt_atmos=dt_atmos,
+            buffer_cache=buffer_cache if buffer_cache is not None else {},
+            memory=memory if memory is not None else {},
+        )
         write_to_timestamped_json(report)
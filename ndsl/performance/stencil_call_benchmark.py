@@ -0,0 +1,153 @@
+import dataclasses
+import json
+import timeit
+from typing import Dict, Tuple
+
+import click
+import numpy as np
+from gt4py.cartesian.gtscript import PARALLEL, computation, interval
+
+import ndsl.constants as constants
+from ndsl.dsl.stencil import FrozenStencil, GridIndexing, StencilFactory
+from ndsl.dsl.stencil_config import CompilationConfig, StencilConfig
+from ndsl.dsl.typing import Float, FloatField
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+
+
+FAST_CALL = "fast_call"
+GENERAL_CALL = "general_call"
+STENCIL_RUN = "stencil_run"
+STENCIL_CALL_BENCHMARK_PATHS = (FAST_CALL, GENERAL_CALL, STENCIL_RUN)
+
+
+def _scale_stencil(q_in: FloatField, q_out: FloatField, factor: Float):
+    with computation(PARALLEL), interval(...):
+        q_out = q_in * factor
+
+
+@dataclasses.dataclass
+class StencilCallBenchmarkConfig:
+    """Stencil call to benchmark the Python overhead of FrozenStencil on.
+
+    Attributes:
+        nx: number of cell centers along x and y in the compute domain
+        nz: number of vertical levels
+        n_halo: number of halo points
+        iterations: number of timed calls per repeat
+        repeat: number of repeats, the fastest one is reported
+        backend: gt4py backend of the stencil
+    """
+
+    nx: int = 4
+    nz: int = 1
+    n_halo: int = constants.N_HALO_DEFAULT
+    iterations: int = 1000
+    repeat: int = 5
+    backend: str = "numpy"
+
+
+def _build_stencils(
+    config: StencilCallBenchmarkConfig,
+) -> Tuple[FrozenStencil, FrozenStencil, QuantityFactory]:
+    grid_indexing = GridIndexing(
+        domain=(config.nx, config.nx, config.nz),
+        n_halo=config.n_halo,
+        south_edge=True,
+        north_edge=True,
+        west_edge=True,
+        east_edge=True,
+    )
+    stencil_factory = StencilFactory(
+        StencilConfig(
+            compilation_config=CompilationConfig(
+                backend=config.backend, rebuild=False, validate_args=False
+            )
+        ),
+        grid_indexing,
+    )
+    stencils = []
+    for _ in range(2):
+        stencil = stencil_factory.from_dims_halo(
+            _scale_stencil,
+            compute_dims=[constants.X_DIM, constants.Y_DIM, constants.Z_DIM],
+        )
+        assert isinstance(stencil, FrozenStencil)
+        stencils.append(stencil)
+    sizer = SubtileGridSizer(
+        nx=config.nx,
+        ny=config.nx,
+        nz=config.nz,
+        n_halo=config.n_halo,
+        extra_dim_lengths={},
+    )
+    return stencils[0], stencils[1], QuantityFactory.from_backend(sizer, config.backend)
+
+
+def run_stencil_call_benchmark(
+    config: StencilCallBenchmarkConfig,
+) -> Dict[str, float]:
+    """Time calls of a small stencil on Quantity arguments.
+
+    Returns:
+        seconds per call of FrozenStencil on the fast call path, on the
+        general path taken when validating arguments or comparing ranks
+        (without doing either), and of the run method of the stencil object
+        on prepared arguments, which is the floor of both
+    """
+    fast, general, quantity_factory = _build_stencils(config)
+    general.fast_call = False
+    dims = [constants.X_DIM, constants.Y_DIM, constants.Z_DIM]
+    q_in = quantity_factory.ones(dims, units="")
+    q_out = quantity_factory.zeros(dims, units="")
+    run_kwargs = {
+        "q_in": q_in.data,
+        "q_out": q_out.data,
+        "factor": 2.0,
+        "_origin_": fast._field_origins,
+        "_domain_": fast.domain,
+        "exec_info": None,
+    }
+    calls = {
+        FAST_CALL: lambda: fast(q_in, q_out, 2.0),
+        GENERAL_CALL: lambda: general(q_in, q_out, 2.0),
+        STENCIL_RUN: lambda: fast.stencil_object.run(**run_kwargs),
+    }
+    times = {}
+    for path, call in calls.items():
+        call()
+        times[path] = (
+            min(timeit.repeat(call, number=config.iterations, repeat=config.repeat))
+            / config.iterations
+        )
+    np.testing.assert_array_equal(q_out.data[q_out.origin], 2.0)
+    return times
+
+
+@click.command()
+@click.option("--nx", type=click.INT, default=4)
+@click.option("--nz", type=click.INT, default=1)
+@click.option("--n_halo", type=click.INT, default=constants.N_HALO_DEFAULT)
+@click.option("--iterations", type=click.INT, default=1000)
+@click.option("--repeat", type=click.INT, default=5)
+@click.option("--backend", type=click.STRING, default="numpy")
+def command_line(
+    nx: int, nz: int, n_halo: int, iterations: int, repeat: int, backend: str
+):
+    """
+    Benchmark the Python overhead of calling a FrozenStencil.
+    """
+    config = StencilCallBenchmarkConfig(
+        nx=nx,
+        nz=nz,
+        n_halo=n_halo,
+        iterations=iterations,
+        repeat=repeat,
+        backend=backend,
+    )
+    times = run_stencil_call_benchmark(config)
+    click.echo(json.dumps({path: time * 1e6 for path, time in times.items()}))
+
+
+if __name__ == "__main__":
+    command_line()
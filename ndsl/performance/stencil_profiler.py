@@ -0,0 +1,173 @@
+import dataclasses
+import json
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+from gt4py.cartesian.definitions import AccessKind
+
+
+_AXIS_INDEX = {"I": 0, "J": 1, "K": 2}
+
+
+def estimate_bytes_moved(field_info: Mapping[str, Any], domain: Sequence[int]) -> int:
+    """Estimate the bytes a stencil call moves to and from memory.
+
+    Fields read are counted once over the domain extended by their read
+    boundary, fields written once over the domain, so fields read and written
+    count twice. Caching and reuse of temporaries are not accounted for.
+
+    Args:
+        field_info: field_info attribute of a gt4py stencil object
+        domain: the (i, j, k) domain of the call
+    """
+    total = 0
+    for info in field_info.values():
+        if info is None:
+            continue
+        points_per_column = int(np.prod(info.data_dims, dtype=np.int64))
+        itemsize = np.dtype(info.dtype).itemsize
+        if info.access & AccessKind.READ:
+            read_points = points_per_column
+            for axis in info.axes:
+                index = _AXIS_INDEX[axis]
+                read_points *= (
+                    domain[index]
+                    + info.boundary.lower_indices[index]
+                    + info.boundary.upper_indices[index]
+                )
+            total += read_points * itemsize
+        if info.access & AccessKind.WRITE:
+            write_points = points_per_column
+            for axis in info.axes:
+                write_points *= domain[_AXIS_INDEX[axis]]
+            total += write_points * itemsize
+    return total
+
+
+@dataclasses.dataclass
+class StencilProfile:
+    """Run times and estimated bytes moved of the calls to one stencil."""
+
+    run_times: List[float] = dataclasses.field(default_factory=list)
+    bytes_moved: int = 0
+
+    def record(self, run_time: float, bytes_moved: int):
+        self.run_times.append(run_time)
+        self.bytes_moved += bytes_moved
+
+    def summary(self, peak_bandwidth: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Args:
+            peak_bandwidth: peak bandwidth of the machine in bytes per second
+
+        Returns:
+            call count, total/min/median/p95 run times in seconds, bytes moved
+            per call, achieved bandwidth in bytes per second and, if a peak
+            bandwidth is given, the fraction of it achieved
+        """
+        times = np.asarray(self.run_times)
+        total_time = float(times.sum())
+        summary: Dict[str, Any] = {
+            "calls": len(times),
+            "total_time": total_time,
+            "min_time": float(times.min()),
+            "median_time": float(np.median(times)),
+            "p95_time": float(np.percentile(times, 95)),
+            "bytes_per_call": self.bytes_moved / len(times),
+            "bandwidth": self.bytes_moved / total_time if total_time > 0 else 0.0,
+        }
+        if peak_bandwidth is not None:
+            summary["fraction_of_peak"] = summary["bandwidth"] / peak_bandwidth
+        return summary
+
+
+class StencilProfiler:
+    """Per-stencil run time and bandwidth profiler.
+
+    Set as the profiler of a TimingCollector, it is given the run time of
+    each call of the FrozenStencils using that collector, e.g. those built
+    by a StencilFactory:
+
+        stencil_factory.timing_collector.profiler = StencilProfiler()
+    """
+
+    def __init__(self):
+        self.profiles: Dict[str, StencilProfile] = {}
+
+    def record(self, name: str, run_time: float, bytes_moved: int):
+        """Record a call of a stencil.
+
+        Args:
+            name: name of the stencil
+            run_time: run time of the call in seconds
+            bytes_moved: estimated bytes moved by the call
+        """
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = StencilProfile()
+        profile.record(run_time, bytes_moved)
+
+    def clear(self):
+        self.profiles.clear()
+
+    def report(self, peak_bandwidth: Optional[float] = None) -> Dict[str, Any]:
+        """Summaries of all stencils called, JSON-serializable.
+
+        Args:
+            peak_bandwidth: peak bandwidth of the machine in bytes per second,
+                e.g. from ndsl.dsl.dace.utils.measure_peak_bandwidth
+        """
+        return {
+            "peak_bandwidth": peak_bandwidth,
+            "stencils": {
+                name: profile.summary(peak_bandwidth)
+                for name, profile in self.profiles.items()
+            },
+        }
+
+    def write_json(self, path: str, peak_bandwidth: Optional[float] = None):
+        with open(path, "w") as f:
+            json.dump(self.report(peak_bandwidth), f, indent=2)
+
+    def text_report(
+        self,
+        peak_bandwidth: Optional[float] = None,
+        *,
+        name_width: int = 40,
+        delimiter: str = " | ",
+    ) -> str:
+        """Table of the stencils called, by decreasing total run time.
+
+        Args:
+            peak_bandwidth: peak bandwidth of the machine in bytes per second
+            name_width: width of the stencil name column, longer names are cut
+            delimiter: column delimiter
+        """
+        summaries = self.report(peak_bandwidth)["stencils"]
+        columns = ["calls", "total s", "min s", "median s", "p95 s", "MB/call", "GB/s"]
+        if peak_bandwidth is not None:
+            columns.append("% peak")
+        lines = [
+            delimiter.join(
+                ["stencil".rjust(name_width)] + [column.rjust(9) for column in columns]
+            )
+        ]
+        for name, summary in sorted(
+            summaries.items(), key=lambda item: item[1]["total_time"], reverse=True
+        ):
+            if len(name) > name_width:
+                width = int(name_width / 2) - 3
+                name = f"{name[:width]}...{name[-width:]}"
+            values = [
+                f"{summary['calls']:9d}",
+                f"{summary['total_time']:9.3e}",
+                f"{summary['min_time']:9.3e}",
+                f"{summary['median_time']:9.3e}",
+                f"{summary['p95_time']:9.3e}",
+                f"{summary['bytes_per_call'] / 1e6:9.3f}",
+                f"{summary['bandwidth'] / 1e9:9.3f}",
+            ]
+            if peak_bandwidth is not None:
+                values.append(f"{100 * summary['fraction_of_peak']:9.1f}")
+            lines.append(delimiter.join([name.rjust(name_width)] + values))
+        return "\n".join(lines)
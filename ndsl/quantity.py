@@ -1,4 +1,5 @@
 import dataclasses
+import functools
 import warnings
 from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union, cast
 
@@ -67,13 +68,75 @@ class QuantityHaloSpec:
     dtype: Any
 
 
+# number of index plans kept, plans are shared by views of the same layout
+INDEX_PLAN_CACHE_SIZE = 4096
+
+
+def _index_key(index: tuple) -> Optional[tuple]:
+    """Hashable form of an index, or None if it can't be cached."""
+    key = []
+    for entry in index:
+        if isinstance(entry, slice):
+            key.append((entry.start, entry.stop, entry.step))
+        elif entry is None or type(entry) is int:
+            key.append(entry)
+        else:
+            return None
+    return tuple(key)
+
+
+def _index_from_key(key: tuple) -> tuple:
+    return tuple(slice(*entry) if isinstance(entry, tuple) else entry for entry in key)
+
+
+def _compute_index(origin, extent, index):
+    shifted_index = []
+    for entry, origin_1d, extent_1d in zip(index, origin, extent):
+        if isinstance(entry, slice):
+            shifted_slice = shift_slice(entry, origin_1d, extent_1d)
+            shifted_index.append(
+                bound_default_slice(shifted_slice, origin_1d, origin_1d + extent_1d)
+            )
+        elif entry is None:
+            shifted_index.append(entry)
+        else:
+            shifted_index.append(entry + origin_1d)
+    return tuple(shifted_index)
+
+
+@functools.lru_cache(maxsize=INDEX_PLAN_CACHE_SIZE)
+def _index_plan(dims, origin, extent, boundary_type, key):
+    """Array index of a view index given in its hashable form.
+
+    boundary_type is None for the compute domain view.
+    """
+    index = _index_from_key(key)
+    if boundary_type is None:
+        return _compute_index(origin, extent, index)
+    return shift_boundary_slice_tuple(dims, origin, extent, boundary_type, index)
+
+
+def _array_index(dims, origin, extent, boundary_type, index):
+    key = _index_key(index)
+    if key is not None:
+        try:
+            return _index_plan(dims, origin, extent, boundary_type, key)
+        except TypeError:  # unhashable slice bounds
+            pass
+    if boundary_type is None:
+        return _compute_index(origin, extent, index)
+    return shift_boundary_slice_tuple(dims, origin, extent, boundary_type, index)
+
+
 class BoundaryArrayView:
+    __slots__ = ("_data", "_boundary_type", "_dims", "_origin", "_extent")
+
     def __init__(self, data, boundary_type, dims, origin, extent):
         self._data = data
         self._boundary_type = boundary_type
-        self._dims = dims
-        self._origin = origin
-        self._extent = extent
+        self._dims = tuple(dims)
+        self._origin = tuple(origin)
+        self._extent = tuple(extent)
 
     def __getitem__(self, index):
         if len(self._origin) == 0:
@@ -101,7 +164,7 @@ class BoundaryArrayView:
             )
         if len(index) < len(self._dims):
             index = index + (slice(None, None),) * (len(self._dims) - len(index))
-        return shift_boundary_slice_tuple(
+        return _array_index(
             self._dims, self._origin, self._extent, self._boundary_type, index
         )
 
@@ -139,8 +202,13 @@ class BoundedArrayView:
     origin, and end indices are relative to the origin + extent. For example,
     view.interior[0:0, 0:0, :] would retrieve the entire compute domain for an x/y/z
     array, while view.interior[-1:1, -1:1, :] would also include one halo point.
+
+    Index computations are cached by layout, and corner views are only
+    created when first used.
     """
 
+    __slots__ = ("_data", "_dims", "_origin", "_extent", "_boundary_views")
+
     def __init__(
         self, array, dims: Sequence[str], origin: Sequence[int], extent: Sequence[int]
     ):
@@ -148,21 +216,16 @@ class BoundedArrayView:
         self._dims = tuple(dims)
         self._origin = tuple(origin)
         self._extent = tuple(extent)
-        self._northwest = BoundaryArrayView(
-            array, constants.NORTHWEST, dims, origin, extent
-        )
-        self._northeast = BoundaryArrayView(
-            array, constants.NORTHEAST, dims, origin, extent
-        )
-        self._southwest = BoundaryArrayView(
-            array, constants.SOUTHWEST, dims, origin, extent
-        )
-        self._southeast = BoundaryArrayView(
-            array, constants.SOUTHEAST, dims, origin, extent
-        )
-        self._interior = BoundaryArrayView(
-            array, constants.INTERIOR, dims, origin, extent
-        )
+        self._boundary_views: Dict[int, BoundaryArrayView] = {}
+
+    def _boundary_view(self, boundary_type: int) -> BoundaryArrayView:
+        view = self._boundary_views.get(boundary_type)
+        if view is None:
+            view = BoundaryArrayView(
+                self._data, boundary_type, self._dims, self._origin, self._extent
+            )
+            self._boundary_views[boundary_type] = view
+        return view
 
     @property
     def origin(self) -> Tuple[int, ...]:
@@ -175,7 +238,7 @@ class BoundedArrayView:
         return self._extent
 
     def __getitem__(self, index):
-        if len(self.origin) == 0:
+        if len(self._origin) == 0:
             if isinstance(index, tuple) and len(index) > 0:
                 raise IndexError("more than one index given for a zero-dimension array")
             elif isinstance(index, slice) and index != slice(None, None, None):
@@ -197,38 +260,27 @@ class BoundedArrayView:
                 f"{len(self._dims)}-dimensional quantity"
             )
         index = fill_index(index, len(self._data.shape))
-        shifted_index = []
-        for entry, origin, extent in zip(index, self.origin, self.extent):
-            if isinstance(entry, slice):
-                shifted_slice = shift_slice(entry, origin, extent)
-                shifted_index.append(
-                    bound_default_slice(shifted_slice, origin, origin + extent)
-                )
-            elif entry is None:
-                shifted_index.append(entry)
-            else:
-                shifted_index.append(entry + origin)
-        return tuple(shifted_index)
+        return _array_index(self._dims, self._origin, self._extent, None, index)
 
     @property
     def northwest(self) -> BoundaryArrayView:
-        return self._northwest
+        return self._boundary_view(constants.NORTHWEST)
 
     @property
     def northeast(self) -> BoundaryArrayView:
-        return self._northeast
+        return self._boundary_view(constants.NORTHEAST)
 
     @property
     def southwest(self) -> BoundaryArrayView:
-        return self._southwest
+        return self._boundary_view(constants.SOUTHWEST)
 
     @property
     def southeast(self) -> BoundaryArrayView:
-        return self._southeast
+        return self._boundary_view(constants.SOUTHEAST)
 
     @property
     def interior(self) -> BoundaryArrayView:
-        return self._interior
+        return self._boundary_view(constants.INTERIOR)
 
 
 def ensure_int_tuple(arg, arg_name):
@@ -272,6 +324,8 @@ class Quantity:
     Data container for physical quantities.
     """
 
+    __slots__ = ("_data", "_metadata", "_attrs", "_compute_domain_view")
+
     def __init__(
         self,
         data,
@@ -371,9 +425,8 @@ class Quantity:
             gt4py_backend=gt4py_backend,
         )
         self._attrs = {}  # type: ignore[var-annotated]
-        self._compute_domain_view = BoundedArrayView(
-            self.data, self.dims, self.origin, self.extent
-        )
+        # created on first use, most quantities are never indexed through it
+        self._compute_domain_view: Optional[BoundedArrayView] = None
 
     @classmethod
     def from_data_array(
@@ -485,6 +538,10 @@ class Quantity:
     @property
     def view(self) -> BoundedArrayView:
         """a view into the computational domain of the underlying data"""
+        if self._compute_domain_view is None:
+            self._compute_domain_view = BoundedArrayView(
+                self._data, self.dims, self.origin, self.extent
+            )
         return self._compute_domain_view
 
     @property
@@ -1,6 +1,13 @@
 import numpy as np
 import pytest
-from gt4py.cartesian.gtscript import PARALLEL, computation, horizontal, interval, region
+from gt4py.cartesian.gtscript import (
+    PARALLEL,
+    I,
+    computation,
+    horizontal,
+    interval,
+    region,
+)
 
 from ndsl.constants import X_DIM, Y_DIM, Z_DIM
 from ndsl.dsl.dace.dace_config import DaceConfig
@@ -9,7 +16,9 @@ from ndsl.dsl.stencil import (
     CompareToNumpyStencil,
     FrozenStencil,
     GridIndexing,
+    STENCIL_REGISTRY,
     StencilFactory,
+    _stencil_build_key,
     get_stencils_with_varied_bounds,
 )
 from ndsl.dsl.stencil_config import CompilationConfig, StencilConfig
@@ -209,3 +218,132 @@ def test_stencil_factory_numpy_comparison_runs_without_exceptions():
     q_out = make_storage_from_shape(indexing.max_shape, backend=backend)
     stencil(q_in, q_out)
     np.testing.assert_array_equal(q_in.data, q_out.data)
+
+
+def test_stencil_factory_deferred_build():
+    STENCIL_REGISTRY.clear()
+    backend = "numpy"
+    factory = get_stencil_factory(backend)
+
+    def local_copy_stencil(q_in: FloatField, q_out: FloatField):
+        with computation(PARALLEL), interval(...):
+            q_out = q_in
+
+    with factory.deferred_build(n_workers=2):
+        add_1 = factory.from_origin_domain(
+            add_1_stencil, origin=(2, 2, 0), domain=(1, 1, 3)
+        )
+        add_1_wide = factory.from_origin_domain(
+            add_1_stencil, origin=(1, 1, 0), domain=(2, 2, 3)
+        )
+        copy = factory.from_origin_domain(
+            copy_stencil, origin=(0, 0, 0), domain=(7, 7, 3)
+        )
+        local_copy = factory.from_origin_domain(
+            local_copy_stencil, origin=(0, 0, 0), domain=(7, 7, 3)
+        )
+        assert add_1.stencil_object is None
+    info = factory.timing_collector.parallel_build_info
+    assert info["n_stencils"] == 4
+    # the local stencil cannot be sent to a worker and is compiled when loaded
+    assert info["n_compiled"] == 2
+    assert info["n_workers"] == 2
+    assert "Parallel build" in factory.build_report()
+    assert add_1.stencil_object is add_1_wide.stencil_object
+
+    q, q_ref = setup_data_vars(backend=backend)
+    add_1(q)
+    add_1_wide(q)
+    q_ref[2:3, 2:3, :] = 3.0
+    q_ref[1, 1:3, :] = 2.0
+    q_ref[2:3, 1, :] = 2.0
+    np.testing.assert_array_equal(q.data, q_ref.data)
+    q_out, _ = setup_data_vars(backend=backend)
+    copy(q, q_out)
+    np.testing.assert_array_equal(q_out.data, q.data)
+    local_copy(q_ref, q_out)
+    np.testing.assert_array_equal(q_out.data, q_ref.data)
+
+
+def test_stencil_factory_deferred_build_on_call():
+    STENCIL_REGISTRY.clear()
+    backend = "numpy"
+    factory = get_stencil_factory(backend)
+    with factory.deferred_build(n_workers=1):
+        add_1 = factory.from_origin_domain(
+            add_1_stencil, origin=(0, 0, 0), domain=(7, 7, 3)
+        )
+        q, q_ref = setup_data_vars(backend=backend)
+        add_1(q)
+        assert add_1.stencil_object is not None
+        q_ref[:] = 2.0
+        np.testing.assert_array_equal(q.data, q_ref.data)
+    assert factory.timing_collector.parallel_build_info["n_compiled"] == 0
+
+
+def test_stencil_factory_restricted_deferred_build():
+    STENCIL_REGISTRY.clear()
+    factory = get_stencil_factory("numpy")
+    with factory.deferred_build(n_workers=1):
+        restricted = factory.restrict_vertical(k_start=1)
+        deferred = restricted.from_origin_domain(
+            copy_stencil, origin=(0, 0, 1), domain=(7, 7, 2)
+        )
+        assert deferred.stencil_object is None
+    info = factory.timing_collector.parallel_build_info
+    assert info["n_stencils"] == 1
+    assert deferred.stencil_object is not None
+    # builds are no longer deferred once the context of the parent exits
+    add_1 = restricted.from_origin_domain(
+        add_1_stencil, origin=(0, 0, 1), domain=(7, 7, 2)
+    )
+    assert add_1.stencil_object is not None
+    assert factory.timing_collector.parallel_build_info is info
+    with restricted.deferred_build(n_workers=1):
+        pass
+
+
+def test_stencil_factory_shares_stencil_objects():
+    STENCIL_REGISTRY.clear()
+    factory = get_stencil_factory("numpy")
+    stencils = get_stencils_with_varied_bounds(
+        add_1_in_region_stencil,
+        origins=[(3, 3, 0), (3, 3, 0), (2, 2, 0)],
+        domains=[(1, 1, 3), (1, 1, 3), (2, 2, 3)],
+        stencil_factory=factory,
+    )
+    restricted = factory.restrict_vertical(k_start=1).from_origin_domain(
+        add_1_in_region_stencil,
+        origin=(3, 3, 1),
+        domain=(1, 1, 2),
+        externals=factory.grid_indexing.axis_offsets(
+            origin=(3, 3, 0), domain=(1, 1, 3)
+        ),
+    )
+    # same definition and externals, only bounds differ
+    assert stencils[0].stencil_object is stencils[1].stencil_object
+    assert restricted.stencil_object is stencils[0].stencil_object
+    # i_start differs, so the externals differ
+    assert stencils[2].stencil_object is not stencils[0].stencil_object
+    assert len(STENCIL_REGISTRY) == 2
+    q_orig, q_ref = setup_data_vars(backend="numpy")
+    restricted(q_orig, q_orig)
+    q_ref[3, 3, 1:] = 2.0
+    np.testing.assert_array_equal(q_orig.data, q_ref.data)
+
+
+def test_stencil_build_key_externals():
+    config = get_stencil_factory("numpy").config
+
+    def build_key(externals):
+        return _stencil_build_key(copy_stencil, externals, (), config)
+
+    assert build_key({"a": 1, "b": (2.0, I[0] + 1)}) == build_key(
+        {"b": (2.0, I[0] + 1), "a": 1}
+    )
+    assert build_key({"a": 1}) != build_key({"a": True})
+    assert build_key({"a": I[0] + 1}) != build_key({"a": I[0] + 2})
+    # arrays and arbitrary objects have no reliable identity, so stencils
+    # using them are not shared
+    assert build_key({"a": np.zeros(2000)}) is None
+    assert build_key({"a": (1, object())}) is None
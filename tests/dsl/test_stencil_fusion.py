@@ -0,0 +1,232 @@
+import numpy as np
+import pytest
+from gt4py.cartesian.gtscript import (
+    FORWARD,
+    PARALLEL,
+    computation,
+    horizontal,
+    interval,
+    region,
+)
+
+from ndsl.constants import X_DIM, X_INTERFACE_DIM, Y_DIM, Y_INTERFACE_DIM, Z_DIM
+from ndsl.dsl.dace.dace_config import DaceConfig
+from ndsl.dsl.gt4py_utils import make_storage_from_shape
+from ndsl.dsl.stencil import GridIndexing, StencilFactory
+from ndsl.dsl.stencil_config import CompilationConfig, StencilConfig
+from ndsl.dsl.stencil_fusion import StencilStage, fuse_definitions
+from ndsl.dsl.typing import Float, FloatField
+from ndsl.stencils.corners import (
+    copy_corners_x_stencil_defn,
+    copy_corners_y_stencil_defn,
+    fill_corners_bgrid_x_defn,
+    fill_corners_bgrid_y_defn,
+)
+
+
+def scale_stencil(q_in: FloatField, q_out: FloatField, factor: Float):
+    with computation(PARALLEL), interval(...):
+        q_out = q_in * factor
+
+
+def smooth_x_stencil(q_in: FloatField, q_out: FloatField):
+    with computation(PARALLEL), interval(...):
+        half = 0.5 * q_in
+        q_out = half + 0.25 * (q_in[-1, 0, 0] + q_in[1, 0, 0])
+
+
+def accumulate_stencil(q_in: FloatField, q_out: FloatField):
+    with computation(FORWARD):
+        with interval(0, 1):
+            q_out = q_in
+        with interval(1, None):
+            q_out = q_out[0, 0, -1] + q_in
+
+
+def increment_east_edge_stencil(q: FloatField):
+    from __externals__ import i_end
+
+    with computation(PARALLEL), interval(...):
+        with horizontal(region[i_end, :]):
+            q = q + 1.0
+
+
+def get_stencil_factory(backend: str) -> StencilFactory:
+    config = StencilConfig(
+        compilation_config=CompilationConfig(
+            backend=backend,
+            rebuild=False,
+            validate_args=True,
+            format_source=False,
+            device_sync=False,
+        ),
+        dace_config=DaceConfig(communicator=None, backend=backend),
+    )
+    indexing = GridIndexing(
+        domain=(6, 6, 4),
+        n_halo=3,
+        south_edge=True,
+        north_edge=True,
+        west_edge=True,
+        east_edge=True,
+    )
+    return StencilFactory(config=config, grid_indexing=indexing)
+
+
+def random_storage(shape, backend: str, seed: int):
+    storage = make_storage_from_shape(shape, backend=backend)
+    storage[:] = np.random.default_rng(seed).random(shape)
+    return storage
+
+
+@pytest.mark.parametrize("backend", ["numpy", "gt:cpu_ifirst"])
+def test_fused_chain_matches_unfused_chain(backend: str):
+    factory = get_stencil_factory(backend)
+    origin, domain = factory.grid_indexing.get_origin_domain(
+        [X_DIM, Y_DIM, Z_DIM], halos=(1, 1)
+    )
+    externals = factory.grid_indexing.axis_offsets(origin, domain)
+    stages = [
+        StencilStage(scale_stencil, {"q_out": "scaled"}),
+        StencilStage(smooth_x_stencil, {"q_in": "q_in", "q_out": "smoothed"}),
+        StencilStage(accumulate_stencil, {"q_in": "scaled", "q_out": "q_out"}),
+        StencilStage(increment_east_edge_stencil, {"q": "q_out"}),
+    ]
+    unfused = [
+        factory.from_origin_domain(
+            stage.func, origin=origin, domain=domain, externals=externals
+        )
+        for stage in stages
+    ]
+    fused = factory.fuse(
+        stages,
+        origin=origin,
+        domain=domain,
+        externals=externals,
+        temporaries=["scaled"],
+    )
+    shape = factory.grid_indexing.max_shape
+    q_in = random_storage(shape, backend, seed=0)
+    scaled = random_storage(shape, backend, seed=1)
+    smoothed = random_storage(shape, backend, seed=2)
+    q_out = random_storage(shape, backend, seed=3)
+    fused_smoothed = random_storage(shape, backend, seed=2)
+    fused_q_out = random_storage(shape, backend, seed=3)
+
+    unfused[0](q_in, scaled, 3.0)
+    unfused[1](q_in, smoothed)
+    unfused[2](scaled, q_out)
+    unfused[3](q_out)
+    fused(q_in, 3.0, fused_smoothed, fused_q_out)
+    np.testing.assert_array_equal(fused_smoothed, smoothed)
+    np.testing.assert_array_equal(fused_q_out, q_out)
+
+
+@pytest.mark.parametrize(
+    "dims, definition",
+    [
+        pytest.param(
+            [X_DIM, Y_DIM, Z_DIM], copy_corners_x_stencil_defn, id="copy_corners"
+        ),
+        pytest.param(
+            [X_INTERFACE_DIM, Y_INTERFACE_DIM, Z_DIM],
+            fill_corners_bgrid_x_defn,
+            id="fill_corners_bgrid",
+        ),
+    ],
+)
+def test_fused_corners_match_unfused(dims, definition):
+    backend = "numpy"
+    factory = get_stencil_factory(backend)
+    n_halo = factory.grid_indexing.n_halo
+    origin, domain = factory.grid_indexing.get_origin_domain(
+        dims, halos=(n_halo, n_halo)
+    )
+    externals = factory.grid_indexing.axis_offsets(origin, domain)
+    # gtscript forbids self-assignment with offset, so the corners are filled
+    # into another field rather than in place
+    stages = [
+        StencilStage(definition, {"q_in": "q_in", "q_out": "q_corners"}),
+        StencilStage(scale_stencil, {"q_in": "q_corners", "q_out": "q_out"}),
+    ]
+    unfused = [
+        factory.from_origin_domain(stage.func, origin, domain, externals=externals)
+        for stage in stages
+    ]
+    fused = factory.fuse(stages, origin, domain, externals=externals)
+    shape = factory.grid_indexing.max_shape
+    q_in = random_storage(shape, backend, seed=0)
+    q_corners = random_storage(shape, backend, seed=1)
+    q_out = random_storage(shape, backend, seed=2)
+    fused_q_corners = random_storage(shape, backend, seed=1)
+    fused_q_out = random_storage(shape, backend, seed=2)
+    unfused[0](q_in, q_corners)
+    unfused[1](q_corners, q_out, 2.0)
+    fused(q_in, fused_q_corners, fused_q_out, 2.0)
+    np.testing.assert_array_equal(fused_q_corners, q_corners)
+    np.testing.assert_array_equal(fused_q_out, q_out)
+
+
+@pytest.mark.parametrize(
+    "definitions",
+    [
+        pytest.param(
+            [copy_corners_x_stencil_defn, copy_corners_y_stencil_defn],
+            id="copy_corners",
+        ),
+        pytest.param(
+            [fill_corners_bgrid_x_defn, fill_corners_bgrid_y_defn],
+            id="fill_corners_bgrid",
+        ),
+    ],
+)
+def test_fusion_rejects_corners_reading_previous_corners(definitions):
+    stages = [
+        StencilStage(definitions[0], {"q_in": "q_in", "q_out": "q_mid"}),
+        StencilStage(definitions[1], {"q_in": "q_mid", "q_out": "q_out"}),
+    ]
+    with pytest.raises(
+        ValueError,
+        match=f"{definitions[1].__name__} reads q_mid with an offset after "
+        f"{definitions[0].__name__} writes it",
+    ):
+        fuse_definitions(stages)
+
+
+def test_fusion_rejects_argument_read_with_offset_after_write():
+    stages = [
+        StencilStage(scale_stencil, {"q_out": "scaled"}),
+        StencilStage(smooth_x_stencil, {"q_in": "scaled"}),
+    ]
+    with pytest.raises(
+        ValueError,
+        match="smooth_x_stencil reads scaled with an offset after scale_stencil",
+    ):
+        fuse_definitions(stages)
+
+
+def test_fusion_rejects_temporary_read_with_offset():
+    stages = [
+        StencilStage(scale_stencil, {"q_out": "scaled"}),
+        StencilStage(smooth_x_stencil, {"q_in": "scaled"}),
+    ]
+    with pytest.raises(ValueError, match="offset"):
+        fuse_definitions(stages, temporaries=["scaled"])
+
+
+def test_fusion_rejects_temporary_read_before_write():
+    stages = [
+        StencilStage(increment_east_edge_stencil, {"q": "tmp"}),
+        StencilStage(scale_stencil, {"q_in": "tmp"}),
+    ]
+    with pytest.raises(ValueError, match="without reading it"):
+        fuse_definitions(stages, temporaries=["tmp"])
+
+
+def test_fusion_rejects_mismatched_argument_types():
+    stages = [
+        StencilStage(scale_stencil),
+        StencilStage(scale_stencil, {"q_in": "factor", "factor": "q_in"}),
+    ]
+    with pytest.raises(ValueError, match="argument"):
+        fuse_definitions(stages)
@@ -267,6 +267,42 @@ def test_frozen_field_after_parameter(backend):
     )
 
 
+@pytest.mark.parametrize("fast_call", [True, False])
+def test_frozen_stencil_call_paths(backend, fast_call: bool):
+    config = get_stencil_config(
+        backend=backend,
+        rebuild=False,
+        validate_args=False,
+        format_source=False,
+        device_sync=False,
+    )
+    stencil = FrozenStencil(
+        field_after_parameter_stencil,
+        origin=(1, 1, 0),
+        domain=(2, 2, 3),
+        stencil_config=config,
+        externals={},
+    )
+    assert stencil.fast_call
+    stencil.fast_call = fast_call
+    q_in = Quantity(
+        make_storage_from_shape((4, 4, 3), backend=backend),
+        dims=["x", "y", "z"],
+        units="m",
+        gt4py_backend=backend,
+    )
+    q_in.data[:] = 1.0
+    q_out = make_storage_from_shape((4, 4, 3), backend=backend)
+    stencil(q_in, 2.0, q_out=q_out)
+    expected = np.zeros((4, 4, 3))
+    expected[1:3, 1:3, :] = 2.0
+    np.testing.assert_array_equal(q_out, expected)
+    q_in.data[:] = 2.0
+    stencil(q_in, param=3.0, q_out=q_out)
+    expected[1:3, 1:3, :] = 6.0
+    np.testing.assert_array_equal(q_out, expected)
+
+
 @pytest.mark.parametrize("backend", ("numpy", "cuda"))
 @pytest.mark.parametrize("rebuild", [True])
 @pytest.mark.parametrize("validate_args", [True])
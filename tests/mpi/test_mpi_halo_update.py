@@ -367,6 +367,52 @@ def test_zeros_halo_update(
                 )
 
 
+@pytest.mark.skipif(
+    MPI is None, reason="mpi4py is not available or pytest was not run in parallel"
+)
+@pytest.mark.parametrize("persistent", [False, True])
+@pytest.mark.parametrize("overlapped", [False, True])
+def test_zeros_halo_update_request_modes(
+    zeros_quantity,
+    communicator,
+    n_points_update,
+    n_points,
+    numpy,
+    boundary_dict,
+    ranks_per_tile,
+    persistent,
+    overlapped,
+):
+    """test that persistent requests and overlapped waits on an mpi4py comm
+    exchange the same halos"""
+    quantity = zeros_quantity
+    if 0 < n_points_update <= n_points:
+        specification = communicator._halo_specification(quantity, n_points_update)
+        updater = communicator.get_scalar_halo_updater([specification])
+        if persistent:
+            updater.use_persistent_requests()
+        if overlapped:
+            updater.use_overlapped_wait()
+        for _ in range(2):
+            quantity.data[:] = 1.0
+            quantity.view[:] = 0.0
+            updater.update([quantity])
+            boundaries = boundary_dict[communicator.rank % ranks_per_tile]
+            for boundary in boundaries:
+                boundary_slice = get_boundary_slice(
+                    quantity.dims,
+                    quantity.origin,
+                    quantity.extent,
+                    quantity.data.shape,
+                    boundary,
+                    n_points_update,
+                    interior=False,
+                )
+                numpy.testing.assert_array_equal(
+                    quantity.data[tuple(boundary_slice)], 0.0
+                )
+
+
 @pytest.mark.skipif(
     MPI is None, reason="mpi4py is not available or pytest was not run in parallel"
 )
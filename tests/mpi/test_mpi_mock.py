@@ -196,6 +196,37 @@ def gather(comm, numpy):
         return recvbuf
 
 
+@worker()
+def scatterv(comm, numpy):
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    # rank i receives i + 1 items
+    recvbuf = numpy.zeros([rank + 1]) - 1
+    if rank == 0:
+        counts = [i + 1 for i in range(size)]
+        sendbuf = [numpy.arange(sum(counts), dtype=numpy.float64), counts]
+    else:
+        sendbuf = None
+    comm.Scatterv(sendbuf, recvbuf)
+    return recvbuf
+
+
+@worker(rank_order=lambda total_ranks: range(total_ranks - 1, -1, -1))
+def gatherv(comm, numpy):
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    # rank i sends i + 1 items
+    sendbuf = numpy.zeros([rank + 1]) + rank
+    if rank == 0:
+        counts = [i + 1 for i in range(size)]
+        recvbuf = numpy.zeros([sum(counts)]) - 1
+        comm.Gatherv(sendbuf, [recvbuf, counts])
+        return recvbuf
+    else:
+        comm.Gatherv(sendbuf, None)
+        return sendbuf
+
+
 @worker()
 def isend_irecv(comm, numpy):
     rank = comm.Get_rank()
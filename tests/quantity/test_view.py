@@ -1223,3 +1223,33 @@ def test_interior(quantity, view_slice, reference):
             quantity.np.testing.assert_array_equal(transposed_result, reference.T)
         else:
             quantity.np.testing.assert_array_equal(transposed_result, reference)
+
+
+@pytest.mark.parametrize(
+    "view_slice",
+    [
+        (slice(None), 1),
+        (slice(-1, 2), slice(None, -1)),
+        (slice(0, 3, 2), -1),
+    ],
+)
+@pytest.mark.parametrize("boundary", ["view", "northwest", "southeast", "interior"])
+def test_cached_index_matches_uncached(view_slice, boundary):
+    data = np.arange(49, dtype=np.float64).reshape(7, 7)
+    quantity = Quantity(
+        data, dims=[X_DIM, Y_DIM], units="m", origin=(2, 2), extent=(3, 3)
+    )
+    view = quantity.view
+    if boundary != "view":
+        view = getattr(view, boundary)
+    # numpy integers are not cached, so give the uncached index
+    uncached_slice = tuple(
+        np.int64(entry) if isinstance(entry, int) else entry for entry in view_slice
+    )
+    np.testing.assert_array_equal(view[view_slice], view[uncached_slice])
+    # a second quantity of the same layout reuses the index computation
+    other = Quantity(
+        data.copy(), dims=[X_DIM, Y_DIM], units="m", origin=(2, 2), extent=(3, 3)
+    )
+    other_view = other.view if boundary == "view" else getattr(other.view, boundary)
+    np.testing.assert_array_equal(other_view[view_slice], view[view_slice])
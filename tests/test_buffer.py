@@ -1,6 +1,12 @@
 import pytest
 
-from ndsl.buffer import BUFFER_CACHE, Buffer, recv_buffer, send_buffer
+from ndsl.buffer import (
+    BUFFER_CACHE,
+    Buffer,
+    BufferCache,
+    recv_buffer,
+    send_buffer,
+)
 from ndsl.utils import is_c_contiguous, is_contiguous
 
 
@@ -190,3 +196,59 @@ def test_mpi_unsafe_allocator_exception(backend, allocator):
     print(allocator)
     with pytest.raises(RuntimeError):
         Buffer.pop_from_cache(allocator, shape=(10, 10, 10), dtype=float)
+
+
+def test_buffer_cache_statistics(allocator, backend):
+    """Test hits & misses are counted per cache line"""
+    if backend == "gt4py_cupy":
+        pytest.skip("gt4py gpu backend cannot produce contiguous arrays")
+    BUFFER_CACHE.clear()
+    shape = (10, 10, 10)
+    first_buffer = Buffer.pop_from_cache(allocator, shape, float)
+    second_buffer = Buffer.pop_from_cache(allocator, shape, float)
+    statistics = Buffer.cache_statistics(first_buffer._key)
+    assert statistics.misses == 2
+    assert statistics.hits == 0
+    assert statistics.resident_bytes == 0
+    Buffer.push_to_cache(first_buffer)
+    Buffer.push_to_cache(second_buffer)
+    assert (
+        Buffer.cache_statistics().resident_bytes
+        == first_buffer.array.nbytes + second_buffer.array.nbytes
+    )
+    Buffer.push_to_cache(Buffer.pop_from_cache(allocator, shape, float))
+    statistics = Buffer.cache_statistics(first_buffer._key)
+    assert statistics.hits == 1
+    assert statistics.evictions == 0
+    report = BUFFER_CACHE.report()
+    assert report["total"]["misses"] == 2
+    assert len(report["lines"]) == 1
+    BUFFER_CACHE.clear()
+
+
+def test_buffer_cache_evicts_least_recently_used(numpy):
+    cache = BufferCache(max_bytes=None)
+    shape = (10,)
+    first_key = (numpy.zeros, shape, numpy.float64)
+    second_key = (numpy.zeros, shape, numpy.float32)
+    first_buffers = [Buffer(first_key, numpy.zeros(shape)) for _ in range(2)]
+    second_buffer = Buffer(second_key, numpy.zeros(shape, dtype=numpy.float32))
+    for buffer in first_buffers:
+        cache.push_buffer(buffer)
+    cache.push_buffer(second_buffer)
+    assert cache.resident_bytes == 2 * 80 + 40
+    # Budget only fits one float64 buffer and the float32 one: the oldest buffer
+    # of the least recently used line goes first
+    cache.set_max_bytes(120)
+    assert cache.resident_bytes == 120
+    assert cache[first_key] == [first_buffers[1]]
+    assert cache[second_key] == [second_buffer]
+    assert cache.statistics(first_key).evictions == 1
+    assert cache.statistics(second_key).evictions == 0
+    # Using the first line makes the second one the eviction candidate
+    assert cache.pop_buffer(first_key) is first_buffers[1]
+    cache.push_buffer(first_buffers[0])
+    cache.push_buffer(first_buffers[1])
+    assert cache.resident_bytes == 80
+    assert cache[second_key] == []
+    assert cache.statistics().evictions == 3
@@ -3,8 +3,14 @@ import io
 from typing import List
 
 import numpy as np
+import pytest
 
-from ndsl.comm.caching_comm import CachingCommReader, CachingCommWriter
+from ndsl.comm.caching_comm import (
+    CachingCommData,
+    CachingCommReader,
+    CachingCommWriter,
+    RecordFileReader,
+)
 from ndsl.comm.communicator import CubedSphereCommunicator
 from ndsl.comm.local_comm import LocalComm
 from ndsl.comm.null_comm import NullComm
@@ -93,6 +99,26 @@ def test_Irecv_inserts_data():
     assert comm._data.received_buffers[0].shape == shape
 
 
+def test_Waitany_forwards_to_comm():
+    inner = NullComm(rank=0, total_ranks=6, fill_value=0.0)
+    waited = []
+
+    def waitany(requests):
+        waited.append(requests)
+        requests[1].wait()
+        return 1
+
+    inner.Waitany = waitany
+    comm = CachingCommWriter(comm=inner)
+    recvbufs = [np.random.randn(3), np.random.randn(4)]
+    requests = [comm.Irecv(recvbuf, source=0) for recvbuf in recvbufs]
+    assert comm.Waitany(requests) == 1
+    # the wrapped comm waits on its own requests
+    assert [request._req for request in requests] == waited[0]
+    assert len(comm._data.received_buffers) == 1
+    assert comm._data.received_buffers[0].shape == (4,)
+
+
 def test_bcast_inserts_data():
     comm = CachingCommWriter(comm=NullComm(rank=0, total_ranks=6, fill_value=0.0))
     shape = (12, 12)
@@ -166,3 +192,99 @@ def test_Gather():
     root_comm.Gather(array_root, recvbuf=recvbuf_root, root=0)
     np.testing.assert_array_equal(recvbuf_root[0, :], array_root)
     np.testing.assert_array_equal(recvbuf_root[1, :], array_worker)
+
+
+@pytest.mark.parametrize("stream_records", [True, False])
+def test_halo_update_integration_records(tmp_path, stream_records: bool):
+    shape = (18, 18)
+    n_ranks = 6
+    partitioner = CubedSpherePartitioner(tile=TilePartitioner(layout=(1, 1)))
+    quantity_list = [
+        Quantity(
+            data=np.random.randn(*shape),
+            dims=[X_DIM, Y_DIM],
+            units="",
+            origin=(3, 3),
+            extent=(12, 12),
+        )
+        for _ in range(n_ranks)
+    ]
+    buffer_dict = {}
+    files = [open(tmp_path / f"rank{i}.ccr", "wb") for i in range(n_ranks)]
+    write_communicator_list: List[CubedSphereCommunicator] = []
+    for i in range(n_ranks):
+        comm = LocalComm(rank=i, total_ranks=n_ranks, buffer_dict=buffer_dict)
+        write_communicator_list.append(
+            CubedSphereCommunicator(
+                comm=CachingCommWriter(
+                    comm, record_file=files[i] if stream_records else None
+                ),
+                partitioner=partitioner,
+            )
+        )
+    local_comm_quantities = copy.deepcopy(quantity_list)
+    perform_serial_halo_updates(write_communicator_list, local_comm_quantities)
+    for communicator, file in zip(write_communicator_list, files):
+        if stream_records:
+            communicator.comm.close()
+        else:
+            communicator.comm.dump_records(file)
+        file.close()
+
+    read_communicator_list = [
+        CubedSphereCommunicator(
+            comm=CachingCommReader.load_records(str(tmp_path / f"rank{i}.ccr")),
+            partitioner=partitioner,
+        )
+        for i in range(n_ranks)
+    ]
+    perform_serial_halo_updates(read_communicator_list, quantity_list)
+    for local_comm_quantity, read_quantity in zip(local_comm_quantities, quantity_list):
+        np.testing.assert_array_equal(local_comm_quantity.data, read_quantity.data)
+    for communicator in read_communicator_list:
+        communicator.comm.close()
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "records.ccr")
+    large = np.random.randn(64, 64)
+    with open(path, "wb") as file:
+        comm = CachingCommWriter(NullComm(rank=0, total_ranks=6), record_file=file)
+        comm.bcast({"key": [1, 2]})
+        comm.Recv(large, source=0)
+        comm.Recv(np.zeros(3, dtype=np.int32), source=0)
+        comm.Split(color=0, key=0).bcast("split")
+        comm.close()
+    data = CachingCommData.load_records(path)
+    assert data.get_bcast() == {"key": [1, 2]}
+    assert data.get_split().get_bcast() == "split"
+    np.testing.assert_array_equal(data.get_buffer(), np.zeros_like(large))
+    small = data.get_buffer()
+    assert small.dtype == np.int32 and small.shape == (3,)
+    data.close()
+
+    with open(path, "wb") as file:
+        CachingCommData(rank=0, size=6, received_buffers=[large]).dump_records(
+            file, mmap_threshold=large.nbytes
+        )
+    data = CachingCommData.load_records(path)
+    mapped = data.get_buffer()
+    np.testing.assert_array_equal(mapped, large)
+    # memory-mapped rather than read into memory
+    assert not mapped.flags.owndata and not mapped.flags.writeable
+    del mapped
+    data.close()
+
+
+def test_record_file_reader_close(tmp_path):
+    path = str(tmp_path / "records.ccr")
+    large = np.random.randn(64, 64)
+    with open(path, "wb") as file:
+        CachingCommData(rank=0, size=6, received_buffers=[large]).dump_records(
+            file, mmap_threshold=large.nbytes
+        )
+    with RecordFileReader(path) as reader:
+        data = reader.data()
+        np.testing.assert_array_equal(data.get_buffer(), large)
+    with pytest.raises(ValueError):
+        data.received_buffers[0]
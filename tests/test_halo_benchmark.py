@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from ndsl.performance.halo_benchmark import (
+    HALO_BENCHMARK_OPERATIONS,
+    HaloBenchmarkConfig,
+    command_line,
+    halo_benchmark_report,
+    local_comms,
+    run_halo_benchmark,
+)
+
+
+@pytest.fixture
+def config():
+    return HaloBenchmarkConfig(
+        layout=(1, 1), nx_tile=12, nz=2, n_quantities=2, iterations=2, warmup=1
+    )
+
+
+def test_halo_benchmark_breaks_out_updater_timers(config):
+    result = run_halo_benchmark(local_comms(config.total_ranks), config)
+    assert result.ranks == list(range(config.total_ranks))
+    for rank_times in result.times_per_step:
+        assert len(rank_times) == config.iterations
+        for operation in HALO_BENCHMARK_OPERATIONS:
+            for key in ("", ".pack", ".wait", ".unpack"):
+                assert operation + key in rank_times[0]
+
+
+def test_halo_benchmark_report_holds_all_ranks(config):
+    result = run_halo_benchmark(
+        local_comms(config.total_ranks), config, operations=["halo_update"]
+    )
+    report = halo_benchmark_report(result, config)
+    assert report.setup.dataset == config.name
+    assert report.setup.timesteps == config.iterations
+    assert report.times["halo_update"].hits == config.iterations
+    assert len(report.times["halo_update"].times) == config.total_ranks
+    for rank_times in report.times["halo_update.wait"].times:
+        assert len(rank_times) == config.iterations
+
+
+@pytest.mark.parametrize("comm", ["local", "thread", "shm"])
+def test_halo_benchmark_command_line(tmp_path, comm):
+    output = tmp_path / "halo.json"
+    runner = CliRunner()
+    result = runner.invoke(
+        command_line,
+        [
+            "--comm",
+            comm,
+            "--nx_tile",
+            "12",
+            "--nz",
+            "2",
+            "--iterations",
+            "1",
+            "--dtype",
+            "float32",
+            "--operation",
+            "vector_halo_update",
+            "--output",
+            str(output),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    with open(output) as f:
+        data = json.load(f)
+    assert "vector_halo_update.pack" in data["times"]
+    assert "halo_update" not in data["times"]
+    assert data["setup"]["dataset"] == "halo_c12_1x1_z2_h3_q1_float32"
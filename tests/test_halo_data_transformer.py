@@ -22,7 +22,12 @@ from ndsl.constants import (
     Z_DIM,
     Z_INTERFACE_DIM,
 )
-from ndsl.halo.data_transformer import HaloDataTransformer, HaloExchangeSpec
+from ndsl.halo.data_transformer import (
+    HaloDataTransformer,
+    HaloExchangeSpec,
+    _build_flat_indices,
+    _flat_view,
+)
 from ndsl.halo.rotate import rotate_scalar_data, rotate_vector_data
 from ndsl.quantity import Quantity, QuantityHaloSpec
 
@@ -463,3 +468,84 @@ def test_data_transformer_vector_pack_unpack(quantity, rotation, n_halos):
 
     assert (targe_quanity_x.data == x_quantity.data).all()
     assert (targe_quanity_y.data == y_quantity.data).all()
+
+
+@pytest.mark.cpu_only
+@pytest.mark.parametrize("rotation", [0, -1, -2, -3])
+@pytest.mark.parametrize("direction", [NORTH, NORTHEAST, SOUTHWEST])
+def test_flat_indices_match_rotated_view(rotation, direction):
+    """Gathering the flat indices of a padded (non-contiguous) array reproduces
+    the rotated & flattened view of the slice."""
+    dims = (X_DIM, Y_DIM, Z_DIM)
+    n_halo = 3
+    padded = np.random.default_rng(0).random((13, 14, 6))
+    data = padded[:, :, :5]
+    assert not data.flags["C_CONTIGUOUS"]
+    slices = _boundary_utils.get_boundary_slice(
+        dims,
+        (n_halo, n_halo, 0),
+        (7, 8, 5),
+        data.shape,
+        direction,
+        n_halo,
+        interior=True,
+    )
+    indices = _build_flat_indices(
+        data.shape, slices, dims, data.strides, data.itemsize, rotation
+    )
+    expected = rotate_scalar_data(data[slices], dims, np, -rotation).flatten()
+    np.testing.assert_array_equal(np.take(_flat_view(data), indices), expected)
+
+
+def test_data_transformer_vector_pack_matches_rotated_views(
+    quantity, rotation, n_halos
+):
+    """Packing distinct x & y components swaps and negates them as
+    rotate_vector_data does."""
+    x_quantity = quantity
+    y_quantity = copy.deepcopy(quantity)
+    y_quantity.data[:] = -3 * y_quantity.data - 1
+    send_boundaries, recv_boundaries = _get_boundaries(x_quantity, n_halos)
+    exchanges = [
+        (send_boundaries[NORTH], recv_boundaries[SOUTH]),
+        (send_boundaries[NORTHEAST], recv_boundaries[SOUTHWEST]),
+    ]
+
+    def exchange_descriptors(quantity):
+        specification = QuantityHaloSpec(
+            n_points=n_halos,
+            shape=quantity.data.shape,
+            strides=quantity.data.strides,
+            itemsize=quantity.data.itemsize,
+            origin=quantity.metadata.origin,
+            extent=quantity.metadata.extent,
+            dims=quantity.metadata.dims,
+            numpy_module=quantity.np,
+            dtype=quantity.metadata.dtype,
+        )
+        return [
+            HaloExchangeSpec(specification, pack_slices, rotation, unpack_slices)
+            for pack_slices, unpack_slices in exchanges
+        ]
+
+    data_transformer = HaloDataTransformer.get(
+        x_quantity.np,
+        exchange_descriptors(x_quantity),
+        exchange_descriptors(y_quantity),
+    )
+    data_transformer.async_pack([x_quantity, x_quantity], [y_quantity, y_quantity])
+    data_transformer.synchronize()
+
+    expected = []
+    for pack_slices, _ in exchanges:
+        rotated_x, rotated_y = rotate_vector_data(
+            x_quantity.data[pack_slices],
+            y_quantity.data[pack_slices],
+            -rotation,
+            x_quantity.dims,
+            x_quantity.np,
+        )
+        expected += [rotated_x.flatten(), rotated_y.flatten()]
+    np.testing.assert_array_equal(
+        data_transformer.get_pack_buffer().array, np.concatenate(expected)
+    )
@@ -923,3 +923,194 @@ def test_halo_updater_stability(
         len(next(iter(BUFFER_CACHE.values())))
         == len(communicator_list) * len(communicator.boundaries.values()) * 2
     )
+
+
+def test_combined_halo_update_matches_separate_updates(
+    depth_quantity_list,
+    communicator_list,
+    n_points_update,
+    n_points,
+    numpy,
+    subtests,
+):
+    """test that a combined scalar & vector halo update gives the same result as
+    separate updates, while sending a single message per neighbor"""
+    if not (0 < n_points_update <= n_points):
+        pytest.skip("invalid number of points to update")
+    scalars = depth_quantity_list
+    x_list = copy.deepcopy(scalars)
+    y_list = copy.deepcopy(scalars)
+    for quantity in y_list:
+        quantity.data[:] = quantity.data * 2.0
+    reference_scalars = copy.deepcopy(scalars)
+    reference_x_list = copy.deepcopy(x_list)
+    reference_y_list = copy.deepcopy(y_list)
+
+    halo_updater_list = []
+    for communicator, scalar, x_quantity, y_quantity in zip(
+        communicator_list, scalars, x_list, y_list
+    ):
+        halo_updater = communicator.start_combined_halo_update(
+            [scalar], [x_quantity], [y_quantity], n_points_update
+        )
+        assert len(halo_updater._transformers) == len(communicator.boundaries)
+        halo_updater_list.append(halo_updater)
+    for halo_updater in halo_updater_list:
+        halo_updater.wait()
+
+    halo_updater_list = []
+    for communicator, scalar in zip(communicator_list, reference_scalars):
+        halo_updater_list.append(
+            communicator.start_halo_update(scalar, n_points_update)
+        )
+    for halo_updater in halo_updater_list:
+        halo_updater.wait()
+    halo_updater_list = []
+    for communicator, x_quantity, y_quantity in zip(
+        communicator_list, reference_x_list, reference_y_list
+    ):
+        halo_updater_list.append(
+            communicator.start_vector_halo_update(
+                x_quantity, y_quantity, n_points_update
+            )
+        )
+    for halo_updater in halo_updater_list:
+        halo_updater.wait()
+
+    for rank in range(len(communicator_list)):
+        with subtests.test(rank=rank):
+            for result, reference in (
+                (scalars[rank], reference_scalars[rank]),
+                (x_list[rank], reference_x_list[rank]),
+                (y_list[rank], reference_y_list[rank]),
+            ):
+                numpy.testing.assert_array_equal(result.data, reference.data)
+
+
+def get_scalar_halo_updater(communicator, quantity, n_points):
+    specification = QuantityHaloSpec(
+        n_points,
+        quantity.data.strides,
+        quantity.data.itemsize,
+        quantity.data.shape,
+        quantity.origin,
+        quantity.extent,
+        quantity.dims,
+        quantity.np,
+        quantity.metadata.dtype,
+    )
+    return HaloUpdater.from_scalar_specifications(
+        comm=communicator,
+        numpy_like_module=quantity.np,
+        specifications=[specification],
+        boundaries=communicator.boundaries.values(),
+        tag=0,
+    )
+
+
+@pytest.mark.parametrize("layout", [(3, 3)], indirect=True)
+def test_halo_updater_persistent_requests(
+    depth_quantity_list,
+    communicator_list,
+    n_points,
+    numpy,
+    subtests,
+):
+    """
+    Test that persistent requests give the same results as regular requests
+    through multiple exchanges, creating the requests only once.
+    """
+    reference_list = copy.deepcopy(depth_quantity_list)
+
+    persistent_updaters = []
+    reference_updaters = []
+    for communicator, quantity, reference in zip(
+        communicator_list, depth_quantity_list, reference_list
+    ):
+        persistent_updaters.append(
+            get_scalar_halo_updater(communicator, quantity, n_points)
+        )
+        persistent_updaters[-1].use_persistent_requests()
+        reference_updaters.append(
+            get_scalar_halo_updater(communicator, reference, n_points)
+        )
+
+    first_requests = None
+    for _ in range(3):
+        for halo_updater, quantity in zip(persistent_updaters, depth_quantity_list):
+            halo_updater.start([quantity])
+        for halo_updater in persistent_updaters:
+            halo_updater.wait()
+        if first_requests is None:
+            first_requests = [
+                list(halo_updater._persistent_recv_requests)
+                for halo_updater in persistent_updaters
+            ]
+        for halo_updater, reference in zip(reference_updaters, reference_list):
+            halo_updater.start([reference])
+        for halo_updater in reference_updaters:
+            halo_updater.wait()
+
+    for rank, (quantity, reference) in enumerate(
+        zip(depth_quantity_list, reference_list)
+    ):
+        with subtests.test(rank=rank):
+            numpy.testing.assert_array_equal(quantity.data, reference.data)
+            assert (
+                persistent_updaters[rank]._persistent_recv_requests
+                == first_requests[rank]
+            )
+
+
+@pytest.mark.parametrize("reverse_completion", [False, True])
+@pytest.mark.parametrize("persistent", [False, True])
+def test_halo_updater_overlapped_wait(
+    depth_quantity_list,
+    communicator_list,
+    n_points,
+    numpy,
+    subtests,
+    reverse_completion,
+    persistent,
+):
+    """
+    Test that unpacking neighbours in order of receive completion gives the
+    same results as waiting on all requests before unpacking.
+    """
+    reference_list = copy.deepcopy(depth_quantity_list)
+
+    def waitany_last(requests):
+        requests[-1].wait()
+        return len(requests) - 1
+
+    overlapped_updaters = []
+    reference_updaters = []
+    for communicator, quantity, reference in zip(
+        communicator_list, depth_quantity_list, reference_list
+    ):
+        if reverse_completion:
+            communicator.comm.Waitany = waitany_last
+        overlapped_updaters.append(
+            get_scalar_halo_updater(communicator, quantity, n_points)
+        )
+        overlapped_updaters[-1].use_overlapped_wait()
+        if persistent:
+            overlapped_updaters[-1].use_persistent_requests()
+        reference_updaters.append(
+            get_scalar_halo_updater(communicator, reference, n_points)
+        )
+
+    for halo_updater, quantity in zip(overlapped_updaters, depth_quantity_list):
+        halo_updater.start([quantity])
+    for halo_updater in overlapped_updaters:
+        halo_updater.wait()
+    for halo_updater, reference in zip(reference_updaters, reference_list):
+        halo_updater.start([reference])
+    for halo_updater in reference_updaters:
+        halo_updater.wait()
+
+    for rank, (quantity, reference) in enumerate(
+        zip(depth_quantity_list, reference_list)
+    ):
+        with subtests.test(rank=rank):
+            numpy.testing.assert_array_equal(quantity.data, reference.data)
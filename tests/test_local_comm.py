@@ -52,3 +52,18 @@ def test_local_comm_tags(local_communicator_list, tags):
                 recv = comm.Irecv(rec_buffer[i], source=(rank - 1) % size, tag=i)
                 recv.wait()
             assert (rec_buffer[list(tags)] == data - 1).all()
+
+
+def test_local_comm_persistent_requests(local_communicator_list):
+    sender, receiver = local_communicator_list
+    send_data = numpy.zeros([3], dtype=numpy.int32)
+    recv_data = numpy.zeros([3], dtype=numpy.int32)
+    send_request = sender.Send_init(send_data, dest=1, tag=3)
+    recv_request = receiver.Recv_init(recv_data, source=0, tag=3)
+    for value in range(3):
+        send_data[:] = value
+        sender.Startall([send_request])
+        receiver.Startall([recv_request])
+        sender.Waitall([send_request])
+        receiver.Waitall([recv_request])
+        assert (recv_data == value).all()
@@ -0,0 +1,91 @@
+import gc
+import json
+
+import numpy as np
+import pytest
+
+from ndsl.buffer import BUFFER_CACHE, Buffer
+from ndsl.comm.thread_comm import run_ranks
+from ndsl.constants import X_DIM, Y_DIM, Z_DIM
+from ndsl.initialization import QuantityFactory, SubtileGridSizer
+from ndsl.performance.memory import (
+    MEMORY_REGISTRY,
+    MemoryRegistry,
+    gather_memory_report,
+)
+
+
+@pytest.fixture
+def registry():
+    MEMORY_REGISTRY.clear()
+    MEMORY_REGISTRY.enable()
+    yield MEMORY_REGISTRY
+    MEMORY_REGISTRY.disable()
+    MEMORY_REGISTRY.clear()
+
+
+def test_registry_disabled_by_default():
+    registry = MemoryRegistry()
+    registry.track(np.zeros(10), "quantity", "owner")
+    registry.record("dace", "sdfg", 100)
+    assert registry.report() == {"host_bytes": 0, "device_bytes": 0, "categories": {}}
+
+
+def test_registry_releases_collected_arrays():
+    registry = MemoryRegistry()
+    registry.enable()
+    array = np.zeros(10)
+    kept = np.zeros(5)
+    registry.track(array, "quantity", "first")
+    registry.track(kept, "quantity", "first")
+    report = registry.report()
+    assert report["host_bytes"] == 15 * 8
+    assert report["categories"]["quantity"]["owners"]["first"]["count"] == 2
+    # tracking again moves the array to its new owner
+    registry.track(array, "halo", "second")
+    assert registry.report()["categories"]["halo"]["owners"]["second"] == {
+        "count": 1,
+        "host_bytes": 80,
+        "device_bytes": 0,
+    }
+    del array
+    gc.collect()
+    report = registry.report()
+    assert report["host_bytes"] == 5 * 8
+    assert set(report["categories"]) == {"quantity"}
+
+
+def test_registry_tracks_factory_and_buffers(registry):
+    sizer = SubtileGridSizer(nx=8, ny=8, nz=4, n_halo=3, extra_dim_lengths={})
+    factory = QuantityFactory(sizer, np, name="dycore")
+    quantity = factory.zeros([X_DIM, Y_DIM, Z_DIM], "m")
+    BUFFER_CACHE.clear()
+    buffer = Buffer.pop_from_cache(np.empty, (16,), np.float64)
+    categories = registry.report()["categories"]
+    assert categories["quantity"]["owners"]["dycore"]["host_bytes"] == (
+        quantity.data.nbytes
+    )
+    assert categories["buffer"]["host_bytes"] == 16 * 8
+    Buffer.push_to_cache(buffer)
+    categories = registry.report()["categories"]
+    assert "buffer" not in categories
+    assert categories["buffer_cache"]["host_bytes"] == 16 * 8
+    BUFFER_CACHE.clear()
+
+
+def test_gather_memory_report():
+    def report(comm):
+        registry = MemoryRegistry()
+        registry.enable()
+        registry.record("dace", "sdfg", 100)
+        registry.record("quantity", "factory", 10 * (comm.Get_rank() + 1))
+        return gather_memory_report(comm, registry)
+
+    results = run_ranks(report, total_ranks=3)
+    assert results[0] == results[2]
+    assert len(results[0]["ranks"]) == 3
+    reduced = results[0]["reduced"]
+    owner = reduced["categories"]["quantity"]["factory"]["host_bytes"]
+    assert owner == {"min": 10, "max": 30, "mean": 20.0, "sum": 60}
+    assert reduced["host_bytes"]["sum"] == 3 * 100 + 60
+    json.dumps(results[0])
@@ -8,7 +8,7 @@ import pytest
 
 from ndsl.comm.communicator import CubedSphereCommunicator
 from ndsl.comm.partitioner import CubedSpherePartitioner, TilePartitioner
-from ndsl.monitor import NetCDFMonitor
+from ndsl.monitor import NetCDFMonitor, stitch_rank_files
 from ndsl.optional_imports import xarray as xr
 from ndsl.quantity import Quantity
 from ndsl.testing import DummyComm
@@ -34,9 +34,19 @@ logger = logging.getLogger(__name__)
         pytest.param((5, 4, 4), 0, 1, ("z", "y", "x_interface"), id="cell_edge"),
     ],
 )
+@pytest.mark.parametrize("write_in_background", [False, True])
 @requires_xarray
 def test_monitor_store_multi_rank_state(
-    layout, nt, time_chunk_size, tmpdir, shape, ny_rank_add, nx_rank_add, dims, numpy
+    layout,
+    nt,
+    time_chunk_size,
+    tmpdir,
+    shape,
+    ny_rank_add,
+    nx_rank_add,
+    dims,
+    numpy,
+    write_in_background,
 ):
     units = "m"
     nz, ny, nx = shape
@@ -65,6 +75,7 @@ def test_monitor_store_multi_rank_state(
                 path=tmpdir,
                 communicator=communicator,
                 time_chunk_size=time_chunk_size,
+                write_in_background=write_in_background,
             )
         )
 
@@ -135,3 +146,136 @@ def test_monitor_store_multi_rank_state(
     assert ds_const2["var_const2"].dims == ("tile",) + dims
     assert ds_const2["var_const2"].attrs["units"] == units
     np.testing.assert_array_equal(ds_const2["var_const2"].values, 1.0)
+
+
+@requires_xarray
+def test_monitor_background_write_reuses_chunk_buffers(tmpdir, numpy):
+    nt, time_chunk_size = 6, 2
+    communicator = CubedSphereCommunicator(
+        partitioner=CubedSpherePartitioner(TilePartitioner((1, 1))),
+        comm=DummyComm(rank=0, total_ranks=6, buffer_dict={}),
+    )
+    monitor = NetCDFMonitor(
+        path=tmpdir,
+        communicator=communicator,
+        time_chunk_size=time_chunk_size,
+        write_in_background=True,
+    )
+    time = cftime.DatetimeJulian(2010, 6, 20, 6, 0, 0)
+    buffers = set()
+    for i_t in range(nt):
+        monitor.store(
+            {
+                "time": time + i_t * timedelta(hours=1),
+                "var1": Quantity(
+                    numpy.full([4, 4], float(i_t)), dims=("y", "x"), units="m"
+                ),
+            }
+        )
+        if i_t % time_chunk_size == 0:
+            buffers.add(id(monitor._writer._chunked["var1"]._data))
+    monitor.cleanup()
+    # cleanup writes all chunks and stops the writer thread
+    assert not monitor._background_writer._thread.is_alive()
+    # at most one chunk is being written while the next one is filled
+    assert len(buffers) <= 3
+    ds = xr.open_mfdataset(str(tmpdir / "state_*_tile*.nc"), decode_times=True)
+    np.testing.assert_array_equal(ds["var1"].values[:, 0, 0, 0], np.arange(nt))
+
+
+@requires_xarray
+def test_monitor_background_write_error_raised_on_cleanup(tmpdir, numpy):
+    communicator = CubedSphereCommunicator(
+        partitioner=CubedSpherePartitioner(TilePartitioner((1, 1))),
+        comm=DummyComm(rank=0, total_ranks=6, buffer_dict={}),
+    )
+    # a file where the output directory should be makes the write fail
+    path = tmpdir / "not_a_directory"
+    path.write("")
+    monitor = NetCDFMonitor(
+        path=str(path), communicator=communicator, write_in_background=True
+    )
+    monitor.store({"var1": Quantity(numpy.ones([4, 4]), dims=("y", "x"), units="m")})
+    with pytest.raises(RuntimeError, match="background netCDF write failed"):
+        monitor.cleanup()
+
+
+@pytest.mark.parametrize(
+    "tile_partitioner",
+    [
+        pytest.param(TilePartitioner((1, 1)), id="1x1"),
+        pytest.param(TilePartitioner((2, 2)), id="2x2"),
+        pytest.param(
+            TilePartitioner((2, 2), subtile_cell_counts=((1, 3), (3, 1))),
+            id="2x2_weighted",
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "dims, ny_rank_add, nx_rank_add",
+    [
+        pytest.param(("z", "y", "x"), 0, 0, id="cell_center"),
+        pytest.param(("z", "y_interface", "x_interface"), 1, 1, id="cell_corner"),
+        pytest.param(("z", "y", "x_interface"), 0, 1, id="cell_edge"),
+    ],
+)
+@requires_xarray
+def test_monitor_per_rank_output_stitches_to_gathered_output(
+    tile_partitioner, dims, ny_rank_add, nx_rank_add, tmpdir, numpy
+):
+    nt, time_chunk_size, nz, ny, nx = 3, 2, 2, 4, 4
+    partitioner = CubedSpherePartitioner(tile_partitioner)
+    total_ranks = partitioner.total_ranks
+    time = cftime.DatetimeJulian(2010, 6, 20, 6, 0, 0)
+    tile_extent = (nz, ny + ny_rank_add, nx + nx_rank_add)
+    monitors = {}
+    for per_rank_output in (False, True):
+        shared_buffer = {}
+        monitors[per_rank_output] = []
+        for rank in range(total_ranks):
+            communicator = CubedSphereCommunicator(
+                partitioner=partitioner,
+                comm=DummyComm(
+                    rank=rank, total_ranks=total_ranks, buffer_dict=shared_buffer
+                ),
+            )
+            communicator.tile
+            monitors[per_rank_output].append(
+                NetCDFMonitor(
+                    path=str(tmpdir / str(per_rank_output)),
+                    communicator=communicator,
+                    time_chunk_size=time_chunk_size,
+                    per_rank_output=per_rank_output,
+                )
+            )
+
+    for i_t in range(nt):
+        for rank in range(total_ranks - 1, -1, -1):
+            tile_data = np.arange(np.prod(tile_extent), dtype=np.float64).reshape(
+                tile_extent
+            ) + 100 * (i_t + 10 * partitioner.tile_index(rank))
+            rank_slice = partitioner.tile.subtile_slice(
+                rank, dims, tile_extent, overlap=True
+            )
+            for rank_monitors in monitors.values():
+                rank_monitors[rank].store(
+                    {
+                        "time": time + i_t * timedelta(hours=1),
+                        "var1": Quantity(
+                            numpy.asarray(tile_data[rank_slice]), dims=dims, units="m"
+                        ),
+                    }
+                )
+    for rank_monitors in monitors.values():
+        for monitor in rank_monitors:
+            monitor.cleanup()
+
+    for tile in range(6):
+        gathered = xr.open_mfdataset(
+            str(tmpdir / "False" / f"state_*_tile{tile}.nc"), decode_times=True
+        )
+        stitched = stitch_rank_files(str(tmpdir / "True"), tile)
+        assert stitched["var1"].dims == ("time", "tile") + dims
+        assert stitched["var1"].attrs == gathered["var1"].attrs
+        np.testing.assert_array_equal(stitched["time"], gathered["time"])
+        np.testing.assert_array_equal(stitched["var1"], gathered["var1"])
@@ -0,0 +1,98 @@
+import io
+
+import numpy as np
+import pytest
+
+from ndsl.comm.partitioner import (
+    CubedSpherePartitioner,
+    PartitionerTopology,
+    TilePartitioner,
+)
+from ndsl.constants import (
+    BOUNDARY_TYPES,
+    TILE_DIM,
+    X_DIM,
+    X_INTERFACE_DIM,
+    Y_DIM,
+    Y_INTERFACE_DIM,
+    Z_DIM,
+)
+from ndsl.quantity import Quantity
+
+
+def get_partitioners():
+    for layout in [(1, 1), (2, 2), (3, 3), (5, 5)]:
+        yield CubedSpherePartitioner(TilePartitioner(layout))
+    for layout in [(1, 1), (2, 3), (4, 4)]:
+        yield TilePartitioner(layout)
+
+
+@pytest.mark.cpu_only
+@pytest.mark.parametrize("partitioner", list(get_partitioners()))
+def test_topology_matches_partitioner(partitioner):
+    topology = PartitionerTopology.from_partitioner(partitioner)
+    assert topology.total_ranks == partitioner.total_ranks
+    for rank in range(partitioner.total_ranks):
+        for boundary_type in BOUNDARY_TYPES:
+            assert topology.boundary(boundary_type, rank) == partitioner.boundary(
+                boundary_type, rank
+            )
+
+
+@pytest.mark.cpu_only
+def test_topology_is_cached_on_partitioner():
+    partitioner = CubedSpherePartitioner(TilePartitioner((2, 2)))
+    assert partitioner.topology is partitioner.topology
+
+
+@pytest.mark.cpu_only
+def test_topology_dump_and_load():
+    topology = CubedSpherePartitioner(TilePartitioner((3, 3))).topology
+    file = io.BytesIO()
+    topology.dump(file)
+    file.seek(0)
+    loaded = PartitionerTopology.load(file)
+    assert loaded.layout == topology.layout
+    assert loaded.n_tiles == 6
+    np.testing.assert_array_equal(loaded.to_rank, topology.to_rank)
+    for rank in range(topology.total_ranks):
+        assert loaded.boundaries(rank) == topology.boundaries(rank)
+
+
+@pytest.mark.cpu_only
+@pytest.mark.parametrize("overlap", [True, False])
+@pytest.mark.parametrize(
+    "layout, edge_interior_ratio", [((2, 2), 1.0), ((3, 3), 1.0), ((4, 4), 0.5)]
+)
+@pytest.mark.parametrize(
+    "dims, extent",
+    [
+        ([TILE_DIM, Y_DIM, X_DIM], (6, 12, 12)),
+        ([TILE_DIM, X_INTERFACE_DIM, Z_DIM, Y_DIM], (6, 13, 5, 12)),
+        ([Z_DIM, TILE_DIM, Y_INTERFACE_DIM, X_DIM], (5, 6, 13, 12)),
+    ],
+)
+def test_topology_subtile_slices(layout, edge_interior_ratio, dims, extent, overlap):
+    partitioner = CubedSpherePartitioner(TilePartitioner(layout, edge_interior_ratio))
+    start, stop = partitioner.topology.subtile_slices(dims, extent, overlap=overlap)
+    tile_dims = [dim for dim in dims if dim != TILE_DIM]
+    tile_extent = [size for dim, size in zip(dims, extent) if dim != TILE_DIM]
+    tile = dims.index(TILE_DIM)
+    metadata = Quantity(
+        np.zeros(extent), dims, "m", origin=[0] * len(dims), extent=extent
+    ).metadata
+    extents = partitioner.topology.subtile_extents(metadata)
+    for rank in range(partitioner.total_ranks):
+        assert (start[rank, tile], stop[rank, tile]) == (
+            partitioner.tile_index(rank),
+            partitioner.tile_index(rank) + 1,
+        )
+        expected = partitioner.tile.subtile_slice(
+            rank, tile_dims, tile_extent, overlap=overlap
+        )
+        assert [
+            slice(begin, end)
+            for i, (begin, end) in enumerate(zip(start[rank], stop[rank]))
+            if i != tile
+        ] == list(expected)
+        assert tuple(extents[rank]) == partitioner.subtile_extent(metadata, rank)
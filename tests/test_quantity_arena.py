@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from ndsl.constants import X_DIM, X_INTERFACE_DIM, Y_DIM, Z_DIM
+from ndsl.initialization import QuantityArena, QuantityFactory, SubtileGridSizer
+
+
+@pytest.fixture
+def sizer():
+    return SubtileGridSizer(nx=12, ny=10, nz=5, n_halo=3, extra_dim_lengths={})
+
+
+@pytest.mark.parametrize("backend", ["numpy", "gt:cpu_ifirst", "gt:cpu_kfirst"])
+@pytest.mark.parametrize(
+    "dims", [[X_DIM, Y_DIM, Z_DIM], [X_INTERFACE_DIM, Y_DIM], [Z_DIM]]
+)
+def test_arena_matches_gt4py_layout(sizer, backend, dims):
+    arena = QuantityArena(slab_bytes=1 << 16)
+    factory = QuantityFactory.from_backend(sizer, backend, arena=arena)
+    reference = QuantityFactory.from_backend(sizer, backend).ones(dims, "m")
+    quantity = factory.ones(dims, "m")
+    assert quantity.data.shape == reference.data.shape
+    assert quantity.data.strides == reference.data.strides
+    np.testing.assert_array_equal(quantity.data, reference.data)
+    # the quantity uses the arena memory rather than a copy of it
+    slab = arena._groups[(backend, "numpy", np.dtype(np.float64))].slabs[0]
+    assert np.shares_memory(quantity.data, slab.array)
+    # as with gt4py, the origin is aligned along the contiguous dimension
+    contiguous = int(np.argmin(quantity.data.strides))
+    aligned_address = (
+        quantity.data.ctypes.data
+        + quantity.origin[contiguous] * quantity.data.strides[contiguous]
+    )
+    assert aligned_address % 64 == 0
+
+
+def test_arena_scope_reuses_memory(sizer):
+    arena = QuantityArena(slab_bytes=1 << 14)
+    factory = QuantityFactory(sizer, np, arena=arena)
+    persistent = factory.zeros([X_DIM, Y_DIM, Z_DIM], "m")
+    used_bytes = arena.used_bytes
+    with arena.scope():
+        first = [factory.zeros([X_DIM, Y_DIM, Z_DIM], "m") for _ in range(4)]
+        assert arena.used_bytes > used_bytes
+    reserved_bytes = arena.reserved_bytes
+    assert arena.used_bytes == used_bytes
+    with arena.scope():
+        second = [factory.zeros([X_DIM, Y_DIM, Z_DIM], "m") for _ in range(4)]
+    assert arena.reserved_bytes == reserved_bytes
+    for first_quantity, second_quantity in zip(first, second):
+        assert first_quantity.data.ctypes.data == second_quantity.data.ctypes.data
+    assert not np.shares_memory(persistent.data, second[0].data)
+
+
+def test_arena_large_array_gets_own_slab(sizer):
+    arena = QuantityArena(slab_bytes=1024)
+    factory = QuantityFactory(sizer, np, arena=arena)
+    small = factory.zeros([Z_DIM], "m")
+    large = factory.ones([X_DIM, Y_DIM, Z_DIM], "m")
+    after = factory.zeros([Z_DIM], "m")
+    assert len(arena._groups[(None, "numpy", np.dtype(np.float64))].slabs) == 3
+    assert np.all(large.data == 1) and np.all(small.data == 0)
+    assert not np.shares_memory(large.data, after.data)
+
+
+def test_arena_report_by_component(sizer):
+    arena = QuantityArena()
+    factory = QuantityFactory(sizer, np, arena=arena)
+    with arena.component("dycore"):
+        factory.zeros([X_DIM, Y_DIM, Z_DIM], "m")
+        with arena.component("physics"):
+            factory.zeros([X_DIM, Y_DIM], "m", dtype=np.int32)
+        with arena.scope():
+            factory.zeros([X_DIM, Y_DIM, Z_DIM], "m")
+    factory.zeros([Z_DIM], "m")
+    report = arena.report()
+    assert report["components"] == {
+        "dycore": np.prod(sizer.get_shape([X_DIM, Y_DIM, Z_DIM])) * 8,
+        "physics": np.prod(sizer.get_shape([X_DIM, Y_DIM])) * 4,
+        "default": np.prod(sizer.get_shape([Z_DIM])) * 8,
+    }
+    assert set(report["slabs"]) == {"numpy:float64", "numpy:int32"}
+    assert report["used_bytes"] >= sum(report["components"].values())
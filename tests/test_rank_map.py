@@ -0,0 +1,61 @@
+import pytest
+
+from ndsl.comm.communicator import CubedSphereCommunicator
+from ndsl.comm.partitioner import CubedSpherePartitioner, RankMap, TilePartitioner
+from ndsl.comm.thread_comm import run_ranks
+
+
+@pytest.mark.parametrize("ordering", ["linear", "tile_blocked", "hilbert"])
+@pytest.mark.parametrize("layout", [(1, 1), (3, 3), (4, 4), (2, 6)])
+def test_rank_map_is_permutation(layout, ordering):
+    partitioner = CubedSpherePartitioner(TilePartitioner(layout))
+    rank_map = RankMap(partitioner, ranks_per_node=4, ordering=ordering)
+    partition_ranks = [
+        rank_map.partition_rank(rank) for rank in range(partitioner.total_ranks)
+    ]
+    assert sorted(partition_ranks) == list(range(partitioner.total_ranks))
+    for rank, partition_rank in enumerate(partition_ranks):
+        assert rank_map.rank(partition_rank) == rank
+
+
+def test_linear_rank_map_is_identity():
+    partitioner = CubedSpherePartitioner(TilePartitioner((3, 3)))
+    rank_map = RankMap(partitioner, ranks_per_node=9, ordering="linear")
+    assert all(rank_map.partition_rank(rank) == rank for rank in range(54))
+
+
+@pytest.mark.parametrize(
+    "layout, ranks_per_node", [((4, 4), 4), ((8, 8), 16), ((6, 6), 4)]
+)
+@pytest.mark.parametrize("ordering", ["tile_blocked", "hilbert"])
+def test_rank_map_reduces_inter_node_edges(layout, ranks_per_node, ordering):
+    partitioner = CubedSpherePartitioner(TilePartitioner(layout))
+    linear = RankMap(partitioner, ranks_per_node, ordering="linear")
+    reordered = RankMap(partitioner, ranks_per_node, ordering=ordering)
+    assert reordered.inter_node_edge_count() < linear.inter_node_edge_count()
+
+
+def test_tile_blocked_places_blocks_on_nodes():
+    partitioner = CubedSpherePartitioner(TilePartitioner((4, 4)))
+    rank_map = RankMap(partitioner, ranks_per_node=4)
+    # the first node holds the 2x2 block in the corner of the first tile
+    assert {rank_map.partition_rank(rank) for rank in range(4)} == {0, 1, 4, 5}
+
+
+def test_rank_map_invalid_ordering():
+    partitioner = CubedSpherePartitioner(TilePartitioner((2, 2)))
+    with pytest.raises(ValueError):
+        RankMap(partitioner, ranks_per_node=4, ordering="random")
+
+
+def test_communicator_from_rank_map():
+    partitioner = CubedSpherePartitioner(TilePartitioner((2, 2)))
+    rank_map = RankMap(partitioner, ranks_per_node=4, ordering="hilbert")
+
+    def ranks(comm):
+        communicator = CubedSphereCommunicator.from_rank_map(comm, rank_map)
+        return comm.Get_rank(), communicator.rank, communicator.tile.rank
+
+    for rank, partition_rank, tile_rank in run_ranks(ranks, total_ranks=24):
+        assert partition_rank == rank_map.partition_rank(rank)
+        assert tile_rank == partition_rank % 4
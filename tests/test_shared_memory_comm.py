@@ -0,0 +1,207 @@
+import os
+
+import numpy as np
+import pytest
+
+import ndsl.constants as constants
+from ndsl.comm.communicator import CubedSphereCommunicator
+from ndsl.comm.local_comm import LocalComm
+from ndsl.comm.partitioner import CubedSpherePartitioner, TilePartitioner
+from ndsl.comm.shared_memory_comm import SharedMemoryComm, run_processes
+from ndsl.quantity import Quantity, QuantityHaloSpec
+
+
+def test_shared_memory_comm_send_recv_reuses_segments():
+    def exchange(comm: SharedMemoryComm):
+        other = 1 - comm.Get_rank()
+        received = []
+        for step in range(3):
+            data = np.full([2, 3], comm.Get_rank() + 10 * step, dtype=np.float32)
+            recv = np.zeros([6], dtype=np.float32)
+            request = comm.Irecv(recv, source=other, tag=1)
+            comm.Isend(data, dest=other, tag=1).wait()
+            request.wait()
+            received.append(recv.copy())
+        n_segments = sum(
+            len(segments)
+            for (dest, _), segments in comm._endpoint._segments.items()
+            if dest == other
+        )
+        return received, n_segments
+
+    results = run_processes(exchange, total_ranks=2)
+    for rank, (received, n_segments) in enumerate(results):
+        for step, recv in enumerate(received):
+            assert (recv == 1 - rank + 10 * step).all()
+        assert n_segments <= 2
+
+
+def test_shared_memory_comm_waitany_returns_completed_request():
+    def exchange(comm: SharedMemoryComm):
+        if comm.Get_rank() == 0:
+            late, early = np.zeros([2]), np.zeros([2])
+            requests = [
+                comm.Irecv(late, source=1, tag=0),
+                comm.Irecv(early, source=1, tag=1),
+            ]
+            index = comm.Waitany(requests)
+            comm.barrier()
+            requests[1 - index].wait()
+            return index, late, early
+        comm.Send(np.full([2], 2.0), dest=0, tag=1)
+        comm.barrier()
+        comm.Send(np.full([2], 1.0), dest=0, tag=0)
+
+    index, late, early = run_processes(exchange, total_ranks=2)[0]
+    assert index == 1
+    np.testing.assert_array_equal(late, [1.0, 1.0])
+    np.testing.assert_array_equal(early, [2.0, 2.0])
+
+
+def test_shared_memory_comm_collectives():
+    def collectives(comm: SharedMemoryComm):
+        rank = comm.Get_rank()
+        size = comm.Get_size()
+        split = comm.Split(color=rank % 2, key=-rank)
+        scattered = np.zeros([2])
+        comm.Scatter(
+            np.arange(2.0 * size).reshape(size, 2) if rank == 1 else None,
+            scattered,
+            root=1,
+        )
+        gathered = np.zeros([size, 2]) if rank == 0 else None
+        comm.Gather(scattered, gathered)
+        comm.barrier()
+        return (
+            comm.bcast({"value": rank}, root=2),
+            comm.allreduce(rank),
+            (split.Get_rank(), split.Get_size(), split.allgather(rank)),
+            gathered,
+        )
+
+    results = run_processes(collectives, total_ranks=4)
+    for rank, (bcast, total, split, gathered) in enumerate(results):
+        assert bcast == {"value": 2}
+        assert total == 6
+        members = [3, 1] if rank % 2 else [2, 0]
+        assert split == (members.index(rank), 2, members)
+    np.testing.assert_array_equal(results[0][3], np.arange(8.0).reshape(4, 2))
+
+
+def test_shared_memory_comm_failing_rank_raises():
+    def fail_on_rank_1(comm: SharedMemoryComm):
+        if comm.Get_rank() == 1:
+            raise ValueError("rank 1 failed")
+        comm.barrier()
+
+    with pytest.raises(ValueError, match="rank 1 failed"):
+        run_processes(fail_on_rank_1, total_ranks=3)
+
+
+def test_shared_memory_comm_halo_update_matches_local_comm():
+    nx, n_halo = 4, 3
+    partitioner = CubedSpherePartitioner(TilePartitioner((1, 1)))
+    total_ranks = partitioner.total_ranks
+
+    def make_quantity(rank: int) -> Quantity:
+        data = np.zeros([nx + 2 * n_halo, nx + 2 * n_halo, 2])
+        data[n_halo:-n_halo, n_halo:-n_halo, :] = rank + 1
+        data += np.arange(data.size).reshape(data.shape) * 1e-4
+        return Quantity(
+            data,
+            dims=[constants.X_DIM, constants.Y_DIM, constants.Z_DIM],
+            units="m",
+            origin=(n_halo, n_halo, 0),
+            extent=(nx, nx, 2),
+        )
+
+    buffer_dict = {}
+    expected = []
+    requests = []
+    for rank in range(total_ranks):
+        communicator = CubedSphereCommunicator(
+            LocalComm(rank, total_ranks, buffer_dict), partitioner
+        )
+        quantity = make_quantity(rank)
+        requests.append(communicator.start_halo_update(quantity, n_halo))
+        expected.append(quantity)
+    for request in requests:
+        request.wait()
+
+    def halo_update(comm: SharedMemoryComm):
+        communicator = CubedSphereCommunicator(comm, partitioner)
+        quantity = make_quantity(comm.Get_rank())
+        updater = communicator.start_halo_update(quantity, n_halo)
+        updater.wait()
+        communicator.halo_update(quantity, n_halo)
+        return quantity.data
+
+    results = run_processes(halo_update, total_ranks)
+    for rank, data in enumerate(results):
+        np.testing.assert_array_equal(data, expected[rank].data)
+
+
+def test_shared_memory_comm_halo_update_sends_pack_buffers_without_copy():
+    nx, n_halo = 4, 3
+    partitioner = CubedSpherePartitioner(TilePartitioner((1, 1)))
+
+    def halo_update(comm: SharedMemoryComm):
+        communicator = CubedSphereCommunicator(comm, partitioner)
+        quantity = Quantity(
+            np.zeros([nx + 2 * n_halo, nx + 2 * n_halo]),
+            dims=[constants.X_DIM, constants.Y_DIM],
+            units="m",
+            origin=(n_halo, n_halo),
+            extent=(nx, nx),
+        )
+        updater = communicator.get_scalar_halo_updater(
+            [
+                QuantityHaloSpec(
+                    n_halo,
+                    quantity.data.strides,
+                    quantity.data.itemsize,
+                    quantity.data.shape,
+                    quantity.origin,
+                    quantity.extent,
+                    quantity.dims,
+                    np,
+                    quantity.metadata.dtype,
+                )
+            ]
+        )
+        buffers_placed = []
+        for _ in range(3):
+            updater.start([quantity])
+            for transformer in updater._transformers.values():
+                buffers_placed.append(
+                    transformer.get_pack_buffer().array.ctypes.data
+                    in comm._endpoint._buffers
+                )
+                # unpack buffers never leave the process
+                buffers_placed.append(
+                    transformer.get_unpack_buffer().array.ctypes.data
+                    not in comm._endpoint._buffers
+                )
+            updater.wait()
+        return all(buffers_placed), len(comm._endpoint._segments)
+
+    results = run_processes(halo_update, partitioner.total_ranks)
+    for buffers_placed, n_copy_segments in results:
+        assert buffers_placed
+        assert n_copy_segments == 0
+
+
+def test_shared_memory_comm_buffers_are_released_with_their_array():
+    def allocate(comm: SharedMemoryComm):
+        allocator = comm.buffer_allocator(np)
+        array = allocator((4, 3), dtype=np.float32)
+        name = comm._endpoint._buffers[array.ctypes.data][0].name
+        n_buffers = len(comm._endpoint._buffers)
+        del array
+        return (
+            n_buffers,
+            len(comm._endpoint._buffers),
+            os.path.exists(f"/dev/shm/{name.lstrip('/')}"),
+        )
+
+    assert run_processes(allocate, total_ranks=1) == [(1, 0, False)]
@@ -0,0 +1,25 @@
+import json
+
+from click.testing import CliRunner
+
+from ndsl.performance.stencil_call_benchmark import (
+    STENCIL_CALL_BENCHMARK_PATHS,
+    StencilCallBenchmarkConfig,
+    command_line,
+    run_stencil_call_benchmark,
+)
+
+
+def test_stencil_call_benchmark_times_all_paths():
+    config = StencilCallBenchmarkConfig(iterations=5, repeat=2)
+    times = run_stencil_call_benchmark(config)
+    assert set(times) == set(STENCIL_CALL_BENCHMARK_PATHS)
+    assert all(time > 0 for time in times.values())
+
+
+def test_stencil_call_benchmark_command_line():
+    runner = CliRunner()
+    result = runner.invoke(command_line, ["--iterations", "3", "--repeat", "1"])
+    assert result.exit_code == 0, result.output
+    times = json.loads(result.output.splitlines()[-1])
+    assert set(times) == set(STENCIL_CALL_BENCHMARK_PATHS)
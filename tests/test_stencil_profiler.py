@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+from gt4py.cartesian.gtscript import PARALLEL, computation, interval
+
+from ndsl.dsl.gt4py_utils import make_storage_from_shape
+from ndsl.dsl.stencil import GridIndexing, StencilFactory
+from ndsl.dsl.stencil_config import CompilationConfig, StencilConfig
+from ndsl.dsl.typing import FloatField
+from ndsl.performance.stencil_profiler import StencilProfiler, estimate_bytes_moved
+
+
+def smooth_x_stencil(q_in: FloatField, q_out: FloatField):
+    with computation(PARALLEL), interval(...):
+        q_out = 0.5 * q_in + 0.25 * (q_in[-1, 0, 0] + q_in[1, 0, 0])
+
+
+def increment_stencil(q: FloatField):
+    with computation(PARALLEL), interval(...):
+        q = q + 1.0
+
+
+def get_stencil_factory(validate_args: bool) -> StencilFactory:
+    config = StencilConfig(
+        compilation_config=CompilationConfig(
+            backend="numpy", rebuild=False, validate_args=validate_args
+        )
+    )
+    grid_indexing = GridIndexing(
+        domain=(4, 4, 2),
+        n_halo=1,
+        south_edge=True,
+        north_edge=True,
+        west_edge=True,
+        east_edge=True,
+    )
+    return StencilFactory(config, grid_indexing)
+
+
+def test_estimate_bytes_moved():
+    factory = get_stencil_factory(validate_args=False)
+    smooth = factory.from_origin_domain(
+        smooth_x_stencil, origin=(1, 1, 0), domain=(4, 4, 2)
+    )
+    increment = factory.from_origin_domain(
+        increment_stencil, origin=(1, 1, 0), domain=(4, 4, 2)
+    )
+    # q_in is read on a domain extended by one point along x
+    assert estimate_bytes_moved(smooth.stencil_object.field_info, (4, 4, 2)) == (
+        6 * 4 * 2 * 8 + 4 * 4 * 2 * 8
+    )
+    assert increment.bytes_moved == 2 * 4 * 4 * 2 * 8
+
+
+def test_stencil_profiler_records_calls(tmp_path):
+    for validate_args in (True, False):
+        factory = get_stencil_factory(validate_args=validate_args)
+        profiler = StencilProfiler()
+        factory.timing_collector.profiler = profiler
+        smooth = factory.from_origin_domain(
+            smooth_x_stencil, origin=(1, 1, 0), domain=(4, 4, 2)
+        )
+        increment = factory.from_origin_domain(
+            increment_stencil, origin=(1, 1, 0), domain=(4, 4, 2)
+        )
+        shape = factory.grid_indexing.max_shape
+        q_in = make_storage_from_shape(shape, backend="numpy")
+        q_out = make_storage_from_shape(shape, backend="numpy")
+        for _ in range(5):
+            smooth(q_in, q_out)
+        increment(q_out)
+
+        report = profiler.report(peak_bandwidth=1e9)
+        stencils = report["stencils"]
+        assert len(stencils) == 2
+        summaries = sorted(stencils.values(), key=lambda summary: summary["calls"])
+        assert [summary["calls"] for summary in summaries] == [1, 5]
+        smooth_summary = summaries[1]
+        assert smooth_summary["bytes_per_call"] == smooth.bytes_moved
+        assert (
+            smooth_summary["min_time"]
+            <= smooth_summary["median_time"]
+            <= smooth_summary["p95_time"]
+        )
+        assert np.isclose(
+            smooth_summary["fraction_of_peak"], smooth_summary["bandwidth"] / 1e9
+        )
+
+        text = profiler.text_report(peak_bandwidth=1e9)
+        lines = text.splitlines()
+        assert "% peak" in lines[0]
+        # ranked by total run time
+        assert len(lines) == 3
+        path = tmp_path / "profile.json"
+        profiler.write_json(str(path), peak_bandwidth=1e9)
+        with open(path) as f:
+            assert json.load(f) == json.loads(json.dumps(report))
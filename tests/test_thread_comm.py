@@ -0,0 +1,201 @@
+import numpy as np
+import pytest
+
+import ndsl.constants as constants
+from ndsl.comm.comm_abc import Comm
+from ndsl.comm.communicator import CubedSphereCommunicator
+from ndsl.comm.local_comm import ConcurrencyError, LocalComm
+from ndsl.comm.partitioner import CubedSpherePartitioner, TilePartitioner
+from ndsl.comm.thread_comm import ThreadComm, run_ranks
+from ndsl.quantity import Quantity
+
+
+def test_thread_comm_recv_before_send():
+    def exchange(comm: ThreadComm):
+        other = 1 - comm.Get_rank()
+        data = np.full([3], comm.Get_rank(), dtype=np.int32)
+        received = np.zeros([3], dtype=np.int32)
+        # posting the receive first would raise a ConcurrencyError on LocalComm
+        request = comm.Irecv(received, source=other, tag=2)
+        comm.barrier()
+        send_request = comm.Isend(data, dest=other, tag=2)
+        request.wait()
+        send_request.wait()
+        return received
+
+    results = run_ranks(exchange, total_ranks=2)
+    assert (results[0] == 1).all()
+    assert (results[1] == 0).all()
+
+
+def test_thread_comm_isend_does_not_copy():
+    def exchange(comm: ThreadComm):
+        if comm.Get_rank() == 0:
+            data = np.arange(4.0)
+            request = comm.Isend(data, dest=1)
+            comm.barrier()
+            request.wait()
+        else:
+            comm.barrier()
+            # the message waits for its receive as a read-only view of data
+            (message,) = comm._group._messages[(0, 1, 0)]
+            assert not message.data.flags.writeable
+            received = np.zeros([4])
+            comm.Recv(received, source=0)
+            np.testing.assert_array_equal(received, np.arange(4.0))
+
+    run_ranks(exchange, total_ranks=2)
+
+
+def test_thread_comm_waitany_returns_completed_request():
+    def exchange(comm: ThreadComm):
+        if comm.Get_rank() == 0:
+            late, early = np.zeros([2]), np.zeros([2])
+            requests = [
+                comm.Irecv(late, source=1, tag=0),
+                comm.Irecv(early, source=1, tag=1),
+            ]
+            index = comm.Waitany(requests)
+            comm.barrier()
+            requests[1 - index].wait()
+            return index, late, early
+        comm.Send(np.full([2], 2.0), dest=0, tag=1)
+        comm.barrier()
+        comm.Send(np.full([2], 1.0), dest=0, tag=0)
+
+    index, late, early = run_ranks(exchange, total_ranks=2)[0]
+    assert index == 1
+    np.testing.assert_array_equal(late, [1.0, 1.0])
+    np.testing.assert_array_equal(early, [2.0, 2.0])
+
+
+def test_comm_default_persistent_requests():
+    # Comm implementations only need to provide non-blocking requests
+    for method in ("Send_init", "Recv_init"):
+        assert method not in Comm.__abstractmethods__
+
+    def exchange(comm: ThreadComm):
+        other = 1 - comm.Get_rank()
+        received = np.zeros([2])
+        requests = [
+            Comm.Recv_init(comm, received, source=other),
+            Comm.Send_init(comm, np.full([2], float(comm.Get_rank())), dest=other),
+        ]
+        for _ in range(2):
+            comm.Startall(requests)
+            comm.Waitall(requests)
+        return received
+
+    results = run_ranks(exchange, total_ranks=2)
+    np.testing.assert_array_equal(results[0], [1.0, 1.0])
+    np.testing.assert_array_equal(results[1], [0.0, 0.0])
+
+
+def test_comm_default_varying_collectives():
+    # Comm implementations only need to provide point-to-point messages
+    for method in ("Scatterv", "Gatherv"):
+        assert method not in Comm.__abstractmethods__
+
+    def exchange(comm: ThreadComm):
+        rank = comm.Get_rank()
+        counts = [1, 3, 2]
+        scattered = np.zeros([counts[rank]])
+        Comm.Scatterv(
+            comm, [np.arange(6.0), counts] if rank == 1 else None, scattered, root=1
+        )
+        gathered = np.zeros([6]) if rank == 0 else None
+        Comm.Gatherv(comm, scattered * 2, [gathered, counts] if rank == 0 else None)
+        return scattered, gathered
+
+    results = run_ranks(exchange, total_ranks=3)
+    for rank, segment in enumerate(([0.0], [1.0, 2.0, 3.0], [4.0, 5.0])):
+        np.testing.assert_array_equal(results[rank][0], segment)
+    np.testing.assert_array_equal(results[0][1], np.arange(6.0) * 2)
+
+
+def test_thread_comm_collectives():
+    def collectives(comm: ThreadComm):
+        rank = comm.Get_rank()
+        split = comm.Split(color=rank % 2, key=-rank)
+        return (
+            comm.bcast({"value": rank}, root=2),
+            comm.allgather(rank),
+            comm.allreduce(rank),
+            comm.allreduce(rank, max),
+            (split.Get_rank(), split.Get_size(), split.allgather(rank)),
+        )
+
+    results = run_ranks(collectives, total_ranks=4)
+    for rank, (bcast, allgather, total, maximum, split) in enumerate(results):
+        assert bcast == {"value": 2}
+        assert allgather == [0, 1, 2, 3]
+        assert total == 6
+        assert maximum == 3
+        members = [3, 1] if rank % 2 else [2, 0]
+        assert split == (members.index(rank), 2, members)
+
+
+def test_thread_comm_failing_rank_raises():
+    def fail_on_rank_1(comm: ThreadComm):
+        if comm.Get_rank() == 1:
+            raise ValueError("rank 1 failed")
+        comm.barrier()
+
+    with pytest.raises(ValueError, match="rank 1 failed"):
+        run_ranks(fail_on_rank_1, total_ranks=3)
+
+
+def test_thread_comm_recv_timeout():
+    def recv_only(comm: ThreadComm):
+        comm.Recv(np.zeros([1]), source=(comm.Get_rank() + 1) % 2)
+
+    with pytest.raises(ConcurrencyError):
+        run_ranks(recv_only, total_ranks=2, timeout=0.1)
+
+
+def _make_quantity(rank: int, nx: int, n_halo: int) -> Quantity:
+    data = np.zeros([nx + 2 * n_halo, nx + 2 * n_halo, 2])
+    data[n_halo:-n_halo, n_halo:-n_halo, :] = rank + 1
+    data += np.arange(data.size).reshape(data.shape) * 1e-4
+    return Quantity(
+        data,
+        dims=[constants.X_DIM, constants.Y_DIM, constants.Z_DIM],
+        units="m",
+        origin=(n_halo, n_halo, 0),
+        extent=(nx, nx, 2),
+    )
+
+
+@pytest.mark.parametrize("layout", [(1, 1), (2, 2)])
+def test_thread_comm_halo_update_matches_local_comm(layout):
+    nx, n_halo = 4, 3
+    partitioner = CubedSpherePartitioner(TilePartitioner(layout))
+    total_ranks = partitioner.total_ranks
+
+    buffer_dict = {}
+    expected = []
+    requests = []
+    for rank in range(total_ranks):
+        communicator = CubedSphereCommunicator(
+            LocalComm(rank, total_ranks, buffer_dict), partitioner
+        )
+        quantity = _make_quantity(rank, nx, n_halo)
+        requests.append(communicator.start_halo_update(quantity, n_halo))
+        expected.append(quantity)
+    for request in requests:
+        request.wait()
+
+    def halo_update(comm: ThreadComm):
+        communicator = CubedSphereCommunicator(comm, partitioner)
+        quantity = _make_quantity(comm.Get_rank(), nx, n_halo)
+        communicator.halo_update(quantity, n_halo)
+        state = communicator.tile.gather_state({"q": quantity})
+        return quantity, state
+
+    results = run_ranks(halo_update, total_ranks)
+    for rank, (quantity, state) in enumerate(results):
+        np.testing.assert_array_equal(quantity.data, expected[rank].data)
+        if partitioner.tile.subtile_index(rank) == (0, 0):
+            assert state["q"].extent == (nx * layout[1], nx * layout[0], 2)
+        else:
+            assert state is None
@@ -370,3 +370,77 @@ def test_tile_scatter_state_with_recv_state_without_time(
         assert result.units == scattered.units
         assert result.extent == scattered.extent
         scattered.np.testing.assert_array_equal(result.view[:], scattered.view[:])
+
+
+def test_tile_state_round_trip_batches_by_dtype(
+    tile_quantity, scattered_quantities, communicator_list, time
+):
+    """Quantities of a same dtype share a single Gatherv/Scatterv."""
+    calls = []
+    for communicator in communicator_list:
+        comm = communicator.comm
+        for method in ("Gatherv", "Scatterv", "bcast"):
+
+            def record(*args, _method=getattr(comm, method), _name=method, **kwargs):
+                calls.append(_name)
+                return _method(*args, **kwargs)
+
+            setattr(comm, method, record)
+
+    def rank_state(rank_quantity):
+        half = Quantity(
+            rank_quantity.data.astype("float32") / 2,
+            dims=rank_quantity.dims,
+            units=rank_quantity.units,
+            origin=rank_quantity.origin,
+            extent=rank_quantity.extent,
+            allow_mismatch_float_precision=True,
+        )
+        return {
+            "time": time,
+            "air_temperature": rank_quantity,
+            "half_temperature": half,
+            "copy_temperature": copy.deepcopy(rank_quantity),
+        }
+
+    result_state = None
+    for communicator, rank_quantity in reversed(
+        list(zip(communicator_list, scattered_quantities))
+    ):
+        out = communicator.gather_state(send_state=rank_state(rank_quantity))
+        if communicator.rank == 0:
+            result_state = out
+    assert calls.count("Gatherv") == 2 * len(communicator_list)
+    assert list(result_state.keys()) == [
+        "time",
+        "air_temperature",
+        "half_temperature",
+        "copy_temperature",
+    ]
+    assert result_state["half_temperature"].data.dtype == "float32"
+    tile_quantity.np.testing.assert_array_equal(
+        result_state["copy_temperature"].view[:], tile_quantity.view[:]
+    )
+    tile_quantity.np.testing.assert_array_equal(
+        result_state["half_temperature"].view[:],
+        tile_quantity.view[:].astype("float32") / 2,
+    )
+
+    calls.clear()
+    result_list = []
+    for communicator in communicator_list:
+        if communicator.rank == 0:
+            result_list.append(communicator.scatter_state(send_state=result_state))
+        else:
+            result_list.append(communicator.scatter_state())
+    assert calls.count("Scatterv") == 2 * len(communicator_list)
+    assert calls.count("bcast") == len(communicator_list)
+    for result, scattered in zip(result_list, scattered_quantities):
+        assert result["time"] == time
+        expected = rank_state(scattered)
+        for name in ("air_temperature", "half_temperature", "copy_temperature"):
+            assert result[name].dims == scattered.dims
+            assert result[name].data.dtype == expected[name].data.dtype
+            scattered.np.testing.assert_array_equal(
+                result[name].view[:], expected[name].view[:]
+            )
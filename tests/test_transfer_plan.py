@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+from ndsl.buffer import BUFFER_CACHE, Buffer
+from ndsl.comm.communicator import CubedSphereCommunicator
+from ndsl.comm.partitioner import CubedSpherePartitioner, TilePartitioner
+from ndsl.comm.thread_comm import run_ranks
+from ndsl.comm.transfer_plan import _SubtileLayout
+from ndsl.constants import (
+    TILE_DIM,
+    X_DIM,
+    X_INTERFACE_DIM,
+    Y_DIM,
+    Y_INTERFACE_DIM,
+    Z_DIM,
+)
+from ndsl.quantity import Quantity
+
+
+@pytest.mark.parametrize(
+    "partitioner, dims, extent",
+    [
+        (TilePartitioner((3, 2)), [Y_DIM, X_DIM, Z_DIM], (12, 10, 4)),
+        (TilePartitioner((2, 2)), [Z_DIM, X_INTERFACE_DIM, Y_DIM], (3, 11, 8)),
+        (
+            CubedSpherePartitioner(TilePartitioner((2, 2))),
+            [TILE_DIM, Y_INTERFACE_DIM, X_INTERFACE_DIM],
+            (6, 9, 9),
+        ),
+        (
+            CubedSpherePartitioner(TilePartitioner((3, 3))),
+            [TILE_DIM, Z_DIM, X_DIM, Y_DIM],
+            (6, 2, 9, 9),
+        ),
+        (
+            TilePartitioner((2, 2), subtile_cell_counts=((3, 5), (6, 2))),
+            [Y_DIM, X_INTERFACE_DIM],
+            (8, 9),
+        ),
+    ],
+)
+def test_subtile_layout_pack_unpack(partitioner, dims, extent):
+    start, stop = partitioner.subtile_slices(dims, extent, overlap=True)
+    layout = _SubtileLayout(start, stop, dims, partitioner.layout)
+    array = np.random.default_rng(0).random(extent)
+    buffer = np.empty(sum(layout.counts))
+    layout.pack(array, buffer)
+    offset = 0
+    for rank in range(partitioner.total_ranks):
+        rank_slice = partitioner.subtile_slice(rank, dims, extent, overlap=True)
+        expected = array[rank_slice].ravel()
+        np.testing.assert_array_equal(buffer[offset : offset + len(expected)], expected)
+        offset += len(expected)
+    assert offset == len(buffer)
+    unpacked = np.zeros(extent)
+    layout.unpack(buffer, unpacked)
+    np.testing.assert_array_equal(unpacked, array)
+
+
+def test_regular_subtile_layout_uses_strided_view():
+    partitioner = CubedSpherePartitioner(TilePartitioner((2, 2)))
+    dims = [TILE_DIM, Y_DIM, X_DIM]
+    start, stop = partitioner.subtile_slices(dims, (6, 8, 8), overlap=True)
+    layout = _SubtileLayout(start, stop, dims, partitioner.layout)
+    assert layout.regular and layout.disjoint
+    array = np.arange(6 * 8 * 8.0).reshape(6, 8, 8)
+    assert np.shares_memory(layout.blocks(array), array)
+    assert layout.blocks(array).shape == (6, 2, 2, 4, 4)
+
+
+@pytest.mark.parametrize("uneven", [False, True])
+def test_scatter_gather_plans(uneven):
+    if uneven:
+        tile = TilePartitioner((2, 2), subtile_cell_counts=((3, 5), (5, 3)))
+    else:
+        tile = TilePartitioner((2, 2))
+    partitioner = CubedSpherePartitioner(tile)
+    dims = [TILE_DIM, Y_DIM, X_INTERFACE_DIM, Z_DIM]
+    global_data = [
+        np.random.default_rng(seed).random((6, 8, 9, 3)) for seed in range(2)
+    ]
+
+    def run(comm):
+        bcast = comm.bcast
+        n_bcast = []
+
+        def counting_bcast(value, root=0):
+            n_bcast.append(root)
+            return bcast(value, root=root)
+
+        comm.bcast = counting_bcast
+        communicator = CubedSphereCommunicator(comm, partitioner)
+        metadata = None
+        if communicator.rank == 0:
+            metadata = Quantity(global_data[0], dims, "m").metadata
+        plan = communicator.get_scatter_plan(metadata)
+        assert communicator.get_scatter_plan(metadata) is plan
+        n_plan_bcast = len(n_bcast)
+        gathered = []
+        for data in global_data:
+            send = Quantity(data, dims, "m") if communicator.rank == 0 else None
+            rank_quantity = plan.scatter(send)
+            gather_plan = communicator.get_gather_plan(rank_quantity.metadata)
+            gathered.append(gather_plan.gather(rank_quantity))
+        # scattering with a plan sends no metadata
+        assert len(n_bcast) == n_plan_bcast
+        return gathered
+
+    results = run_ranks(run, total_ranks=partitioner.total_ranks)
+    for data, gathered in zip(global_data, results[0]):
+        np.testing.assert_array_equal(gathered.view[:], data)
+    assert all(result == [None, None] for result in results[1:])
+
+
+def test_plans_are_shared_by_quantities_of_one_layout():
+    BUFFER_CACHE.clear()
+    partitioner = CubedSpherePartitioner(TilePartitioner((2, 2)))
+    dims = [TILE_DIM, Y_DIM, X_DIM]
+    data = np.random.default_rng(0).random((6, 8, 8))
+
+    def run(comm):
+        communicator = CubedSphereCommunicator(comm, partitioner)
+        results = []
+        for units in ("m", "K"):
+            send = Quantity(data, dims, units) if communicator.rank == 0 else None
+            rank_quantity = communicator.scatter(send)
+            assert rank_quantity.units == units
+            results.append(communicator.gather(rank_quantity))
+        assert len(communicator._scatter_plans) == 1
+        assert len(communicator._gather_plans) == 1
+        return results
+
+    results = run_ranks(run, total_ranks=partitioner.total_ranks)
+    for units, gathered in zip(("m", "K"), results[0]):
+        assert gathered.units == units
+        np.testing.assert_array_equal(gathered.view[:], data)
+    # the staging buffer of the root rank is returned to the cache after each
+    # transfer, so only the first one allocates it
+    statistics = Buffer.cache_statistics(
+        (np.zeros, (data.size,), Quantity(data, dims, "m").metadata.dtype)
+    )
+    assert statistics.misses == 1
+    assert statistics.hits == 3
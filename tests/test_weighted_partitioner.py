@@ -0,0 +1,193 @@
+import numpy as np
+import pytest
+
+from ndsl.comm.communicator import CubedSphereCommunicator, TileCommunicator
+from ndsl.comm.partitioner import (
+    CubedSpherePartitioner,
+    TilePartitioner,
+    balanced_cell_counts,
+)
+from ndsl.comm.thread_comm import run_ranks
+from ndsl.constants import (
+    EAST,
+    NORTH,
+    SOUTH,
+    TILE_DIM,
+    WEST,
+    X_DIM,
+    X_INTERFACE_DIM,
+    Y_DIM,
+    Y_INTERFACE_DIM,
+    Z_DIM,
+)
+from ndsl.initialization import SubtileGridSizer
+from ndsl.quantity import Quantity
+
+
+@pytest.mark.parametrize(
+    "costs, n_subtiles, min_cells, counts",
+    [
+        pytest.param(np.ones(12), 3, 1, (4, 4, 4), id="uniform"),
+        pytest.param([1] * 6 + [3] * 6, 2, 1, (8, 4), id="costly_end"),
+        pytest.param([10] + [1] * 11, 3, 3, (3, 4, 5), id="min_cells"),
+    ],
+)
+def test_balanced_cell_counts(costs, n_subtiles, min_cells, counts):
+    result = balanced_cell_counts(np.asarray(costs), n_subtiles, min_cells)
+    assert result == counts
+
+
+def test_balanced_cell_counts_too_few_cells():
+    with pytest.raises(ValueError):
+        balanced_cell_counts(np.ones(8), 3, min_cells=3)
+
+
+def test_tile_from_weights_balances_cost():
+    weights = np.ones((12, 16))
+    weights[:, :8] = 3.0
+    partitioner = TilePartitioner.from_weights(weights, (2, 2))
+    assert partitioner.subtile_cell_counts == ((6, 6), (5, 11))
+    costs = []
+    for rank in range(partitioner.total_ranks):
+        y_slice, x_slice = partitioner.subtile_slice(rank, [Y_DIM, X_DIM], [12, 16])
+        costs.append(weights[y_slice, x_slice].sum())
+    assert max(costs) - min(costs) < 0.15 * max(costs)
+
+
+@pytest.mark.parametrize("overlap", [True, False])
+@pytest.mark.parametrize(
+    "dims, extent",
+    [
+        ([Y_DIM, X_DIM, Z_DIM], (12, 10, 4)),
+        ([X_INTERFACE_DIM, Y_INTERFACE_DIM], (11, 13)),
+    ],
+)
+def test_subtile_slices_cover_tile(dims, extent, overlap):
+    partitioner = TilePartitioner((3, 2), subtile_cell_counts=((3, 4, 5), (6, 4)))
+    covered = np.zeros(extent, dtype=int)
+    for rank in range(partitioner.total_ranks):
+        covered[partitioner.subtile_slice(rank, dims, extent, overlap=overlap)] += 1
+    if overlap:
+        assert np.all(covered >= 1)
+    else:
+        np.testing.assert_array_equal(covered, 1)
+    quantity = Quantity(np.zeros(extent), dims, "m")
+    assert partitioner.subtile_extent(quantity.metadata, 4) == tuple(
+        item.stop - item.start
+        for item in partitioner.subtile_slice(4, dims, extent, overlap=True)
+    )
+
+
+def test_global_extent_from_cell_counts():
+    partitioner = CubedSpherePartitioner(
+        TilePartitioner((2, 2), subtile_cell_counts=((5, 7), (7, 5)))
+    )
+    quantity = Quantity(
+        np.zeros((4, 8, 3)), [X_INTERFACE_DIM, Y_DIM, Z_DIM], "m", extent=(4, 8, 3)
+    )
+    assert partitioner.global_extent(quantity.metadata) == (6, 13, 12, 3)
+
+
+def test_subtile_slice_rejects_wrong_extent():
+    partitioner = TilePartitioner((2, 2), subtile_cell_counts=((6, 6), (4, 8)))
+    with pytest.raises(ValueError):
+        partitioner.subtile_slice(0, [Y_DIM, X_DIM], [12, 10])
+
+
+def test_sizer_uses_cell_counts():
+    partitioner = TilePartitioner((2, 2), subtile_cell_counts=((6, 6), (4, 8)))
+    sizer = SubtileGridSizer.from_tile_params(
+        12, 12, 5, 3, {}, (2, 2), tile_partitioner=partitioner, tile_rank=3
+    )
+    assert (sizer.ny, sizer.nx) == (6, 8)
+
+
+def test_cube_from_weights_matches_edges():
+    weights = np.ones((6, 24, 24))
+    weights[:, :, :6] = 4.0
+    partitioner = CubedSpherePartitioner.from_weights(weights, (4, 4))
+    y_counts, x_counts = partitioner.tile.subtile_cell_counts
+    assert y_counts == x_counts == tuple(reversed(x_counts))
+    assert sum(x_counts) == 24 and len(set(x_counts)) > 1
+    slices = partitioner.topology.subtile_slices([TILE_DIM, Y_DIM, X_DIM], (6, 24, 24))
+    assert slices[1][-1].tolist() == [6, 24, 24]
+
+
+def test_cube_rejects_mismatched_edges():
+    with pytest.raises(ValueError):
+        CubedSpherePartitioner(
+            TilePartitioner((2, 2), subtile_cell_counts=((5, 7), (5, 7)))
+        )
+
+
+def test_uneven_cube_halo_update():
+    partitioner = CubedSpherePartitioner(
+        TilePartitioner((2, 2), subtile_cell_counts=((5, 7), (7, 5)))
+    )
+    n_halo = 3
+
+    def run(comm):
+        communicator = CubedSphereCommunicator(comm, partitioner)
+        y_slice, x_slice = partitioner.tile.subtile_slice(
+            communicator.rank, [Y_DIM, X_DIM], [12, 12]
+        )
+        ny, nx = y_slice.stop - y_slice.start, x_slice.stop - x_slice.start
+        quantity = Quantity(
+            np.zeros((ny + 2 * n_halo, nx + 2 * n_halo)),
+            [Y_DIM, X_DIM],
+            "m",
+            origin=(n_halo, n_halo),
+            extent=(ny, nx),
+        )
+        quantity.view[:] = communicator.rank
+        communicator.halo_update(quantity, n_halo)
+        return quantity.data
+
+    for rank, data in enumerate(run_ranks(run, total_ranks=24)):
+        interior = slice(n_halo, -n_halo)
+        edges = {
+            WEST: data[interior, :n_halo],
+            EAST: data[interior, -n_halo:],
+            SOUTH: data[:n_halo, interior],
+            NORTH: data[-n_halo:, interior],
+        }
+        for boundary_type, halo in edges.items():
+            np.testing.assert_array_equal(
+                halo, partitioner.boundary(boundary_type, rank).to_rank
+            )
+
+
+def test_uneven_scatter_halo_update_gather():
+    partitioner = TilePartitioner((3, 3), subtile_cell_counts=((3, 5, 4), (4, 3, 5)))
+    n_halo = 3
+    global_data = np.random.default_rng(0).random((12, 12))
+
+    def run(comm):
+        communicator = TileCommunicator(comm, partitioner)
+        rank = communicator.rank
+        send = None
+        if rank == 0:
+            send = Quantity(global_data.copy(), [Y_DIM, X_DIM], "m")
+        compute = communicator.scatter(send_quantity=send)
+        ny, nx = compute.extent
+        quantity = Quantity(
+            np.zeros((ny + 2 * n_halo, nx + 2 * n_halo)),
+            [Y_DIM, X_DIM],
+            "m",
+            origin=(n_halo, n_halo),
+            extent=(ny, nx),
+        )
+        quantity.view[:] = compute.view[:]
+        communicator.halo_update(quantity, n_halo)
+        gathered = communicator.gather(compute)
+        return quantity.data, gathered
+
+    results = run_ranks(run, total_ranks=9)
+    np.testing.assert_array_equal(results[0][1].view[:], global_data)
+    assert all(gathered is None for _, gathered in results[1:])
+    for rank, (data, _) in enumerate(results):
+        y_slice, x_slice = partitioner.subtile_slice(rank, [Y_DIM, X_DIM], [12, 12])
+        # halos of a tile partitioner wrap around the tile periodically
+        y_index = np.arange(y_slice.start - n_halo, y_slice.stop + n_halo) % 12
+        x_index = np.arange(x_slice.start - n_halo, x_slice.stop + n_halo) % 12
+        np.testing.assert_array_equal(data, global_data[np.ix_(y_index, x_index)])